@@ -34,9 +34,7 @@ else
     
     # 2. Trigger Login Statistics
     /bin/bash /home/kali/Dionaea/Dinonaea-web/Dionaea/Login_statistics.sh
-    
-    # 3. Notify Backend to Refresh Stats (Using Python script to bypass HTTP Auth)
-    cd /home/kali/Dionaea/Dinonaea-web/Dionaea
-    source backend/venv/bin/activate
-    PYTHONPATH=backend python backend/scripts/refresh_cache.py
+
+    # Backend caches are invalidated by the ingestor after each committed
+    # batch; backend/scripts/refresh_cache.py remains for manual refreshes.
 fi
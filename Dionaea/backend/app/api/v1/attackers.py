@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+from typing import Any, List, Literal, Optional
+
+from app.db.database import get_db
+from app.services.attacker_profile_service import AttackerProfileService
+from app.schemas.attacker_profile import AttackerProfile
+from app.core.dependencies import get_current_active_user
+from app.core.pagination import set_cursor_headers
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("", response_model=List[AttackerProfile])
+def list_attackers(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    sort: Literal["last_seen", "first_seen", "total_events", "distinct_usernames", "distinct_passwords"] = "last_seen",
+    order: Literal["desc", "asc"] = "desc",
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    country_code: Optional[str] = None
+) -> Any:
+    """
+    List attacker profiles, e.g. the most active sources with
+    sort=total_events. Pages are keyset-paginated via X-Next-Cursor.
+    """
+    service = AttackerProfileService(db)
+    profiles, next_cursor = service.list_profiles(sort=sort, order=order, limit=limit, cursor=cursor, country_code=country_code)
+    set_cursor_headers(response, {"next": next_cursor})
+    return profiles
+
+@router.get("/{ip}", response_model=AttackerProfile)
+def read_attacker(
+    ip: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get what one source IP has done so far, without scanning attack_logs.
+    """
+    service = AttackerProfileService(db)
+    return service.get_profile(ip)
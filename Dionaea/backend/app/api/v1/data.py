@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Any, List, Optional
-from datetime import datetime, time
+from typing import Any, List, Literal, Optional
+from datetime import datetime, time, timedelta
 
-from app.db.database import get_db
-from app.services.attack_log_service import AttackLogService
+from app.db.database import get_db, get_async_db, SessionLocal
+from app.services.attack_log_service import AttackLogService, EXPORT_COLUMNS
+from app.services.async_attack_log_service import AsyncAttackLogService
 from app.schemas.attack_log import AttackLog, AttackLogFilter, AttackLogStats
 from app.core.dependencies import get_current_active_user
+from app.core.cache import cache_metrics
+from app.core.export import iter_csv, iter_ndjson, iter_gzip
+from app.core.columnar import iter_columnar, pyarrow_available
+from app.core.compression import negotiate_encoding
+from app.core.http_cache import conditional_etag
+from app.core.pagination import set_cursor_headers, set_total_header, parse_fields, projected_response
 from app.models.user import User
 
 router = APIRouter()
@@ -45,34 +54,50 @@ def parse_date_string(date_str: Optional[str]) -> Optional[datetime]:
     except ValueError:
         return None
 
+def parse_day_range(start_time: Optional[str], end_time: Optional[str]):
+    """
+    Parses start/end query strings into the first and last instant of their days.
+    """
+    parsed_start = parse_date_string(start_time)
+    if parsed_start:
+        parsed_start = datetime.combine(parsed_start.date(), time.min)
+
+    parsed_end = parse_date_string(end_time)
+    if parsed_end:
+        parsed_end = datetime.combine(parsed_end.date(), time.max)
+    return parsed_start, parsed_end
+
 @router.get("/logs", response_model=List[AttackLog])
-def read_logs(
-    db: Session = Depends(get_db),
+async def read_logs(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    include_total: Literal["none", "exact", "estimate"] = Query("none", description="Return X-Total-Count: none, exact or estimate"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. timestamp,source_ip,username"),
+    since_id: Optional[int] = Query(None, description="Only rows after this id (delta refresh)"),
+    since_timestamp: Optional[datetime] = Query(None, description="Only rows after this timestamp, or after (since_timestamp, since_id)"),
     start_time: Optional[str] = Query(None, description="Start time (e.g. 02/27 or 2026-02-27)"),
     end_time: Optional[str] = Query(None, description="End time (e.g. 02/28 or 2026-02-28)"),
     source_ip: Optional[str] = None,
+    cidr: Optional[str] = Query(None, description="Source network, e.g. 45.146.0.0/16"),
+    ip_range: Optional[str] = Query(None, description="Source address range, e.g. 45.146.0.10-45.146.3.200"),
     username: Optional[str] = None,
     password: Optional[str] = None,
     attack_type: Optional[str] = None
 ) -> Any:
     """
     Retrieve attack logs with filtering.
+    Pass the X-Next-Cursor / X-Prev-Cursor header value as `cursor` to page
+    without OFFSET scans. `fields` selects only those columns (plus id and
+    timestamp) and skips ORM hydration. since_id / since_timestamp return
+    only rows newer than the client's newest row, newest first, for merging
+    into a page it already holds; X-Delta-Truncated: true means more than
+    `limit` rows were added and the page should be reloaded instead.
     """
-    # Parse start_time
-    parsed_start = parse_date_string(start_time)
-    if parsed_start:
-        # If it was a simple date (no time component), or if we want to ensure full day
-        # we combine with time.min/max. 
-        # Note: if it came from ISO with T00:00:00Z, .date() is safer for naive DB
-        parsed_start = datetime.combine(parsed_start.date(), time.min)
-        
-    # Parse end_time
-    parsed_end = parse_date_string(end_time)
-    if parsed_end:
-        parsed_end = datetime.combine(parsed_end.date(), time.max)
+    parsed_start, parsed_end = parse_day_range(start_time, end_time)
 
     import logging
     logger = logging.getLogger("app.api.v1.data")
@@ -81,33 +106,177 @@ def read_logs(
     filters = AttackLogFilter(
         offset=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        fields=parse_fields(fields),
+        since_id=since_id,
+        since_timestamp=since_timestamp,
         start_time=parsed_start,
         end_time=parsed_end,
         source_ip=source_ip,
+        cidr=cidr,
+        ip_range=ip_range,
         username=username,
         password=password,
         attack_type=attack_type
     )
-    service = AttackLogService(db)
-    logs, total = service.get_logs(filters)
+    service = AsyncAttackLogService(db)
+    logs, total, cursors = await service.get_logs(filters)
+    if filters.fields:
+        return projected_response(logs, cursors, total)
+    set_cursor_headers(response, cursors)
+    set_total_header(response, total)
     return logs
 
+@router.get("/logs/export")
+def export_logs(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    format: Literal["csv", "ndjson", "parquet", "arrow"] = Query("csv", description="csv, ndjson, parquet or arrow"),
+    start_time: Optional[str] = Query(None, description="Start time (e.g. 02/27 or 2026-02-27)"),
+    end_time: Optional[str] = Query(None, description="End time (e.g. 02/28 or 2026-02-28)"),
+    source_ip: Optional[str] = None,
+    cidr: Optional[str] = Query(None, description="Source network, e.g. 45.146.0.0/16"),
+    ip_range: Optional[str] = Query(None, description="Source address range, e.g. 45.146.0.10-45.146.3.200"),
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    attack_type: Optional[str] = None,
+    include_archive: bool = Query(False, description="Also read rows moved to the cold archive by retention")
+) -> Any:
+    """
+    Stream all attack logs matching the read_logs filters as CSV, NDJSON,
+    Parquet or an Arrow IPC stream. Line formats are gzip-encoded when the client
+    accepts it; columnar formats are compressed internally.
+    """
+    columnar = format in ("parquet", "arrow")
+    if columnar and not pyarrow_available():
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow")
+
+    parsed_start, parsed_end = parse_day_range(start_time, end_time)
+    filters = AttackLogFilter(
+        start_time=parsed_start,
+        end_time=parsed_end,
+        source_ip=source_ip,
+        cidr=cidr,
+        ip_range=ip_range,
+        username=username,
+        password=password,
+        attack_type=attack_type
+    )
+    # Malformed filters must fail before the stream starts
+    AttackLogService.ip_filter_clauses(filters)
+
+    def generate():
+        # The stream outlives the request-scoped session, so it owns one
+        export_db = SessionLocal()
+        try:
+            rows = AttackLogService(export_db).iter_export_rows(filters, include_archive)
+            if columnar:
+                yield from iter_columnar(rows, EXPORT_COLUMNS, format)
+            else:
+                encode = iter_csv if format == "csv" else iter_ndjson
+                yield from encode(rows, EXPORT_COLUMNS)
+        finally:
+            export_db.close()
+
+    media_types = {
+        "csv": "text/csv",
+        "ndjson": "application/x-ndjson",
+        "parquet": "application/vnd.apache.parquet",
+        "arrow": "application/vnd.apache.arrow.stream",
+    }
+    filename = f"attack_logs_{datetime.now().strftime('%Y%m%d%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    media_type = media_types[format]
+    body = generate()
+    if not columnar and negotiate_encoding(request.headers.get("accept-encoding", ""), offered=("gzip",)):
+        headers["Content-Encoding"] = "gzip"
+        body = iter_gzip(body)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
 @router.get("/stats/charts")
 def get_stats_charts(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    etag: Optional[str] = Depends(conditional_etag),
+    approximate: bool = Query(False, description="Answer from top-K sketches (items include an error bound)"),
+    day: Optional[str] = Query(None, description="Restrict to one day (e.g. 02/27 or 2026-02-27)")
 ) -> Any:
     """
     Get statistics for charts (Top IPs, Usernames, Passwords).
     Cached for 10 minutes.
     """
+    parsed_day = parse_date_string(day)
     service = AttackLogService(db)
-    return service.get_statistics()
+    return service.get_statistics(approximate=approximate, day=parsed_day.date() if parsed_day else None)
+
+@router.get("/stats/unique")
+def get_stats_unique(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    etag: Optional[str] = Depends(conditional_etag),
+    days: int = Query(7, ge=1, le=366, description="Window ending now, used when start_time is not given"),
+    start_time: Optional[str] = Query(None, description="Start time (e.g. 02/27 or 2026-02-27)"),
+    end_time: Optional[str] = Query(None, description="End time (e.g. 02/28 or 2026-02-28)"),
+    sensor: Optional[str] = None
+) -> Any:
+    """
+    Get approximate unique attacker / username / credential counts (HyperLogLog).
+    Ranges the counters do not cover yet are counted exactly ("approximate": false).
+    """
+    parsed_end = parse_date_string(end_time)
+    end = datetime.combine(parsed_end.date(), time.max) if parsed_end else datetime.now()
+    parsed_start = parse_date_string(start_time)
+    start = datetime.combine(parsed_start.date(), time.min) if parsed_start else end - timedelta(days=days)
+
+    service = AttackLogService(db)
+    return service.get_unique_counts(start, end, sensor=sensor)
+
+@router.get("/stats/daily")
+def get_stats_daily(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    etag: Optional[str] = Depends(conditional_etag),
+    days: int = Query(30, ge=1, le=3660, description="Window ending today, used when start_time is not given"),
+    start_time: Optional[str] = Query(None, description="Start day (e.g. 02/27 or 2026-02-27)"),
+    end_time: Optional[str] = Query(None, description="End day (e.g. 02/28 or 2026-02-28)")
+) -> Any:
+    """
+    Get daily counts per attack type and sensor, including days whose raw
+    logs were already archived by retention.
+    """
+    parsed_end = parse_date_string(end_time)
+    end = parsed_end.date() if parsed_end else datetime.now().date()
+    parsed_start = parse_date_string(start_time)
+    start = parsed_start.date() if parsed_start else end - timedelta(days=days - 1)
+
+    service = AttackLogService(db)
+    return service.get_daily_counts(start, end)
+
+@router.get("/stats/geo")
+def get_stats_geo(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    etag: Optional[str] = Depends(conditional_etag),
+    by: Literal["country", "asn"] = Query("country", description="Group by source country or autonomous system"),
+    limit: int = Query(20, ge=1, le=500),
+    start_time: Optional[str] = Query(None, description="Start time (e.g. 02/27 or 2026-02-27)"),
+    end_time: Optional[str] = Query(None, description="End time (e.g. 02/28 or 2026-02-28)"),
+    attack_type: Optional[str] = None
+) -> Any:
+    """
+    Get attack and unique IP counts per source country or ASN.
+    """
+    parsed_start, parsed_end = parse_day_range(start_time, end_time)
+    filters = AttackLogFilter(start_time=parsed_start, end_time=parsed_end, attack_type=attack_type)
+    service = AttackLogService(db)
+    return service.get_geo_counts(filters, by=by, limit=limit)
 
 @router.get("/stats/summary")
 def get_stats_summary(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    etag: Optional[str] = Depends(conditional_etag)
 ) -> Any:
     """
     Get summary statistics (Most frequent IP, Username, Password).
@@ -116,6 +285,15 @@ def get_stats_summary(
     service = AttackLogService(db)
     return service.get_summary()
 
+@router.get("/stats/cache-metrics")
+def get_stats_cache_metrics(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get this worker's stats cache hit/miss counters and refresh durations.
+    """
+    return cache_metrics.snapshot()
+
 @router.post("/refresh")
 def refresh_stats(
     db: Session = Depends(get_db),
@@ -129,32 +307,37 @@ def refresh_stats(
     return service.refresh_stats()
 
 @router.get("/stats/traffic")
-def get_traffic_analysis(
-    db: Session = Depends(get_db),
+async def get_traffic_analysis(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
+    etag: Optional[str] = Depends(conditional_etag),
     start_time: Optional[str] = Query(None, description="Start time (e.g. 02/27 or 2026-02-27)"),
     end_time: Optional[str] = Query(None, description="End time (e.g. 02/28 or 2026-02-28)"),
     source_ip: Optional[str] = None,
-    attack_type: Optional[str] = None
+    cidr: Optional[str] = Query(None, description="Source network, e.g. 45.146.0.0/16"),
+    ip_range: Optional[str] = Query(None, description="Source address range, e.g. 45.146.0.10-45.146.3.200"),
+    attack_type: Optional[str] = None,
+    granularity: Optional[Literal["minute", "5m", "hour", "day", "week"]] = Query(None, description="Timeline bucket size; chosen from the window when omitted"),
+    since_timestamp: Optional[datetime] = Query(None, description="Only timeline buckets from the one holding this time on (delta refresh)")
 ) -> Any:
     """
     Get detailed traffic analysis statistics (Attack Distribution, Timeline).
-    Supports filtering.
+    Supports filtering. With since_timestamp (usually the client's last
+    bucket) only the timeline from that bucket on is returned, without the
+    distribution; returned buckets replace the client's ones of equal time.
     """
     # Parse dates
-    parsed_start = parse_date_string(start_time)
-    if parsed_start:
-        parsed_start = datetime.combine(parsed_start.date(), time.min)
-        
-    parsed_end = parse_date_string(end_time)
-    if parsed_end:
-        parsed_end = datetime.combine(parsed_end.date(), time.max)
+    parsed_start, parsed_end = parse_day_range(start_time, end_time)
 
     filters = AttackLogFilter(
         start_time=parsed_start,
         end_time=parsed_end,
         source_ip=source_ip,
-        attack_type=attack_type
+        cidr=cidr,
+        ip_range=ip_range,
+        attack_type=attack_type,
+        granularity=granularity,
+        since_timestamp=since_timestamp
     )
-    service = AttackLogService(db)
-    return service.get_traffic_stats(filters)
+    service = AsyncAttackLogService(db)
+    return await service.get_traffic_stats(filters)
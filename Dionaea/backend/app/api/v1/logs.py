@@ -1,42 +1,142 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import Any, List, Optional
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Query, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Literal, Optional
 from datetime import datetime
 
-from app.db.database import get_db
-from app.services.attack_log_service import AttackLogService
-from app.schemas.attack_log import AttackLog, AttackLogFilter
-from app.core.dependencies import get_current_active_user
+from app.db.database import get_async_db, SessionLocal
+from app.services.async_attack_log_service import AsyncAttackLogService
+from app.schemas.attack_log import AttackLog, AttackLogFilter, LiveTailFilter
+from app.services.live_tail import live_tail_hub
+from app.core.config import settings
+from app.core.dependencies import get_current_active_user, is_active, user_from_token
+from app.core.pagination import set_cursor_headers, set_total_header, parse_fields, projected_response
 from app.models.user import User
 
 router = APIRouter()
 
 @router.get("", response_model=List[AttackLog])
-def get_logs(
-    db: Session = Depends(get_db),
+async def get_logs(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor"),
+    include_total: Literal["none", "exact", "estimate"] = Query("none", description="Return X-Total-Count: none, exact or estimate"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. timestamp,source_ip,username"),
+    since_id: Optional[int] = Query(None, description="Only rows after this id (delta refresh)"),
+    since_timestamp: Optional[datetime] = Query(None, description="Only rows after this timestamp, or after (since_timestamp, since_id)"),
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
     source_ip: Optional[str] = None,
+    cidr: Optional[str] = Query(None, description="Source network, e.g. 45.146.0.0/16"),
+    ip_range: Optional[str] = Query(None, description="Source address range, e.g. 45.146.0.10-45.146.3.200"),
     username: Optional[str] = None,
     password: Optional[str] = None,
     attack_type: Optional[str] = None
 ) -> Any:
     """
     Get attack logs with filtering.
+    Pass the X-Next-Cursor / X-Prev-Cursor header value as `cursor` to page
+    without OFFSET scans. `fields` selects only those columns (plus id and
+    timestamp) and skips ORM hydration. since_id / since_timestamp return
+    only rows newer than the client's newest row, newest first, for merging
+    into a page it already holds; X-Delta-Truncated: true means more than
+    `limit` rows were added and the page should be reloaded instead.
     """
     filters = AttackLogFilter(
         offset=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        fields=parse_fields(fields),
+        since_id=since_id,
+        since_timestamp=since_timestamp,
         start_time=start_time,
         end_time=end_time,
         source_ip=source_ip,
+        cidr=cidr,
+        ip_range=ip_range,
         username=username,
         password=password,
         attack_type=attack_type
     )
-    service = AttackLogService(db)
-    logs, total = service.get_logs(filters)
+    service = AsyncAttackLogService(db)
+    logs, total, cursors = await service.get_logs(filters)
+    if filters.fields:
+        return projected_response(logs, cursors, total)
+    set_cursor_headers(response, cursors)
+    set_total_header(response, total)
     return logs
+
+def _authenticate(token: str):
+    db = SessionLocal()
+    try:
+        user = user_from_token(token, db)
+        return user if is_active(user) else None
+    finally:
+        db.close()
+
+@router.websocket("/live")
+async def live_logs(
+    websocket: WebSocket,
+    attack_type: Optional[str] = None,
+    source_ip: Optional[str] = Query(None, description="Address prefix or CIDR"),
+    sensor: Optional[str] = None
+):
+    """
+    Stream newly ingested logs. The first message must be {"token": ...}
+    with an access token, sent within LIVE_TAIL_AUTH_TIMEOUT seconds.
+    Browsers cannot set headers on WebSockets and a query string token
+    would end up in access logs. Then sends {"type": "logs", "rows": [...],
+    "dropped": N}, where dropped counts rows discarded because this client
+    fell behind. Send a JSON object with attack_type / source_ip / sensor
+    at any time to replace the filter.
+    """
+    await websocket.accept()
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), settings.LIVE_TAIL_AUTH_TIMEOUT)
+        token = message.get("token") if isinstance(message, dict) else None
+    except (asyncio.TimeoutError, ValueError, KeyError):
+        token = None
+    except WebSocketDisconnect:
+        return
+    if not isinstance(token, str) or await run_in_threadpool(_authenticate, token) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        subscriber = live_tail_hub.subscribe(LiveTailFilter(attack_type=attack_type, source_ip=source_ip, sensor=sensor))
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+        return
+
+    async def send_rows():
+        while True:
+            rows = await subscriber.queue.get()
+            await websocket.send_json({"type": "logs", "rows": rows, "dropped": subscriber.dropped})
+
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_text()
+            try:
+                subscriber.set_filter(LiveTailFilter(**json.loads(message)))
+            except (ValueError, TypeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json({"type": "filter", "filter": subscriber.filters.model_dump()})
+
+    tasks = [asyncio.create_task(send_rows()), asyncio.create_task(receive_filters())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+        live_tail_hub.unsubscribe(subscriber)
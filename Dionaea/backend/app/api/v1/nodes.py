@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 import json
 import asyncio
 
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.node import Node, NodeHistory
 from app.schemas.node import NodeCreate, NodeUpdate, NodeResponse, NodeStatusUpdate, NodeHistoryResponse
 from app.core.dependencies import get_current_active_user
@@ -53,13 +55,13 @@ def create_node(node: NodeCreate, db: Session = Depends(get_db), current_user: U
     return new_node
 
 @router.get("/", response_model=List[NodeResponse])
-def read_nodes(skip: int = 0, limit: int = 100, group: Optional[str] = None, status: Optional[str] = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    query = db.query(Node)
+async def read_nodes(skip: int = 0, limit: int = 100, group: Optional[str] = None, status: Optional[str] = None, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
+    query = select(Node)
     if group:
         query = query.filter(Node.group == group)
     if status:
         query = query.filter(Node.status == status)
-    return query.offset(skip).limit(limit).all()
+    return (await db.scalars(query.offset(skip).limit(limit))).all()
 
 @router.get("/{node_id}", response_model=NodeResponse)
 def read_node(node_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
@@ -94,8 +96,8 @@ def delete_node(node_id: int, db: Session = Depends(get_db), current_user: User
 
 # Status update endpoint (called by node or monitor)
 @router.post("/{node_id}/status", response_model=NodeResponse)
-async def update_node_status(node_id: int, status_update: NodeStatusUpdate, db: Session = Depends(get_db)):
-    node = db.query(Node).filter(Node.id == node_id).first()
+async def update_node_status(node_id: int, status_update: NodeStatusUpdate, db: AsyncSession = Depends(get_async_db)):
+    node = await db.get(Node, node_id)
     if node is None:
         raise HTTPException(status_code=404, detail="Node not found")
     
@@ -114,8 +116,8 @@ async def update_node_status(node_id: int, status_update: NodeStatusUpdate, db:
     node.cpu_usage_detail = status_update.cpu_usage_detail
     node.last_seen = datetime.utcnow()
     
-    db.commit()
-    db.refresh(node)
+    await db.commit()
+    await db.refresh(node)
     
     # Broadcast update via WebSocket
     await manager.broadcast(json.dumps({
@@ -129,9 +131,11 @@ async def update_node_status(node_id: int, status_update: NodeStatusUpdate, db:
     return node
 
 @router.get("/{node_id}/history", response_model=List[NodeHistoryResponse])
-def read_node_history(node_id: int, limit: int = 50, db: Session = Depends(get_db)):
-    history = db.query(NodeHistory).filter(NodeHistory.node_id == node_id).order_by(NodeHistory.timestamp.desc()).limit(limit).all()
-    return history
+async def read_node_history(node_id: int, limit: int = 50, db: AsyncSession = Depends(get_async_db)):
+    history = await db.scalars(
+        select(NodeHistory).filter(NodeHistory.node_id == node_id).order_by(NodeHistory.timestamp.desc()).limit(limit)
+    )
+    return history.all()
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
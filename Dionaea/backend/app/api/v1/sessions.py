@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from datetime import datetime
+
+from app.db.database import get_db
+from app.services.session_service import AttackSessionService
+from app.schemas.attack_session import AttackSession
+from app.core.dependencies import get_current_active_user
+from app.core.pagination import set_cursor_headers
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("", response_model=List[AttackSession])
+def list_sessions(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    source_ip: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    min_events: int = Query(1, ge=1, description="Only sessions with at least this many events"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor")
+) -> Any:
+    """
+    List attack sessions (bursts of activity from one source IP), newest
+    first. Pages are keyset-paginated via X-Next-Cursor.
+    """
+    service = AttackSessionService(db)
+    sessions, next_cursor = service.list_sessions(
+        source_ip=source_ip, start_time=start_time, end_time=end_time,
+        min_events=min_events, limit=limit, cursor=cursor
+    )
+    set_cursor_headers(response, {"next": next_cursor})
+    return sessions
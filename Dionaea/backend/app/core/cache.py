@@ -0,0 +1,298 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+import redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CacheMetrics:
+    """
+    Process-wide counters for the stale-while-revalidate stats cache, and
+    traffic_* counters for the traffic analysis cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+            self.local_hits = 0
+            self.refreshes = 0
+            self.refresh_errors = 0
+            self.refresh_seconds_total = 0.0
+            self.refresh_seconds_max = 0.0
+            self.refresh_seconds_last = 0.0
+            self.traffic_hits = 0
+            self.traffic_misses = 0
+            self.traffic_local_hits = 0
+            self.traffic_refreshes = 0
+            self.traffic_refresh_seconds_total = 0.0
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_refresh(self, seconds: float):
+        with self._lock:
+            self.refreshes += 1
+            self.refresh_seconds_total += seconds
+            self.refresh_seconds_last = seconds
+            self.refresh_seconds_max = max(self.refresh_seconds_max, seconds)
+
+    def record_traffic_refresh(self, seconds: float):
+        with self._lock:
+            self.traffic_refreshes += 1
+            self.traffic_refresh_seconds_total += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.refresh_seconds_total / self.refreshes if self.refreshes else 0.0
+            traffic_avg = self.traffic_refresh_seconds_total / self.traffic_refreshes if self.traffic_refreshes else 0.0
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "local_hits": self.local_hits,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "refresh_seconds_avg": round(avg, 4),
+                "refresh_seconds_max": round(self.refresh_seconds_max, 4),
+                "refresh_seconds_last": round(self.refresh_seconds_last, 4),
+                "traffic_hits": self.traffic_hits,
+                "traffic_misses": self.traffic_misses,
+                "traffic_local_hits": self.traffic_local_hits,
+                "traffic_refreshes": self.traffic_refreshes,
+                "traffic_refresh_seconds_avg": round(traffic_avg, 4)
+            }
+
+cache_metrics = CacheMetrics()
+
+class LocalTTLCache:
+    """
+    In-process LRU cache with per-entry TTL. Fallback tier that keeps the
+    stats endpoints answering from memory while Redis is slow or down.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # {key: (expires_at, value)}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+local_cache = LocalTTLCache(settings.LOCAL_CACHE_MAX_ENTRIES)
+
+# Bumped by the ingestor after every committed batch; ETags embed it, so
+# new data changes them without waiting for expiry.
+INGEST_GENERATION_KEY = "dionaea:ingest:generation"
+
+def get_ingest_generation(redis_client) -> int:
+    return int(redis_client.get(INGEST_GENERATION_KEY) or 0)
+
+def bump_ingest_generation(redis_client) -> int:
+    return redis_client.incr(INGEST_GENERATION_KEY)
+
+# Time window each cache entry depends on, as "mode|start|cache key" members
+# scored by window end (+inf = open-ended), and by registration time in a
+# second set used for pruning. Ingest events invalidate only the entries
+# whose window overlaps new rows.
+CACHE_WINDOWS_KEY = "dionaea:cache:window_ends"
+CACHE_WINDOWS_REGISTERED_KEY = "dionaea:cache:window_registered"
+INVALIDATE_DELETE = "delete"
+INVALIDATE_STALE = "stale"
+
+def _max_cache_ttl() -> int:
+    return max(settings.TRAFFIC_CACHE_CLOSED_TTL, settings.TRAFFIC_CACHE_OPEN_TTL, settings.STATS_CACHE_HARD_TTL)
+
+def register_cache_window(redis_client, key: str, start: Optional[float], end: Optional[float], mode: str = INVALIDATE_DELETE):
+    """
+    Records that `key` covers [start, end] (epoch seconds, None = unbounded).
+    mode=stale marks stale-while-revalidate entries stale instead of deleting
+    them, so readers keep being served while one worker refreshes.
+    Pass the pipeline that writes the entry so both land in one MULTI and no
+    invalidation can fall between them.
+    """
+    member = f"{mode}|{'' if start is None else repr(start)}|{key}"
+    redis_client.zadd(CACHE_WINDOWS_KEY, {member: float("inf") if end is None else end})
+    redis_client.zadd(CACHE_WINDOWS_REGISTERED_KEY, {member: time.time()})
+
+def _forget_windows(redis_client, members: list):
+    if members:
+        redis_client.zrem(CACHE_WINDOWS_KEY, *members)
+        redis_client.zrem(CACHE_WINDOWS_REGISTERED_KEY, *members)
+
+def prune_cache_windows(redis_client, now: Optional[float] = None) -> int:
+    """
+    Drops windows registered longer ago than the longest cache TTL; their
+    entries have expired whether or not new rows ever overlapped them.
+    """
+    cutoff = (now if now is not None else time.time()) - _max_cache_ttl()
+    expired = redis_client.zrangebyscore(CACHE_WINDOWS_REGISTERED_KEY, "-inf", cutoff)
+    _forget_windows(redis_client, expired)
+    return len(expired)
+
+def invalidate_cache_windows(redis_client, start: float, end: float) -> int:
+    """
+    Invalidates registered entries overlapping [start, end]; returns how many.
+    Only windows ending at or after `start` are read. Windows whose entry is
+    gone are dropped; stale-mode ones stay registered while their entry lives.
+    """
+    prune_cache_windows(redis_client)
+    invalidated = 0
+    forget = []
+    for member in redis_client.zrangebyscore(CACHE_WINDOWS_KEY, start, "+inf"):
+        mode, w_start, key = member.split("|", 2)
+        if w_start and float(w_start) > end:
+            continue
+
+        if mode == INVALIDATE_STALE:
+            raw = redis_client.get(key)
+            if raw:
+                envelope = json.loads(raw)
+                envelope["refreshed_at"] = 0
+                redis_client.set(key, json.dumps(envelope), keepttl=True)
+                invalidated += 1
+                continue
+        elif redis_client.delete(key):
+            invalidated += 1
+        forget.append(member)
+    _forget_windows(redis_client, forget)
+    return invalidated
+
+class StaleWhileRevalidateCache:
+    """
+    Redis-backed JSON cache with a soft and a hard TTL.
+
+    - younger than soft_ttl: served as-is
+    - between soft_ttl and hard_ttl: served stale while exactly one worker
+      (holder of a Redis lock) recomputes it in a background thread
+    - missing: one worker computes it, concurrent callers wait for that
+      result instead of recomputing
+    """
+
+    def __init__(self, redis_client, soft_ttl: int, hard_ttl: int, lock_timeout: int = 60, window: Optional[tuple] = None):
+        self.redis_client = redis_client
+        # (start, end) epoch seconds the cached data covers; registers the
+        # entry for ingest-driven invalidation
+        self.window = window
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.lock_timeout = lock_timeout
+
+    def _lock(self, key: str):
+        # thread_local=False: a background thread releases the lock taken by the request thread
+        return self.redis_client.lock(f"{key}:lock", timeout=self.lock_timeout, thread_local=False)
+
+    def _read(self, key: str) -> Optional[dict]:
+        raw = self.redis_client.get(key)
+        if not raw:
+            return None
+        envelope = json.loads(raw)
+        if not isinstance(envelope, dict) or "refreshed_at" not in envelope:
+            return None
+        return envelope
+
+    def _compute_and_store(self, key: str, compute: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            value = compute()
+        except Exception:
+            cache_metrics.incr("refresh_errors")
+            raise
+        cache_metrics.record_refresh(time.perf_counter() - started)
+        envelope = {"value": value, "refreshed_at": time.time()}
+        pipe = self.redis_client.pipeline()
+        pipe.setex(key, self.hard_ttl, json.dumps(envelope))
+        if self.window is not None:
+            register_cache_window(pipe, key, *self.window, mode=INVALIDATE_STALE)
+        pipe.execute()
+        return value
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any], lock):
+        def run():
+            try:
+                self._compute_and_store(key, compute)
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {e}")
+            finally:
+                try:
+                    lock.release()
+                except redis.exceptions.LockError:
+                    pass
+
+        threading.Thread(target=run, name=f"cache-refresh:{key}", daemon=True).start()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], background_compute: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        `compute` runs on the caller's thread. `background_compute` (default:
+        `compute`) runs on the refresh thread, so it must not reuse a
+        request-scoped DB session.
+        """
+        envelope = self._read(key)
+        if envelope:
+            if time.time() - envelope["refreshed_at"] < self.soft_ttl:
+                cache_metrics.incr("hits")
+                return envelope["value"]
+
+            cache_metrics.incr("stale_hits")
+            lock = self._lock(key)
+            if lock.acquire(blocking=False):
+                self._refresh_in_background(key, background_compute or compute, lock)
+            return envelope["value"]
+
+        cache_metrics.incr("misses")
+        lock = self._lock(key)
+        if lock.acquire(blocking=True, blocking_timeout=self.lock_timeout):
+            try:
+                # Another worker may have filled it while we waited for the lock
+                envelope = self._read(key)
+                if envelope:
+                    return envelope["value"]
+                return self._compute_and_store(key, compute)
+            finally:
+                try:
+                    lock.release()
+                except redis.exceptions.LockError:
+                    pass
+
+        # Lock holder took too long; compute ourselves rather than fail
+        return self._compute_and_store(key, compute)
+
+    def refresh(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Recomputes synchronously regardless of age.
+        """
+        return self._compute_and_store(key, compute)
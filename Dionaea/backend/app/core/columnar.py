@@ -0,0 +1,118 @@
+from typing import Iterable, Iterator, Optional, Sequence
+from app.core.config import settings
+
+# Repetitive attack_logs columns stored dictionary-encoded
+DICTIONARY_COLUMNS = ("source_ip", "username", "password", "attack_type", "sensor_name", "country_code")
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)")
+    return pyarrow
+
+def columnar_schema(columns: Sequence[str]):
+    pa = _require_pyarrow()
+    types = {
+        "id": pa.int64(),
+        "timestamp": pa.timestamp("us"),
+        "target_port": pa.int32(),
+        "asn": pa.int64(),
+        "raw_log": pa.string(),
+    }
+    fields = []
+    for name in columns:
+        if name in DICTIONARY_COLUMNS:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(name, types.get(name, pa.string())))
+    return pa.schema(fields)
+
+def _batches(rows: Iterable[Sequence], schema, row_group_size: int):
+    pa = _require_pyarrow()
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= row_group_size:
+            yield _to_batch(pa, chunk, schema)
+            chunk = []
+    if chunk:
+        yield _to_batch(pa, chunk, schema)
+
+def _to_batch(pa, chunk, schema):
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in chunk]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class _ChunkSink:
+    """
+    Write-only file object that hands out what was written since the last
+    drain, so a columnar file can be streamed while it is produced.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+def iter_columnar(rows: Iterable[Sequence], columns: Sequence[str], fmt: str = "parquet", row_group_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Encodes rows as a Parquet file (one row group per batch) or an Arrow IPC
+    stream, yielding bytes after every batch so memory stays bounded by
+    row_group_size (default COLUMNAR_ROW_GROUP_SIZE).
+    """
+    row_group_size = row_group_size or settings.COLUMNAR_ROW_GROUP_SIZE
+    pa = _require_pyarrow()
+    schema = columnar_schema(columns)
+    sink = _ChunkSink()
+    stream = pa.PythonFile(sink, mode="w")
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(stream, schema, compression="zstd", use_dictionary=list(set(DICTIONARY_COLUMNS) & set(columns)))
+    else:
+        # Stream format: unlike the IPC file format it allows each batch to
+        # carry its own dictionary
+        writer = pa.ipc.new_stream(stream, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    for batch in _batches(rows, schema, row_group_size):
+        if fmt == "parquet":
+            writer.write_batch(batch, row_group_size=row_group_size)
+        else:
+            writer.write_batch(batch)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,161 @@
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is used on its own without it
+    brotli = None
+
+# Responses that are already compressed, or must reach the client unbuffered
+SKIPPED_MEDIA_TYPES = (
+    "text/event-stream",
+    "application/vnd.apache.parquet",
+    "application/vnd.apache.arrow.stream",
+)
+
+def _accepted(accept_encoding: str) -> dict:
+    """
+    {coding: q} from an Accept-Encoding header.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+def negotiate_encoding(accept_encoding: str, offered: tuple = ("br", "gzip")) -> Optional[str]:
+    """
+    Picks the first of `offered` the client accepts with q > 0 (br only
+    when the brotli package is installed), or None.
+    """
+    accepted = _accepted(accept_encoding)
+    for coding in offered:
+        if coding == "br" and brotli is None:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0:
+            return coding
+    return None
+
+class _Encoder:
+    """
+    Incremental gzip/brotli encoder; flush() emits everything compressed so
+    far so streamed chunks reach the client without waiting for the end.
+    """
+
+    def __init__(self, coding: str, level: int):
+        self.coding = coding
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.coding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.finish() if final else self._compressor.flush())
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least `minimum_size` bytes with brotli or gzip,
+    as negotiated from Accept-Encoding. Responses that set their own
+    Content-Encoding (the log export) and SKIPPED_MEDIA_TYPES pass through.
+    Strong ETags get the coding appended ("<tag>-gzip"), so each
+    representation keeps a distinct validator.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self.app, coding, self.minimum_size, self.level)
+        await responder(scope, receive, send)
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, coding: str, minimum_size: int, level: int):
+        self.app = app
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").split(";")[0].strip()
+            self.passthrough = "content-encoding" in headers or media_type in SKIPPED_MEDIA_TYPES
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.coding, self.level)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and etag.startswith('"'):
+                headers["ETag"] = f'{etag[:-1]}-{self.coding}"'
+            if more_body:
+                del headers["Content-Length"]
+                await self.send(start)
+            else:
+                body = self.encoder.compress(body, final=True)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
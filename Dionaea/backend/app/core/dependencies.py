@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
@@ -10,27 +11,44 @@ from app.schemas.auth import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def user_from_token(token: str, db: Session) -> Optional[User]:
+    """
+    The user a bearer token was issued to, or None if it is invalid.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    token_data = TokenData(username=username)
+    return UserService.get_by_username(db, username=token_data.username)
+
+def is_active(user: Optional[User]) -> bool:
+    return user is not None and user.status == "active"
+
+# Plain def: FastAPI runs it in the threadpool, so the sync user lookup
+# doesn't block the event loop serving async endpoints
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-        
-    user = UserService.get_by_username(db, username=token_data.username)
+    user = user_from_token(token, db)
     if user is None:
         raise credentials_exception
+    # End the read transaction so the pooled connection isn't held while an
+    # async endpoint awaits its own engine; keep `user` loaded for callers
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = True
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    if current_user.status != "active":
+    if not is_active(current_user):
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
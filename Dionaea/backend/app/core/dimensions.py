@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.dimension import DIMENSION_MODELS
+
+# session.info key: (database, dimension, value) inserted by the open transaction
+UNCOMMITTED_KEYS = "dimension_uncommitted_keys"
+
+# Values per SELECT ... IN (...) lookup
+LOOKUP_CHUNK = 500
+
+def _insert_missing(model, dialect: str):
+    """
+    INSERT of new dimension values that skips values a concurrent writer
+    already inserted.
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=["value"])
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=["value"])
+    return insert(model)
+
+class DimensionKeyCache:
+    """
+    Process-wide value -> surrogate key map per database and dimension,
+    LRU-bounded to DIMENSION_KEY_CACHE_SIZE entries each. Misses cost one
+    SELECT per dimension and batch, values seen for the first time one
+    INSERT. Keys inserted by a transaction that rolls back are evicted again.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._keys: Dict[Tuple[str, str], OrderedDict] = defaultdict(OrderedDict)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _database(db: Session) -> str:
+        return str(db.get_bind().url)
+
+    def resolve(self, db: Session, name: str, values: Iterable[str]) -> Dict[str, int]:
+        """
+        {value: key} for the non-None values, creating missing dimension rows.
+        """
+        keys, missing = {}, []
+        with self._lock:
+            cache = self._keys[(self._database(db), name)]
+            for value in set(v for v in values if v is not None):
+                if value in cache:
+                    cache.move_to_end(value)
+                    keys[value] = cache[value]
+                else:
+                    missing.append(value)
+        if not missing:
+            return keys
+
+        model = DIMENSION_MODELS[name]
+        with db.no_autoflush:
+            found = self._lookup(db, model, missing)
+            new = [v for v in missing if v not in found]
+            if new:
+                dialect = db.get_bind().dialect.name
+                db.execute(_insert_missing(model, dialect), [{"value": v} for v in new])
+                found.update(self._lookup(db, model, new))
+                database = self._database(db)
+                db.info.setdefault(UNCOMMITTED_KEYS, []).extend((database, name, v) for v in new)
+
+        with self._lock:
+            for value, key in found.items():
+                cache[value] = key
+                cache.move_to_end(value)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+        keys.update(found)
+        return keys
+
+    @staticmethod
+    def _lookup(db: Session, model, values: List[str]) -> Dict[str, int]:
+        found = {}
+        for i in range(0, len(values), LOOKUP_CHUNK):
+            chunk = values[i:i + LOOKUP_CHUNK]
+            found.update(db.execute(select(model.value, model.id).where(model.value.in_(chunk))).all())
+        return found
+
+    def labels(self, db: Session, name: str, keys: Iterable[int]) -> Dict[int, str]:
+        """
+        {key: value} for dimension keys, e.g. to label a GROUP BY over keys.
+        """
+        model = DIMENSION_MODELS[name]
+        keys = [k for k in set(keys) if k is not None]
+        found = {}
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[i:i + LOOKUP_CHUNK]
+            found.update(db.execute(select(model.id, model.value).where(model.id.in_(chunk))).all())
+        return found
+
+    def assign(self, db: Session, entries: Iterable):
+        """
+        Sets <dimension>_id on entries whose string attributes were assigned
+        since their last flush, one resolve() per dimension for the batch.
+        """
+        pending = defaultdict(list)
+        for entry in entries:
+            for name, value in (entry.__dict__.get("_dimension_labels") or {}).items():
+                if value is not None and getattr(entry, f"{name}_id") is None:
+                    pending[name].append(entry)
+        for name, batch in pending.items():
+            keys = self.resolve(db, name, [e._dimension_labels[name] for e in batch])
+            for entry in batch:
+                setattr(entry, f"{name}_id", keys[entry._dimension_labels[name]])
+
+    def forget(self, entries: Iterable[Tuple[str, str, str]]):
+        with self._lock:
+            for database, name, value in entries:
+                self._keys[(database, name)].pop(value, None)
+
+    def clear(self):
+        with self._lock:
+            for cache in self._keys.values():
+                cache.clear()
+
+dimension_keys = DimensionKeyCache(settings.DIMENSION_KEY_CACHE_SIZE)
+
+@event.listens_for(Session, "before_flush")
+def _assign_dimension_keys(session, flush_context, instances):
+    entries = [obj for obj in (*session.new, *session.dirty) if obj.__dict__.get("_dimension_labels")]
+    if entries:
+        dimension_keys.assign(session, entries)
+
+@event.listens_for(Session, "after_commit")
+def _keep_dimension_keys(session):
+    session.info.pop(UNCOMMITTED_KEYS, None)
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_rolled_back_keys(session, transaction):
+    # Still present at the end of the outermost transaction = not committed
+    if transaction.parent is None:
+        rolled_back = session.info.pop(UNCOMMITTED_KEYS, None)
+        if rolled_back:
+            dimension_keys.forget(rolled_back)
+
+def _clear_dimension_keys(target, connection, **kw):
+    # Keys of a dropped (e.g. test) dimension table would point at nothing
+    dimension_keys.clear()
+
+for _model in DIMENSION_MODELS.values():
+    event.listen(_model.__table__, "after_drop", _clear_dimension_keys)
@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence
+
+# Rows buffered before a chunk is handed to the response
+EXPORT_CHUNK_ROWS = 1000
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def iter_csv(rows: Iterable[Sequence], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_cell(v) for v in row])
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def iter_ndjson(rows: Iterable[Sequence], columns: Sequence[str]) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({c: _cell(v) for c, v in zip(columns, row)}, ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip-compresses a byte stream incrementally (constant memory).
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,211 @@
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from app.core.config import settings
+from app.core.ip_match import pack_ip, parse_ip
+
+logger = logging.getLogger(__name__)
+
+# Index file: header, then four column arrays of `count` entries each:
+# range starts and ends (16-byte packed addresses, as in app.core.ip_match),
+# country codes (2 ASCII bytes, blank if unknown) and ASNs (big-endian
+# uint32, 0 if unknown), then a JSON object of AS names keyed by ASN
+MAGIC = b"DGEOIP1\x00"
+HEADER = struct.Struct(">8sII")
+ADDRESS_SIZE = 16
+COUNTRY_SIZE = 2
+ASN = struct.Struct(">I")
+
+class GeoInfo(NamedTuple):
+    country_code: Optional[str]
+    asn: Optional[int]
+
+UNKNOWN = GeoInfo(None, None)
+
+class GeoIPRange(NamedTuple):
+    start: str
+    end: str
+    country_code: Optional[str]
+    asn: Optional[int]
+    as_name: Optional[str] = None
+
+def write_index(ranges: Iterable[GeoIPRange], path: str) -> int:
+    """
+    Writes `ranges` as an index file at `path` and returns the number of
+    ranges kept. Ranges are sorted by start; one that overlaps the previous
+    range or mixes address families is skipped.
+    """
+    packed = []
+    names: Dict[int, str] = {}
+    for r in ranges:
+        start, end = parse_ip(r.start), parse_ip(r.end)
+        if start is None or end is None or start.version != end.version or start > end:
+            continue
+        packed.append((pack_ip(start), pack_ip(end), (r.country_code or "").upper()[:COUNTRY_SIZE], r.asn or 0))
+        if r.asn and r.as_name:
+            names[r.asn] = r.as_name
+    packed.sort()
+
+    kept, last_end = [], None
+    for entry in packed:
+        if last_end is not None and entry[0] <= last_end:
+            continue
+        kept.append(entry)
+        last_end = entry[1]
+    if len(kept) < len(packed):
+        logger.warning(f"Skipped {len(packed) - len(kept)} overlapping GeoIP ranges")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        encoded_names = json.dumps({str(k): v for k, v in names.items()}, separators=(",", ":")).encode()
+        f.write(HEADER.pack(MAGIC, len(kept), len(encoded_names)))
+        f.write(b"".join(e[0] for e in kept))
+        f.write(b"".join(e[1] for e in kept))
+        f.write(b"".join(e[2].encode("ascii").ljust(COUNTRY_SIZE) for e in kept))
+        f.write(b"".join(ASN.pack(e[3]) for e in kept))
+        f.write(encoded_names)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(kept)
+
+def read_ip2asn(path: str) -> Iterator[GeoIPRange]:
+    """
+    Ranges from an iptoasn.com style table (range_start, range_end,
+    AS_number, country_code, AS_description; tab or comma separated).
+    Unrouted ranges (AS 0) are skipped.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        sample = f.readline()
+        f.seek(0)
+        reader = csv.reader(f, delimiter="\t" if "\t" in sample else ",")
+        for row in reader:
+            if len(row) < 4 or not row[2].isdigit() or row[2] == "0":
+                continue
+            country = row[3] if row[3] not in ("None", "") else None
+            yield GeoIPRange(row[0], row[1], country, int(row[2]), row[4] if len(row) > 4 else None)
+
+class GeoIPIndex:
+    """
+    Country / ASN lookup over a local range index. The file is memory-mapped
+    and searched in place (binary search over the sorted range starts), so
+    opening it is instant and its pages are shared between processes.
+    Results are kept per address in an LRU of GEOIP_CACHE_SIZE entries.
+    """
+
+    def __init__(self, path: str, cache_size: int = 100000):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, names_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a GeoIP index")
+        self._starts = HEADER.size
+        self._ends = self._starts + self.count * ADDRESS_SIZE
+        self._countries = self._ends + self.count * ADDRESS_SIZE
+        self._asns = self._countries + self.count * COUNTRY_SIZE
+        names_at = self._asns + self.count * ASN.size
+        if len(self._mm) != names_at + names_size:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+        self._names = {int(k): v for k, v in json.loads(self._mm[names_at:names_at + names_size] or b"{}").items()}
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._mm.close()
+
+    def _start(self, i: int) -> bytes:
+        offset = self._starts + i * ADDRESS_SIZE
+        return self._mm[offset:offset + ADDRESS_SIZE]
+
+    def _search(self, key: bytes) -> GeoInfo:
+        # Last range starting at or before key
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._start(mid) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        i = lo - 1
+        if i < 0:
+            return UNKNOWN
+        end_at = self._ends + i * ADDRESS_SIZE
+        if self._mm[end_at:end_at + ADDRESS_SIZE] < key:
+            return UNKNOWN
+        country_at = self._countries + i * COUNTRY_SIZE
+        country = self._mm[country_at:country_at + COUNTRY_SIZE].decode("ascii").strip()
+        (asn,) = ASN.unpack_from(self._mm, self._asns + i * ASN.size)
+        return GeoInfo(country or None, asn or None)
+
+    def lookup(self, ip) -> GeoInfo:
+        """
+        (country_code, asn) for an address; UNKNOWN for anything not covered.
+        """
+        address = parse_ip(ip)
+        if address is None:
+            return UNKNOWN
+        key = str(address)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        info = self._search(pack_ip(address))
+        with self._lock:
+            self._cache[key] = info
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return info
+
+    def as_name(self, asn: Optional[int]) -> Optional[str]:
+        return self._names.get(asn) if asn else None
+
+_index: Optional[GeoIPIndex] = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+def get_geoip_index() -> Optional[GeoIPIndex]:
+    """
+    Process-wide index opened from GEOIP_INDEX_PATH on first use; None if
+    the file is missing or unreadable (enrichment is then skipped).
+    """
+    global _index, _index_loaded
+    if _index_loaded:
+        return _index
+    with _index_lock:
+        if not _index_loaded:
+            path = settings.GEOIP_INDEX_PATH
+            if path and os.path.exists(path):
+                try:
+                    _index = GeoIPIndex(path, settings.GEOIP_CACHE_SIZE)
+                    logger.info(f"Loaded GeoIP index {path} ({_index.count} ranges)")
+                except (OSError, ValueError) as e:
+                    logger.error(f"GeoIP index unavailable: {e}")
+            else:
+                logger.info("No GeoIP index configured, country/ASN enrichment disabled")
+            _index_loaded = True
+    return _index
+
+def enrich(entries: Iterable, index: Optional[GeoIPIndex]) -> Tuple[int, int]:
+    """
+    Sets country_code / asn on each entry from its source_ip. Returns
+    (entries, entries resolved).
+    """
+    total = resolved = 0
+    if index is None:
+        return total, resolved
+    for entry in entries:
+        total += 1
+        info = index.lookup(entry.source_ip)
+        entry.country_code, entry.asn = info
+        if info != UNKNOWN:
+            resolved += 1
+    return total, resolved
@@ -0,0 +1,70 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+from fastapi import HTTPException, Request, Response
+from app.core.cache import get_ingest_generation
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Suffixes CompressionMiddleware appends to the ETag of encoded representations
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+def build_etag(request: Request, generation: int, epoch: int) -> str:
+    """
+    Strong ETag for a dashboard read: the ingest generation (bumped after every
+    committed batch), the time epoch (bounds how long open-ended windows and
+    refreshed cache entries keep one tag) and the request path and query.
+    """
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode("utf-8")).hexdigest()[:16]
+    return f'"g{generation}-e{epoch}-{digest}"'
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    The If-None-Match candidate that matches `etag` (with or without an
+    encoding suffix), or None.
+    """
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        base = candidate
+        for suffix in ENCODING_SUFFIXES:
+            if base.endswith(f'{suffix}"'):
+                base = base[:-len(suffix) - 1] + '"'
+        if base == etag:
+            return candidate
+    return None
+
+def conditional_etag(request: Request, response: Response) -> Optional[str]:
+    """
+    Dependency for cached dashboard reads, declared after authentication.
+    Answers 304 Not Modified before the endpoint runs any query when the
+    client's If-None-Match still matches; otherwise sets ETag on the response.
+    Without Redis there is no generation to validate against and no ETag.
+    """
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+    try:
+        generation = get_ingest_generation(redis_client)
+    except Exception as e:
+        logger.warning(f"ETag generation lookup failed: {e}")
+        return None
+
+    epoch = int(time.time() // settings.ETAG_MAX_AGE)
+    etag = build_etag(request, generation, epoch)
+    headers = {"Cache-Control": "private, no-cache"}
+    matched = matching_etag(request.headers.get("if-none-match"), etag)
+    if matched:
+        headers["ETag"] = matched
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers["ETag"] = etag
+    response.headers.update(headers)
+    return etag
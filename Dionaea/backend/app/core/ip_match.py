@@ -0,0 +1,153 @@
+import ipaddress
+from typing import Optional, Tuple, Union
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import String
+
+IPAddressValue = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+# SQLite stores addresses as 16 big-endian bytes (IPv4 mapped into IPv6), so
+# BLOB comparison orders them like the 128-bit integers they are
+_IPV4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+
+def parse_ip(value) -> Optional[IPAddressValue]:
+    """
+    The address in `value` (str or ipaddress object), or None if it is not one.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+        return value
+    try:
+        return ipaddress.ip_address(str(value).strip())
+    except ValueError:
+        return None
+
+def normalize_ip(value) -> Optional[str]:
+    address = parse_ip(value)
+    return str(address) if address is not None else None
+
+def pack_ip(address: IPAddressValue) -> bytes:
+    if address.version == 4:
+        return _IPV4_MAPPED_PREFIX + address.packed
+    return address.packed
+
+def unpack_ip(packed: bytes) -> IPAddressValue:
+    packed = bytes(packed)
+    if packed.startswith(_IPV4_MAPPED_PREFIX):
+        return ipaddress.IPv4Address(packed[len(_IPV4_MAPPED_PREFIX):])
+    return ipaddress.IPv6Address(packed)
+
+def sqlite_ip_text(packed) -> Optional[str]:
+    """
+    SQLite ip_text() function: packed address back to its text form.
+    """
+    if packed is None:
+        return None
+    try:
+        return str(unpack_ip(packed))
+    except ValueError:
+        return None
+
+class ip_text(FunctionElement):
+    """
+    Text form of an address column, for substring filters: host() on
+    PostgreSQL, the ip_text() function registered on SQLite connections.
+    """
+    type = String()
+    inherit_cache = True
+    name = "ip_text"
+
+@compiles(ip_text)
+def _ip_text_default(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+@compiles(ip_text, "postgresql")
+def _ip_text_postgresql(element, compiler, **kw):
+    return f"host({compiler.process(element.clauses, **kw)})"
+
+@compiles(ip_text, "sqlite")
+def _ip_text_sqlite(element, compiler, **kw):
+    return f"ip_text({compiler.process(element.clauses, **kw)})"
+
+def parse_cidr(value: str):
+    """
+    Network for a cidr= filter. Raises ValueError if malformed.
+    """
+    return ipaddress.ip_network(value.strip(), strict=False)
+
+def parse_ip_range(value: str) -> Tuple[IPAddressValue, IPAddressValue]:
+    """
+    (first, last) of an ip_range= filter written "first-last".
+    Raises ValueError if malformed, mixed-family or reversed.
+    """
+    first, sep, last = value.partition("-")
+    if not sep:
+        raise ValueError(f"Invalid IP range (expected first-last): {value}")
+    first, last = ipaddress.ip_address(first.strip()), ipaddress.ip_address(last.strip())
+    if first.version != last.version:
+        raise ValueError(f"IP range mixes IPv4 and IPv6: {value}")
+    if first > last:
+        raise ValueError(f"IP range is reversed: {value}")
+    return first, last
+
+def ip_range_clause(column, first: IPAddressValue, last: IPAddressValue):
+    """
+    first <= column <= last: an index range scan over INET (PostgreSQL) or
+    packed (SQLite) addresses.
+    """
+    return column.between(str(first), str(last))
+
+def cidr_clause(column, network):
+    """
+    Range clause for a network, or None for a match-all /0.
+    """
+    if network.prefixlen == 0:
+        return None
+    return ip_range_clause(column, network.network_address, network.broadcast_address)
+
+def ip_filter_clause(column, value: str):
+    """
+    Builds the WHERE clause for a source_ip filter.
+    - a full address becomes an equality (btree index)
+    - a CIDR becomes a network..broadcast range (btree index range scan)
+    - anything else keeps the historical substring match on the text form
+    Returns None if the filter matches everything (0.0.0.0/0).
+    """
+    value = value.strip()
+    try:
+        return column == str(ipaddress.ip_address(value))
+    except ValueError:
+        pass
+
+    if "/" in value:
+        try:
+            return cidr_clause(column, parse_cidr(value))
+        except ValueError:
+            pass
+
+    return ip_text(column).contains(value)
+
+def ip_matches(address: str, value: str) -> bool:
+    """
+    Python twin of ip_filter_clause, for rows read back from the archive.
+    """
+    if address is None:
+        return False
+    value = value.strip()
+    try:
+        return address == str(ipaddress.ip_address(value))
+    except ValueError:
+        pass
+
+    if "/" in value:
+        try:
+            network = ipaddress.ip_network(value, strict=False)
+            return ipaddress.ip_address(address) in network
+        except ValueError:
+            pass
+    return value in address
+
+def ip_in_range(address: str, first: IPAddressValue, last: IPAddressValue) -> bool:
+    parsed = parse_ip(address)
+    return parsed is not None and parsed.version == first.version and first <= parsed <= last
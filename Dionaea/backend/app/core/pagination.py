@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+import orjson
+from fastapi import Response
+
+# Keyset pagination over (timestamp, id).
+# Cursors are opaque to clients: base64url-encoded JSON holding the boundary
+# row of the page and the direction to seek in from it.
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+def encode_cursor(timestamp: datetime, row_id: int, direction: str = CURSOR_NEXT) -> str:
+    payload = json.dumps({"t": timestamp.isoformat(), "i": row_id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[datetime, int, str]:
+    """
+    Decodes a cursor produced by encode_cursor.
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        timestamp = datetime.fromisoformat(payload["t"])
+        row_id = int(payload["i"])
+        direction = payload.get("d", CURSOR_NEXT)
+    except (ValueError, KeyError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+    if direction not in (CURSOR_NEXT, CURSOR_PREV):
+        raise ValueError(f"Invalid cursor direction: {direction}")
+    return timestamp, row_id, direction
+
+def encode_sort_cursor(sort: str, value, row_id: int) -> str:
+    """
+    Cursor for keyset pages ordered by (sort column, id) rather than (timestamp, id).
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_sort_cursor(token: str, sort: str) -> Tuple[object, int]:
+    """
+    (value, id) from an encode_sort_cursor token; datetime values come back as
+    ISO strings. Raises ValueError if malformed or issued for another sort.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value, row_id, cursor_sort = payload["v"], int(payload["i"]), payload["s"]
+    except (ValueError, KeyError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort={cursor_sort}")
+    return value, row_id
+
+def set_cursor_headers(response, cursors: dict):
+    """
+    Exposes page cursors as response headers so the list body stays a plain array.
+    """
+    if cursors.get("next"):
+        response.headers["X-Next-Cursor"] = cursors["next"]
+    if cursors.get("prev"):
+        response.headers["X-Prev-Cursor"] = cursors["prev"]
+    if cursors.get("truncated"):
+        response.headers["X-Delta-Truncated"] = "true"
+
+def set_total_header(response, total):
+    """
+    Exposes the include_total result; estimates are strings such as "~120000" or "10000+".
+    """
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Splits a comma-separated fields= parameter; None/empty means all fields.
+    """
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    return fields or None
+
+def projected_response(rows, cursors: dict, total) -> Response:
+    """
+    Serializes projected Core rows with orjson, skipping ORM hydration and
+    response-model validation.
+    """
+    response = Response(orjson.dumps([row._asdict() for row in rows]), media_type="application/json")
+    set_cursor_headers(response, cursors)
+    set_total_header(response, total)
+    return response
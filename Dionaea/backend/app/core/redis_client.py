@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from typing import Optional
+import redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive Redis failures; while open, callers
+    skip Redis entirely for `cooldown` seconds instead of paying connect
+    timeouts on every request. After the cooldown exactly one caller gets a
+    trial; its success closes the circuit and its failure re-opens it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # Set while the half-open trial is in flight
+        self.trial_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.cooldown:
+                return False
+            # A trial that never reported back is given up after another cooldown
+            if self.trial_started_at is not None and now - self.trial_started_at < self.cooldown:
+                return False
+            self.trial_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_started_at is not None:
+                self.opened_at = time.monotonic()
+                self.trial_started_at = None
+                logger.warning(f"Redis trial failed, circuit re-opened for {self.cooldown}s")
+            elif self.failures >= self.threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                logger.warning(f"Redis circuit opened for {self.cooldown}s after {self.failures} failures")
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+class GuardedPipeline:
+    """
+    Proxy over a redis-py pipeline: failures of execute() or of WATCH-mode
+    immediate commands count towards the breaker, a successful execute()
+    closes it. WatchError is a lost optimistic race, not an outage.
+    """
+
+    def __init__(self, pipeline, breaker: CircuitBreaker):
+        self._pipeline = pipeline
+        self._breaker = breaker
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._pipeline.reset()
+
+    def __getattr__(self, name):
+        attr = getattr(self._pipeline, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except redis.WatchError:
+                raise
+            except redis.RedisError:
+                self._breaker.record_failure()
+                raise
+            if name == "execute":
+                self._breaker.record_success()
+            # Queued commands return the pipeline itself; keep callers on the proxy
+            return self if result is self._pipeline else result
+
+        return call
+
+class GuardedRedis:
+    """
+    Thin proxy over a redis.Redis client that reports command outcomes to the
+    circuit breaker. Errors are re-raised unchanged.
+    """
+
+    def __init__(self, client: redis.Redis, breaker: CircuitBreaker):
+        self._client = client
+        self._breaker = breaker
+
+    def pipeline(self, *args, **kwargs) -> GuardedPipeline:
+        return GuardedPipeline(self._client.pipeline(*args, **kwargs), self._breaker)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name in ("lock", "pubsub"):
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except redis.RedisError:
+                self._breaker.record_failure()
+                raise
+            self._breaker.record_success()
+            return result
+
+        return call
+
+_pool: Optional[redis.ConnectionPool] = None
+_client: Optional[GuardedRedis] = None
+_pool_lock = threading.Lock()
+breaker = CircuitBreaker(settings.REDIS_BREAKER_THRESHOLD, settings.REDIS_BREAKER_COOLDOWN)
+
+def get_redis() -> Optional[GuardedRedis]:
+    """
+    Returns the process-wide Redis client, created lazily on first use over a
+    shared connection pool, or None while the circuit breaker is open.
+    """
+    global _pool, _client
+    if not breaker.allow():
+        return None
+    if _client is None:
+        with _pool_lock:
+            if _client is None:
+                try:
+                    _pool = redis.ConnectionPool.from_url(
+                        settings.REDIS_URL,
+                        decode_responses=True,
+                        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                        socket_timeout=settings.REDIS_SOCKET_TIMEOUT
+                    )
+                    _client = GuardedRedis(redis.Redis(connection_pool=_pool), breaker)
+                except Exception as e:
+                    logger.error(f"Failed to create Redis pool: {e}")
+                    return None
+    return _client
@@ -0,0 +1,100 @@
+import hashlib
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch (Metwally et al.).
+
+    Keeps at most `capacity` counters. Every reported count over-estimates the
+    true frequency by at most its `error`, and any item with true frequency
+    above total / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int, counters: Optional[Dict[str, List[int]]] = None, total: int = 0):
+        self.capacity = capacity
+        self.counters = counters or {}  # {item: [count, error]}
+        self.total = total
+
+    def update(self, item: str, weight: int = 1):
+        self.total += weight
+        if item in self.counters:
+            self.counters[item][0] += weight
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0]
+            return
+
+        # Evict the smallest counter; the newcomer inherits its count as error
+        victim = min(self.counters, key=lambda k: self.counters[k][0])
+        floor = self.counters.pop(victim)[0]
+        self.counters[item] = [floor + weight, floor]
+
+    def update_many(self, items: Iterable[str]):
+        for item in items:
+            self.update(item)
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """
+        Returns up to n (item, count, error) tuples, largest count first.
+        """
+        ranked = sorted(self.counters.items(), key=lambda kv: kv[1][0], reverse=True)
+        return [(item, count, error) for item, (count, error) in ranked[:n]]
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "total": self.total, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpaceSaving":
+        return cls(data["capacity"], {k: list(v) for k, v in data["counters"].items()}, data.get("total", 0))
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter (Flajolet et al.) over 2**precision one-byte
+    registers, serialized as those bytes. The standard error is about
+    1.04 / sqrt(2**precision): 6.5% at precision 8, in 256 bytes.
+    """
+
+    def __init__(self, precision: int = 8, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(self.registers)}")
+
+    def add(self, item: str):
+        h = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = h >> bits
+        # Position of the leftmost 1 in the remaining bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update_many(self, items: Iterable[str]):
+        for item in items:
+            self.add(item)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.m != self.m:
+            raise ValueError("Cannot merge sketches of different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], precision: int = 8) -> "HyperLogLog":
+        if not data:
+            return cls(precision)
+        return cls(len(data).bit_length() - 1, data)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func, extract, cast, Integer
+
+# Supported timeline granularities, finest first, with their width in seconds
+GRANULARITIES = {
+    "minute": 60,
+    "5m": 300,
+    "hour": 3600,
+    "day": 86400,
+    "week": 604800,
+}
+
+# Upper bound on points returned for one timeline
+MAX_TIMELINE_POINTS = 500
+
+def choose_granularity(start: datetime, end: datetime, requested: Optional[str] = None) -> str:
+    """
+    Returns the requested granularity, or the finest one that keeps the
+    window under MAX_TIMELINE_POINTS buckets. A requested granularity that
+    would exceed the cap is coarsened.
+    """
+    span = max((end - start).total_seconds(), 0)
+    names = list(GRANULARITIES)
+    first = names.index(requested) if requested in GRANULARITIES else 0
+    for name in names[first:]:
+        if span / GRANULARITIES[name] <= MAX_TIMELINE_POINTS:
+            return name
+    return names[-1]
+
+def floor_bucket(ts: datetime, granularity: str) -> datetime:
+    """
+    Python twin of bucket_expression: start of the bucket holding `ts`.
+    Weeks start on Monday.
+    """
+    if granularity == "week":
+        day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day - timedelta(days=day.weekday())
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "5m":
+        return ts.replace(minute=ts.minute - ts.minute % 5, second=0, microsecond=0)
+    return ts.replace(second=0, microsecond=0)
+
+def bucket_expression(column, granularity: str, dialect: str):
+    """
+    SQL expression truncating `column` to the start of its bucket.
+    PostgreSQL uses date_trunc; SQLite (tests) uses strftime/date modifiers
+    and yields 'YYYY-MM-DD HH:MM:SS' strings.
+    """
+    if dialect == "postgresql":
+        if granularity == "5m":
+            minutes = cast(func.floor(extract("minute", column) / 5) * 5, Integer)
+            return func.date_trunc("hour", column) + func.make_interval(0, 0, 0, 0, 0, minutes)
+        return func.date_trunc(granularity, column)
+
+    if granularity == "week":
+        return func.date(column, "-6 days", "weekday 1").concat(" 00:00:00")
+    if granularity == "5m":
+        epoch = cast(func.strftime("%s", column), Integer)
+        return func.datetime(epoch - epoch % 300, "unixepoch")
+    formats = {"minute": "%Y-%m-%d %H:%M:00", "hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"}
+    return func.strftime(formats[granularity], column)
+
+def fill_gaps(counts: Dict[datetime, int], start: datetime, end: datetime, granularity: str) -> List[dict]:
+    """
+    Returns one point per bucket between start and end (inclusive), with 0
+    for buckets that had no rows. Windows too long even for weekly buckets
+    are narrowed to the span that actually has data.
+    """
+    step = timedelta(seconds=GRANULARITIES[granularity])
+    if counts and (end - start) / step > MAX_TIMELINE_POINTS:
+        start, end = min(counts), max(counts)
+    points = []
+    bucket = floor_bucket(start, granularity)
+    while bucket <= end:
+        points.append({"time": bucket.isoformat(), "count": counts.get(bucket, 0)})
+        bucket += step
+    return points
@@ -1,11 +1,41 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
-from typing import Generator
+from app.core.ip_match import sqlite_ip_text
+from typing import AsyncGenerator, Generator
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # Every SQLite connection (sync or aiosqlite) can render packed addresses
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function("ip_text", 1, sqlite_ip_text, deterministic=True)
 
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> str:
+    """
+    Maps a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite).
+    """
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+_async_url = async_database_url(settings.DATABASE_URL)
+# SQLite connections are cheap to open and must not be shared across event loops
+async_engine = create_async_engine(
+    _async_url,
+    **({"poolclass": NullPool} if _async_url.startswith("sqlite") else {"pool_pre_ping": True, "pool_size": settings.ASYNC_DB_POOL_SIZE})
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
@@ -15,3 +45,7 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
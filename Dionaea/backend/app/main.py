@@ -4,7 +4,10 @@ from app.api.v1.data import router as data_router
 from app.api.v1.logs import router as logs_router
 from app.api.v1.roles import router as roles_router
 from app.api.v1.nodes import router as nodes_router
+from app.api.v1.attackers import router as attackers_router
+from app.api.v1.sessions import router as sessions_router
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
 from app.db.database import engine, Base
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -33,14 +36,19 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "X-Delta-Truncated", "ETag"],
     )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, level=settings.COMPRESSION_LEVEL)
+
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(users_router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(roles_router, prefix=f"{settings.API_V1_STR}/roles", tags=["roles"])
 app.include_router(data_router, prefix=f"{settings.API_V1_STR}/data", tags=["data"])
 app.include_router(logs_router, prefix=f"{settings.API_V1_STR}/logs", tags=["logs"])
 app.include_router(nodes_router, prefix=f"{settings.API_V1_STR}/nodes", tags=["nodes"])
+app.include_router(attackers_router, prefix=f"{settings.API_V1_STR}/attackers", tags=["attackers"])
+app.include_router(sessions_router, prefix=f"{settings.API_V1_STR}/sessions", tags=["sessions"])
 
 # Mount static files
 frontend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "frontend_login_demo")
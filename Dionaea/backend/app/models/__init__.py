@@ -2,7 +2,16 @@ from app.models.base import BaseModel
 from app.models.user import User
 from app.models.role import Role, Permission
 from app.models.audit import AuditLog
-from app.models.attack_log import AttackLog
+from app.models.dimension import (
+    DimUsername, DimPassword, DimProtocol, DimConnectionStatus, DimSensor, DimAttackType
+)
+from app.models.attack_log import AttackLog, AttackLogDailyRollup
 from app.models.node import Node, NodeHistory
+from app.models.attacker_profile import AttackerProfile
+from app.models.attack_session import AttackSession
 
-__all__ = ["BaseModel", "User", "Role", "Permission", "AuditLog", "AttackLog", "Node", "NodeHistory"]
+__all__ = [
+    "BaseModel", "User", "Role", "Permission", "AuditLog", "AttackLog", "AttackLogDailyRollup",
+    "DimUsername", "DimPassword", "DimProtocol", "DimConnectionStatus", "DimSensor", "DimAttackType",
+    "Node", "NodeHistory", "AttackerProfile", "AttackSession"
+]
@@ -1,23 +1,128 @@
-from sqlalchemy import String, DateTime, Index, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Date, DateTime, ForeignKey, Index, Integer, UniqueConstraint, select
+from sqlalchemy.orm import Mapped, joinedload, mapped_column, relationship
 from app.models.base import BaseModel
-from datetime import datetime
-from typing import Optional
+from app.models.types import IPAddress
+from app.models.dimension import (
+    DIMENSION_MODELS, DimAttackType, DimConnectionStatus, DimPassword, DimProtocol, DimSensor, DimUsername,
+    dimension_property
+)
+from datetime import date, datetime
+from typing import Optional, Sequence
+# Registers the before_flush hook that turns assigned strings into keys
+import app.core.dimensions  # noqa: F401
 
 class AttackLog(BaseModel):
+    """
+    One attack attempt. username, password, protocol, connection_status,
+    sensor_name and attack_type are stored as integer keys into their
+    dimension tables (app.models.dimension) and exposed as string attributes.
+    """
     __tablename__ = "attack_logs"
 
     timestamp: Mapped[datetime] = mapped_column(DateTime, index=True)
-    username: Mapped[str] = mapped_column(String, nullable=True, index=True)
-    password: Mapped[str] = mapped_column(String, nullable=True)
-    source_ip: Mapped[str] = mapped_column(String, nullable=True, index=True)
+    username_id: Mapped[Optional[int]] = mapped_column(ForeignKey("dim_usernames.id"), nullable=True, index=True)
+    password_id: Mapped[Optional[int]] = mapped_column(ForeignKey("dim_passwords.id"), nullable=True)
+    source_ip: Mapped[Optional[str]] = mapped_column(IPAddress, nullable=True, index=True)
     target_port: Mapped[int] = mapped_column(Integer, nullable=True)
-    protocol: Mapped[str] = mapped_column(String, nullable=True)
-    connection_status: Mapped[str] = mapped_column(String, nullable=True)
-    sensor_name: Mapped[str] = mapped_column(String, nullable=True)
+    protocol_id: Mapped[Optional[int]] = mapped_column(ForeignKey("dim_protocols.id"), nullable=True)
+    connection_status_id: Mapped[Optional[int]] = mapped_column(ForeignKey("dim_connection_statuses.id"), nullable=True)
+    sensor_name_id: Mapped[Optional[int]] = mapped_column(ForeignKey("dim_sensors.id"), nullable=True)
     raw_log: Mapped[str] = mapped_column(String, nullable=True)
-    attack_type: Mapped[str] = mapped_column(String, nullable=True, index=True)
+    attack_type_id: Mapped[Optional[int]] = mapped_column(ForeignKey("dim_attack_types.id"), nullable=True, index=True)
+    # Filled by the ingestor from the local GeoIP index (app.core.geoip)
+    country_code: Mapped[Optional[str]] = mapped_column(String(2), nullable=True, index=True)
+    asn: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+
+    # Loaded on access; readers of the string attributes ask for them with
+    # load_dimensions() instead of every query paying for six joins
+    username_dim = relationship(DimUsername)
+    password_dim = relationship(DimPassword)
+    protocol_dim = relationship(DimProtocol)
+    connection_status_dim = relationship(DimConnectionStatus)
+    sensor_name_dim = relationship(DimSensor)
+    attack_type_dim = relationship(DimAttackType)
+
+    username = dimension_property("username")
+    password = dimension_property("password")
+    protocol = dimension_property("protocol")
+    connection_status = dimension_property("connection_status")
+    sensor_name = dimension_property("sensor_name")
+    attack_type = dimension_property("attack_type")
+
+    __table_args__ = (
+        Index("idx_attack_log_time_user_ip", "timestamp", "username_id", "source_ip"),
+        # Serves keyset pagination: ORDER BY timestamp DESC, id DESC
+        Index("idx_attack_log_time_id", "timestamp", "id"),
+    )
+
+    @classmethod
+    def column(cls, name: str):
+        """
+        Core column for `name`: the dimension value (labelled as the
+        attribute) or the plain attack_logs column.
+        """
+        if name in DIMENSION_MODELS:
+            return DIMENSION_MODELS[name].value.label(name)
+        return getattr(cls, name)
+
+    @classmethod
+    def load_dimensions(cls, names: Sequence[str] = tuple(DIMENSION_MODELS)) -> list:
+        """
+        Loader options that fetch the named dimension rows along with the
+        entities, for callers that read their string attributes.
+        """
+        return [joinedload(getattr(cls, f"{name}_dim")) for name in names]
+
+    @classmethod
+    def labeled_select(cls, names: Sequence[str]):
+        """
+        select() of the named columns with the dimension tables they need
+        outer-joined, so rows read like the denormalized table.
+        """
+        stmt = select(*[cls.column(name) for name in names])
+        return cls.join_dimensions(stmt, names)
+
+    @classmethod
+    def join_dimensions(cls, stmt, names: Sequence[str]):
+        for name in names:
+            if name in DIMENSION_MODELS:
+                stmt = stmt.outerjoin(getattr(cls, f"{name}_dim"))
+        return stmt
+
+    @staticmethod
+    def label_grouped(grouped, names: Sequence[str]):
+        """
+        select() of `names` from a subquery grouped on <dimension>_id keys,
+        each key replaced by its dimension value: the GROUP BY runs on
+        integers and only the result rows are joined to the strings.
+        """
+        columns, joins = [], []
+        for name in names:
+            key = f"{name}_id"
+            if name in DIMENSION_MODELS and key in grouped.c:
+                model = DIMENSION_MODELS[name]
+                columns.append(model.value.label(name))
+                joins.append((model, model.id == grouped.c[key]))
+            else:
+                columns.append(grouped.c[name])
+        stmt = select(*columns).select_from(grouped)
+        for model, onclause in joins:
+            stmt = stmt.outerjoin(model, onclause)
+        return stmt
+
+class AttackLogDailyRollup(BaseModel):
+    """
+    Per-day counts written before raw rows age out of attack_logs, so daily
+    totals outlive the retention window.
+    """
+    __tablename__ = "attack_log_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, index=True)
+    attack_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    sensor_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    unique_ips: Mapped[int] = mapped_column(Integer, default=0)
 
     __table_args__ = (
-        Index("idx_attack_log_time_user_ip", "timestamp", "username", "source_ip"),
+        UniqueConstraint("day", "attack_type", "sensor_name", name="uq_attack_log_daily_rollup"),
     )
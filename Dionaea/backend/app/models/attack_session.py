@@ -0,0 +1,33 @@
+from sqlalchemy import JSON, Boolean, DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+from app.models.types import IPAddress
+from datetime import datetime
+from typing import List, Optional
+
+class AttackSession(BaseModel):
+    """
+    A run of events from one source IP at one sensor with no gap longer
+    than SESSION_INACTIVITY_GAP, written by the ingestor's sessionizer.
+    distinct_credentials is a HyperLogLog estimate over username/password
+    pairs, kept next to its sketch.
+    """
+    __tablename__ = "attack_sessions"
+
+    source_ip: Mapped[str] = mapped_column(IPAddress, nullable=False)
+    sensor_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    start_time: Mapped[datetime] = mapped_column(DateTime)
+    end_time: Mapped[datetime] = mapped_column(DateTime)
+    event_count: Mapped[int] = mapped_column(Integer, default=0)
+    distinct_credentials: Mapped[int] = mapped_column(Integer, default=0)
+    credential_sketch: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    attack_types: Mapped[List[str]] = mapped_column(JSON, default=list)
+    # Set once the gap has passed; open sessions can still grow
+    closed: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    __table_args__ = (
+        Index("idx_attack_session_ip_start", "source_ip", "start_time"),
+        # Keyset pagination: ORDER BY start_time DESC, id DESC
+        Index("idx_attack_session_start_id", "start_time", "id"),
+        Index("idx_attack_session_open", "closed", "sensor_name", "end_time"),
+    )
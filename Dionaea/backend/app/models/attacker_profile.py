@@ -0,0 +1,36 @@
+from sqlalchemy import JSON, DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+from app.models.types import IPAddress
+from datetime import datetime
+from typing import List, Optional
+
+class AttackerProfile(BaseModel):
+    """
+    Running summary of one source IP, upserted by the ingestor with every
+    batch. Distinct username / password counts are HyperLogLog estimates
+    kept next to their sketches (app.core.sketches).
+    """
+    __tablename__ = "attacker_profiles"
+
+    source_ip: Mapped[str] = mapped_column(IPAddress, unique=True, nullable=False)
+    first_seen: Mapped[datetime] = mapped_column(DateTime)
+    last_seen: Mapped[datetime] = mapped_column(DateTime)
+    total_events: Mapped[int] = mapped_column(Integer, default=0)
+    distinct_usernames: Mapped[int] = mapped_column(Integer, default=0)
+    distinct_passwords: Mapped[int] = mapped_column(Integer, default=0)
+    username_sketch: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    password_sketch: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    attack_types: Mapped[List[str]] = mapped_column(JSON, default=list)
+    sensors: Mapped[List[str]] = mapped_column(JSON, default=list)
+    country_code: Mapped[Optional[str]] = mapped_column(String(2), nullable=True)
+    asn: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    __table_args__ = (
+        # One per sortable column; id breaks ties for keyset pagination
+        Index("idx_attacker_profile_last_seen", "last_seen", "id"),
+        Index("idx_attacker_profile_first_seen", "first_seen", "id"),
+        Index("idx_attacker_profile_total_events", "total_events", "id"),
+        Index("idx_attacker_profile_distinct_usernames", "distinct_usernames", "id"),
+        Index("idx_attacker_profile_distinct_passwords", "distinct_passwords", "id"),
+    )
@@ -0,0 +1,87 @@
+from sqlalchemy import Integer, String, select
+from sqlalchemy.ext.hybrid import Comparator, hybrid_property
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import operators
+from app.db.database import Base
+
+class DimensionMixin:
+    """
+    Lookup table for one repetitive attack_logs column: each distinct value
+    stored once under an integer surrogate key. Not a BaseModel on purpose,
+    its audit columns would outweigh the value itself.
+    """
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+
+class DimUsername(DimensionMixin, Base):
+    __tablename__ = "dim_usernames"
+
+class DimPassword(DimensionMixin, Base):
+    __tablename__ = "dim_passwords"
+
+class DimProtocol(DimensionMixin, Base):
+    __tablename__ = "dim_protocols"
+
+class DimConnectionStatus(DimensionMixin, Base):
+    __tablename__ = "dim_connection_statuses"
+
+class DimSensor(DimensionMixin, Base):
+    __tablename__ = "dim_sensors"
+
+class DimAttackType(DimensionMixin, Base):
+    __tablename__ = "dim_attack_types"
+
+# attack_logs column -> its dimension table; the row holds <column>_id
+DIMENSION_MODELS = {
+    "username": DimUsername,
+    "password": DimPassword,
+    "protocol": DimProtocol,
+    "connection_status": DimConnectionStatus,
+    "sensor_name": DimSensor,
+    "attack_type": DimAttackType,
+}
+
+class DimensionComparator(Comparator):
+    """
+    Class-level side of a dimension attribute. Comparisons become
+    `<column>_id IN (SELECT id FROM dim WHERE value <op> ...)`, which only
+    scans the small dimension table. Selected as a column it is a
+    correlated lookup of the value.
+    """
+
+    def __init__(self, key, model):
+        self.key = key
+        self.model = model
+        super().__init__(select(model.value).where(model.id == key).scalar_subquery())
+
+    def operate(self, op, *other, **kwargs):
+        if other and other[0] is None:
+            if op in (operators.eq, operators.is_):
+                return self.key.is_(None)
+            if op in (operators.ne, operators.is_not):
+                return self.key.is_not(None)
+        return self.key.in_(select(self.model.id).where(op(self.model.value, *other, **kwargs)))
+
+def dimension_property(name: str) -> hybrid_property:
+    """
+    String attribute backed by <name>_id and the <name>_dim relationship.
+    Assigned values are kept on the instance as labels and turned into keys
+    at flush (see app.core.dimensions), so AttackLog(username="root") and
+    log.username keep working.
+    """
+    model = DIMENSION_MODELS[name]
+
+    def fget(self):
+        labels = self.__dict__.get("_dimension_labels")
+        if labels and name in labels:
+            return labels[name]
+        ref = getattr(self, f"{name}_dim")
+        return ref.value if ref is not None else None
+
+    def fset(self, value):
+        self.__dict__.setdefault("_dimension_labels", {})[name] = value
+        # Cleared key = label still to be resolved; also marks the row dirty
+        setattr(self, f"{name}_id", None)
+
+    prop = hybrid_property(fget, fset)
+    return prop.comparator(lambda cls: DimensionComparator(getattr(cls, f"{name}_id"), model))
@@ -0,0 +1,37 @@
+from sqlalchemy import LargeBinary, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+from app.core.ip_match import pack_ip, parse_ip, unpack_ip
+
+class IPAddress(TypeDecorator):
+    """
+    IP address column exposed as its canonical string. Stored as INET on
+    PostgreSQL and as a packed 16-byte big-endian value on SQLite, so a
+    btree index on either serves CIDR / range filters as range scans.
+    Values that are not addresses are stored as NULL.
+    """
+    impl = String
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.INET())
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(String(45))
+
+    def process_bind_param(self, value, dialect):
+        address = parse_ip(value)
+        if address is None:
+            return None
+        if dialect.name == "sqlite":
+            return pack_ip(address)
+        return str(address)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "sqlite":
+            return str(unpack_ip(value))
+        # psycopg2 returns text, asyncpg ipaddress objects
+        return str(value)
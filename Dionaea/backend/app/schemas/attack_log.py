@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 class AttackLogBase(BaseModel):
     timestamp: datetime
@@ -13,6 +13,8 @@ class AttackLogBase(BaseModel):
     sensor_name: Optional[str] = None
     raw_log: Optional[str] = None
     attack_type: Optional[str] = None
+    country_code: Optional[str] = None
+    asn: Optional[int] = None
 
 class AttackLogCreate(AttackLogBase):
     pass
@@ -33,8 +35,23 @@ class AttackLogFilter(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     source_ip: Optional[str] = None
+    cidr: Optional[str] = None
+    ip_range: Optional[str] = None
     username: Optional[str] = None
     password: Optional[str] = None
     attack_type: Optional[str] = None
     limit: int = 50
     offset: int = 0
+    cursor: Optional[str] = None
+    include_total: Literal["none", "exact", "estimate"] = "exact"
+    granularity: Optional[Literal["minute", "5m", "hour", "day", "week"]] = None
+    fields: Optional[List[str]] = None
+    # Delta reads: only rows / timeline buckets after the client's newest row
+    since_id: Optional[int] = None
+    since_timestamp: Optional[datetime] = None
+
+class LiveTailFilter(BaseModel):
+    attack_type: Optional[str] = None
+    # Address prefix (e.g. "45.146.") or CIDR (e.g. "45.146.0.0/16")
+    source_ip: Optional[str] = None
+    sensor: Optional[str] = None
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class AttackSession(BaseModel):
+    id: int
+    source_ip: str
+    sensor_name: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    event_count: int
+    # HyperLogLog estimate over username/password pairs
+    distinct_credentials: int
+    attack_types: List[str] = []
+    closed: bool
+
+    class Config:
+        from_attributes = True
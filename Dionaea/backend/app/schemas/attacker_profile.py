@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class AttackerProfile(BaseModel):
+    source_ip: str
+    first_seen: datetime
+    last_seen: datetime
+    total_events: int
+    # HyperLogLog estimates
+    distinct_usernames: int
+    distinct_passwords: int
+    attack_types: List[str] = []
+    sensors: List[str] = []
+    country_code: Optional[str] = None
+    asn: Optional[int] = None
+
+    class Config:
+        from_attributes = True
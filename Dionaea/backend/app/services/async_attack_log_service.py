@@ -0,0 +1,88 @@
+import json
+import logging
+from time import perf_counter
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService, read_traffic_cache, store_traffic_cache
+
+logger = logging.getLogger(__name__)
+
+class AsyncAttackLogService:
+    """
+    AsyncSession variant of the AttackLogService read paths used by the log
+    list and traffic endpoints, so a slow query awaits instead of blocking
+    the event loop. Statements come from AttackLogService's builders and
+    both variants issue the same SQL. Redis lookups stay synchronous; they
+    are bounded by REDIS_SOCKET_TIMEOUT and skipped while the breaker is open.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # Shared pool; None while Redis is down (circuit open)
+        self.redis_client = get_redis()
+
+    @property
+    def dialect(self):
+        return self.db.get_bind().dialect
+
+    async def _count(self, stmt, mode: str):
+        """
+        See AttackLogService._count.
+        """
+        if mode == "none":
+            return None
+        exact, capped = AttackLogService._count_statements(stmt)
+        if mode == "exact":
+            return await self.db.scalar(exact)
+
+        capped = await self.db.scalar(capped)
+        planned = await self._planner_rows(stmt) if capped > settings.LOG_COUNT_ESTIMATE_CAP else None
+        return AttackLogService._estimate_total(capped, planned)
+
+    async def _planner_rows(self, stmt):
+        if self.dialect.name != "postgresql":
+            return None
+        try:
+            sql, params = AttackLogService._explain_statement(stmt, self.dialect)
+            connection = await self.db.connection()
+            plan = (await connection.exec_driver_sql(sql, params)).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Planner row estimate failed: {e}")
+            return None
+
+    async def get_logs(self, filters: AttackLogFilter):
+        """
+        Returns (logs, total, cursors), as AttackLogService.get_logs.
+        """
+        stmt, page, direction = AttackLogService._logs_statement(filters)
+        total = await self._count(stmt, filters.include_total)
+        result = await self.db.execute(page)
+        logs = list(result.all() if filters.fields else result.scalars().all())
+        logs, cursors = AttackLogService._page_result(logs, filters, direction)
+        return logs, total, cursors
+
+    async def get_traffic_stats(self, filters: Optional[AttackLogFilter] = None):
+        """
+        Traffic analysis, sharing the sync service's cache entries (deltas
+        are not cached).
+        """
+        delta = AttackLogService._is_delta(filters)
+        key, ttl = AttackLogService._traffic_cache_key(filters)
+        result = None if delta else read_traffic_cache(self.redis_client, key, ttl)
+        if result is not None:
+            return result
+
+        started = perf_counter()
+        dist, timeline, start_time, end_time, granularity = AttackLogService._traffic_statements(filters, self.dialect.name)
+        attack_types = (await self.db.execute(dist)).all() if dist is not None else None
+        timeline_rows = (await self.db.execute(timeline)).all()
+        result = AttackLogService._traffic_result(attack_types, timeline_rows, start_time, end_time, granularity)
+        if not delta:
+            store_traffic_cache(self.redis_client, key, ttl, filters, result, perf_counter() - started)
+        return result
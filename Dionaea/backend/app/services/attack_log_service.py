@@ -1,74 +1,504 @@
+import hashlib
 import json
 import logging
+from collections import Counter
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from app.models.attack_log import AttackLog
+from sqlalchemy import func, desc, tuple_, literal, select
+from fastapi import HTTPException
+from app.models.attack_log import AttackLog, AttackLogDailyRollup
 from app.schemas.attack_log import AttackLogFilter
 from app.core.config import settings
+from app.core.cache import StaleWhileRevalidateCache, cache_metrics, local_cache, register_cache_window
+from app.core.redis_client import get_redis
+from app.db.database import SessionLocal
+from app.core.ip_match import ip_filter_clause, cidr_clause, ip_range_clause, parse_cidr, parse_ip_range
+from app.core.dimensions import dimension_keys
+from app.core.geoip import get_geoip_index
+from app.services.sketch_service import TopKSketchStore, DistinctCounterStore, TOPK_ALL_TIME
+from app.core.timeline import bucket_expression, choose_granularity, fill_gaps, floor_bucket
+from app.core.pagination import encode_cursor, decode_cursor, CURSOR_NEXT, CURSOR_PREV
+from app.services.retention_service import ArchiveStore, archive_row_matches
 import redis
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+def _compute_statistics_detached(day: Optional[date] = None):
+    """
+    Recomputes statistics on a background refresh thread with its own session.
+    """
+    db = SessionLocal()
+    try:
+        return AttackLogService(db)._compute_statistics(day)
+    finally:
+        db.close()
+
+# Columns written by log exports, in order
+EXPORT_COLUMNS = (
+    "id", "timestamp", "source_ip", "username", "password", "target_port",
+    "protocol", "connection_status", "sensor_name", "attack_type", "raw_log",
+    "country_code", "asn"
+)
+
+# Dashboard chart sizes: top 10 IPs, top 5 usernames, top 20 passwords
+TOP_LIMITS = {"source_ip": 10, "username": 5, "password": 20}
+
+def read_traffic_cache(redis_client, key: str, ttl: int):
+    """
+    Cached traffic result from Redis, or from the in-process cache while
+    Redis is unavailable; None on a miss. Shared by the sync and async services.
+    """
+    if redis_client:
+        try:
+            cached = redis_client.get(key)
+        except redis.RedisError as e:
+            logger.error(f"Traffic cache unavailable: {e}")
+        else:
+            if cached:
+                cache_metrics.incr("traffic_hits")
+                result = json.loads(cached)
+                local_cache.set(key, result, ttl)
+                return result
+            cache_metrics.incr("traffic_misses")
+            return None
+
+    value = local_cache.get(key)
+    if value is not None:
+        cache_metrics.incr("traffic_local_hits")
+    return value
+
+def store_traffic_cache(redis_client, key: str, ttl: int, filters: Optional[AttackLogFilter], result: dict, seconds: float):
+    cache_metrics.record_traffic_refresh(seconds)
+    local_cache.set(key, result, ttl)
+    if not redis_client:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        pipe.setex(key, ttl, json.dumps(result))
+        register_cache_window(
+            pipe, key,
+            filters.start_time.timestamp() if filters and filters.start_time else None,
+            filters.end_time.timestamp() if filters and filters.end_time else None
+        )
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error(f"Traffic cache unavailable: {e}")
+
 class AttackLogService:
     def __init__(self, db: Session):
         self.db = db
-        # Initialize Redis connection
-        try:
-            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
-            self.redis_client = None
+        # Shared pool; None while Redis is down (circuit open)
+        self.redis_client = get_redis()
 
-    def get_logs(self, filters: AttackLogFilter):
-        query = self.db.query(AttackLog)
+    def _local_fallback(self, key: str, compute, ttl: float):
+        """
+        Serves from the in-process cache when Redis can't be used.
+        """
+        value = local_cache.get(key)
+        if value is not None:
+            cache_metrics.incr("local_hits")
+            return value
+        value = compute()
+        local_cache.set(key, value, ttl)
+        return value
 
+    @staticmethod
+    def _apply_filters(query, filters: AttackLogFilter):
+        """
+        Adds the filter WHERE clauses to an ORM Query or a Core select().
+        """
         if filters.start_time:
             query = query.filter(AttackLog.timestamp >= filters.start_time)
         if filters.end_time:
             query = query.filter(AttackLog.timestamp <= filters.end_time)
-        if filters.source_ip:
-            query = query.filter(AttackLog.source_ip.contains(filters.source_ip))
+        for clause in AttackLogService.ip_filter_clauses(filters):
+            query = query.filter(clause)
         if filters.username:
             query = query.filter(AttackLog.username.contains(filters.username))
         if filters.password:
             query = query.filter(AttackLog.password.contains(filters.password))
         if filters.attack_type:
             query = query.filter(AttackLog.attack_type.contains(filters.attack_type))
+        return query
 
-        total = query.count()
-        logs = query.order_by(desc(AttackLog.timestamp)).offset(filters.offset).limit(filters.limit).all()
-        
-        return logs, total
+    @staticmethod
+    def ip_filter_clauses(filters: AttackLogFilter) -> list:
+        """
+        WHERE clauses for the source_ip, cidr and ip_range filters; the last
+        two are address range scans. Raises 400 on a malformed cidr/ip_range.
+        """
+        clauses = []
+        if filters.source_ip:
+            clauses.append(ip_filter_clause(AttackLog.source_ip, filters.source_ip))
+        if filters.cidr:
+            try:
+                clauses.append(cidr_clause(AttackLog.source_ip, parse_cidr(filters.cidr)))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid cidr: {e}")
+        if filters.ip_range:
+            try:
+                first, last = parse_ip_range(filters.ip_range)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid ip_range: {e}")
+            clauses.append(ip_range_clause(AttackLog.source_ip, first, last))
+        # None = match-all filter such as 0.0.0.0/0
+        return [c for c in clauses if c is not None]
+
+    def iter_export_rows(self, filters: AttackLogFilter, include_archive: bool = False):
+        """
+        Streams every matching row as a tuple of EXPORT_COLUMNS, newest first.
+        yield_per keeps a server-side cursor open on PostgreSQL so memory
+        stays flat however many rows match. With include_archive, rows moved
+        out by the retention job follow (they are always older).
+        """
+        query = self._apply_filters(AttackLog.labeled_select(EXPORT_COLUMNS), filters)
+        query = query.order_by(desc(AttackLog.timestamp), desc(AttackLog.id))
+        for row in self.db.execute(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)):
+            yield tuple(row)
+        if include_archive:
+            yield from self._iter_archived_rows(filters)
+
+    def _iter_archived_rows(self, filters: AttackLogFilter):
+        """
+        Matching archived rows, newest first; holds one day in memory at a time.
+        """
+        archive = ArchiveStore()
+        for day in reversed(archive.days("attack_logs")):
+            if filters.start_time and day < filters.start_time.date():
+                break
+            if filters.end_time and day > filters.end_time.date():
+                continue
+            rows = [r for r in archive.iter_day("attack_logs", day) if archive_row_matches(r, filters)]
+            rows.sort(key=lambda r: (r["timestamp"], r["id"]), reverse=True)
+            for row in rows:
+                yield tuple(row.get(name) for name in EXPORT_COLUMNS)
+
+    @staticmethod
+    def _count_statements(stmt):
+        """
+        (exact, capped) COUNT statements over a filtered select(); the capped
+        one stops after LOG_COUNT_ESTIMATE_CAP + 1 rows.
+        """
+        ids = stmt.with_only_columns(AttackLog.id)
+        exact = select(func.count()).select_from(ids.subquery())
+        capped = select(func.count()).select_from(ids.limit(settings.LOG_COUNT_ESTIMATE_CAP + 1).subquery())
+        return exact, capped
+
+    @staticmethod
+    def _explain_statement(stmt, dialect):
+        """
+        (sql, params) of EXPLAIN (FORMAT JSON) for a filtered select(), in
+        the driver's own parameter style.
+        """
+        compiled = stmt.with_only_columns(AttackLog.id).compile(dialect=dialect)
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+        return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+    @staticmethod
+    def _estimate_total(capped: int, planned: Optional[int]):
+        cap = settings.LOG_COUNT_ESTIMATE_CAP
+        if capped <= cap:
+            return capped
+        if planned is not None and planned > cap:
+            return f"~{planned}"
+        return f"{cap}+"
+
+    def _count(self, stmt, mode: str):
+        """
+        Counts the filtered statement according to include_total:
+        - none: skip counting, returns None
+        - exact: full COUNT(*)
+        - estimate: count at most LOG_COUNT_ESTIMATE_CAP rows; past the cap use
+          the PostgreSQL planner's row estimate ("~N") or "N+" elsewhere
+        """
+        if mode == "none":
+            return None
+        exact, capped = self._count_statements(stmt)
+        if mode == "exact":
+            return self.db.scalar(exact)
+
+        capped = self.db.scalar(capped)
+        planned = self._planner_rows(stmt) if capped > settings.LOG_COUNT_ESTIMATE_CAP else None
+        return self._estimate_total(capped, planned)
+
+    def _planner_rows(self, stmt):
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        try:
+            sql, params = self._explain_statement(stmt, bind.dialect)
+            plan = self.db.connection().exec_driver_sql(sql, params).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Planner row estimate failed: {e}")
+            return None
+
+    @staticmethod
+    def _projection(fields):
+        """
+        Column names for a fields= projection: the requested EXPORT_COLUMNS
+        plus id and timestamp, which page cursors need.
+        """
+        unknown = set(fields) - set(EXPORT_COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        wanted = {"id", "timestamp", *fields}
+        return [name for name in EXPORT_COLUMNS if name in wanted]
+
+    @staticmethod
+    def _logs_statement(filters: AttackLogFilter):
+        """
+        (filtered select, page select, direction) for get_logs. With
+        filters.fields the page selects those columns only and yields Rows
+        instead of AttackLog entities.
+        Without a cursor the first page is addressed by offset; with one we seek
+        on the (timestamp, id) index so every page costs the same.
+        """
+        stmt = AttackLogService._apply_filters(select(AttackLog), filters)
+        # Dimension tables are joined for the page only, not for counting
+        if filters.fields:
+            names = AttackLogService._projection(filters.fields)
+            page = AttackLog.join_dimensions(stmt.with_only_columns(*[AttackLog.column(n) for n in names]), names)
+        else:
+            page = stmt.options(*AttackLog.load_dimensions())
+
+        key = tuple_(AttackLog.timestamp, AttackLog.id)
+        direction = CURSOR_NEXT
+        if AttackLogService._is_delta(filters):
+            if filters.cursor:
+                raise HTTPException(status_code=400, detail="cursor cannot be combined with since_id / since_timestamp")
+            page = page.filter(*AttackLogService._since_clauses(filters)).order_by(desc(AttackLog.timestamp), desc(AttackLog.id))
+        elif filters.cursor:
+            try:
+                c_time, c_id, direction = decode_cursor(filters.cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            boundary = tuple_(literal(c_time), literal(c_id))
+            # The plain timestamp bound is implied by the row comparison but,
+            # unlike it, lets PostgreSQL prune partitions past the cursor
+            if direction == CURSOR_PREV:
+                page = page.filter(AttackLog.timestamp >= c_time, key > boundary).order_by(AttackLog.timestamp, AttackLog.id)
+            else:
+                page = page.filter(AttackLog.timestamp <= c_time, key < boundary).order_by(desc(AttackLog.timestamp), desc(AttackLog.id))
+        else:
+            page = page.order_by(desc(AttackLog.timestamp), desc(AttackLog.id)).offset(filters.offset)
+
+        # Fetch one extra row to learn whether another page exists
+        return stmt, page.limit(filters.limit + 1), direction
+
+    @staticmethod
+    def _is_delta(filters: Optional[AttackLogFilter]) -> bool:
+        return bool(filters) and (filters.since_id is not None or filters.since_timestamp is not None)
+
+    @staticmethod
+    def _since_clauses(filters: AttackLogFilter) -> list:
+        """
+        WHERE clauses for rows after the client's newest row. With both
+        since_timestamp and since_id this is a seek past (timestamp, id) on
+        its index; since_id alone also returns rows ingested late with
+        older timestamps.
+        """
+        if filters.since_timestamp is None:
+            return [AttackLog.id > filters.since_id]
+        if filters.since_id is None:
+            return [AttackLog.timestamp > filters.since_timestamp]
+        boundary = tuple_(literal(filters.since_timestamp), literal(filters.since_id))
+        return [AttackLog.timestamp >= filters.since_timestamp, tuple_(AttackLog.timestamp, AttackLog.id) > boundary]
+
+    @staticmethod
+    def _page_result(logs: list, filters: AttackLogFilter, direction: str):
+        """
+        Trims the look-ahead row and builds the (logs, cursors) of a page.
+        A delta page has no cursors; "truncated" says more than `limit` rows
+        were added and the client should reload instead of merging.
+        """
+        has_more = len(logs) > filters.limit
+        logs = logs[:filters.limit]
+        if AttackLogService._is_delta(filters):
+            return logs, {"next": None, "prev": None, "truncated": has_more}
+        if direction == CURSOR_PREV:
+            logs.reverse()
+
+        cursors = {"next": None, "prev": None}
+        if logs:
+            first, last = logs[0], logs[-1]
+            if direction == CURSOR_PREV:
+                more_next, more_prev = True, has_more
+            else:
+                more_next, more_prev = has_more, bool(filters.cursor) or filters.offset > 0
+            if more_next:
+                cursors["next"] = encode_cursor(last.timestamp, last.id, CURSOR_NEXT)
+            if more_prev:
+                cursors["prev"] = encode_cursor(first.timestamp, first.id, CURSOR_PREV)
+        return logs, cursors
+
+    def get_logs(self, filters: AttackLogFilter):
+        """
+        Returns (logs, total, cursors); see _logs_statement for paging.
+        `total` follows filters.include_total (see _count).
+        """
+        stmt, page, direction = self._logs_statement(filters)
+        total = self._count(stmt, filters.include_total)
+        result = self.db.execute(page)
+        rows = result.all() if filters.fields else result.scalars().all()
+        logs, cursors = self._page_result(list(rows), filters, direction)
+        return logs, total, cursors
+
+    def _grouping_sets_statement(self, *where):
+        """
+        One GROUP BY GROUPING SETS over source_ip / username / password / ()
+        ranked per set, so PostgreSQL aggregates every dimension in one scan.
+        Usernames and passwords are grouped by key and labelled afterwards.
+        """
+        columns = [AttackLog.source_ip, AttackLog.username_id, AttackLog.password_id]
+        grouping = func.grouping(*columns).label("g")
+        aggregated = select(*columns, grouping, func.count().label("cnt")).where(*where).group_by(
+            func.grouping_sets(*[tuple_(c) for c in columns], tuple_())
+        ).subquery()
+        ranked = select(
+            aggregated,
+            func.row_number().over(partition_by=aggregated.c.g, order_by=desc(aggregated.c.cnt)).label("rn")
+        ).subquery()
+        top = select(ranked).where(ranked.c.rn <= max(TOP_LIMITS.values())).subquery()
+        return AttackLog.label_grouped(top, ["source_ip", "username", "password", "g", "cnt", "rn"])
 
-    def get_statistics(self):
-        # Try to get from cache first
-        cache_key = "dionaea_stats"
+    def _top_values_grouping_sets(self, *where):
+        # GROUPING() bitmask: a bit is set for each column rolled up in that set
+        set_for_mask = {0b011: "source_ip", 0b101: "username", 0b110: "password"}
+        top = {name: [] for name in TOP_LIMITS}
+        total_logs = 0
+        for row in self.db.execute(self._grouping_sets_statement(*where)):
+            if row.g == 0b111:
+                total_logs = row.cnt
+                continue
+            name = set_for_mask[row.g]
+            if row.rn <= TOP_LIMITS[name]:
+                top[name].append((getattr(row, name), row.cnt))
+        for name in top:
+            top[name].sort(key=lambda item: item[1], reverse=True)
+        return top, total_logs
+
+    def _top_values_single_scan(self, *where):
+        """
+        Portable fallback (SQLite): stream the three columns once and feed a
+        Counter per dimension, counting username/password keys and labelling
+        only the winners.
+        """
+        counters = {name: Counter() for name in TOP_LIMITS}
+        total_logs = 0
+        rows = self.db.execute(
+            select(AttackLog.source_ip, AttackLog.username_id, AttackLog.password_id).where(*where).execution_options(yield_per=5000)
+        )
+        for source_ip, username, password in rows:
+            counters["source_ip"][source_ip] += 1
+            counters["username"][username] += 1
+            counters["password"][password] += 1
+            total_logs += 1
+        top = {name: counters[name].most_common(limit) for name, limit in TOP_LIMITS.items()}
+        for name in ("username", "password"):
+            labels = dimension_keys.labels(self.db, name, [key for key, _ in top[name]])
+            top[name] = [(labels.get(key), count) for key, count in top[name]]
+        return top, total_logs
+
+    def _statistics_from_sketches(self, window: str):
+        """
+        Builds the chart payload from the ingestor's Space-Saving sketches.
+        Each item carries `error`: its true count lies in [value - error, value].
+        Returns None if the sketches have not been populated or do not cover
+        the whole window (rows stored before the ingestor first folded a
+        batch, until scripts/rebuild_sketches.py has run).
+        """
+        store = TopKSketchStore(self.redis_client)
+        since = store.complete_since()
+        if since is None:
+            return None
+        if window == TOPK_ALL_TIME:
+            first = self.db.scalar(select(func.min(AttackLog.timestamp)))
+            if first is not None and first < since:
+                return None
+        elif datetime.fromisoformat(window) < since:
+            return None
+        sketches = {name: store.get_sketch(name, window) for name in TOP_LIMITS}
+        if any(sketch is None for sketch in sketches.values()):
+            return None
+
+        def items(name):
+            return [
+                {"name": item, "value": count, "error": error}
+                for item, count, error in sketches[name].top(TOP_LIMITS[name])
+            ]
+
+        return {
+            "top_ips": items("source_ip"),
+            "top_usernames": items("username"),
+            "top_passwords": items("password"),
+            "total_logs": sketches["source_ip"].total,
+            "approximate": True,
+            "window": window,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def get_statistics(self, approximate: bool = False, day: Optional[date] = None):
+        """
+        Top IPs / usernames / passwords and total, all-time or for one day.
+        approximate=True answers from the top-K sketches in constant time and
+        falls back to the exact queries until the sketches exist and cover
+        the window.
+        """
+        window = day.isoformat() if day else TOPK_ALL_TIME
+        if approximate:
+            stats = self._statistics_from_sketches(window)
+            if stats:
+                return stats
+
+        cache_key = "dionaea_stats" if not day else f"dionaea_stats:{window}"
         if self.redis_client:
-            cached_stats = self.redis_client.get(cache_key)
-            if cached_stats:
-                return json.loads(cached_stats)
-
-        # Calculate statistics
-        # 1. Top 10 IPs
-        top_ips = self.db.query(
-            AttackLog.source_ip, func.count(AttackLog.id).label('count')
-        ).group_by(AttackLog.source_ip).order_by(desc('count')).limit(10).all()
-        
-        # 2. Top 5 Usernames
-        top_usernames = self.db.query(
-            AttackLog.username, func.count(AttackLog.id).label('count')
-        ).group_by(AttackLog.username).order_by(desc('count')).limit(5).all()
+            try:
+                stats = self._stats_cache(day).get_or_compute(
+                    cache_key,
+                    lambda: self._compute_statistics(day),
+                    background_compute=lambda: _compute_statistics_detached(day)
+                )
+                # Last known good copy for when Redis becomes unreachable
+                local_cache.set(cache_key, stats, settings.STATS_CACHE_HARD_TTL)
+                return stats
+            except redis.RedisError as e:
+                logger.error(f"Stats cache unavailable: {e}")
+        return self._local_fallback(cache_key, lambda: self._compute_statistics(day), settings.STATS_CACHE_SOFT_TTL)
+
+    def _stats_cache(self, day: Optional[date] = None) -> StaleWhileRevalidateCache:
+        window = (None, None)
+        if day:
+            day_start = datetime.combine(day, time.min)
+            window = (day_start.timestamp(), (day_start + timedelta(days=1)).timestamp())
+        return StaleWhileRevalidateCache(
+            self.redis_client,
+            soft_ttl=settings.STATS_CACHE_SOFT_TTL,
+            hard_ttl=settings.STATS_CACHE_HARD_TTL,
+            lock_timeout=settings.STATS_CACHE_LOCK_TIMEOUT,
+            window=window
+        )
 
-        # 3. Top 20 Passwords
-        top_passwords = self.db.query(
-            AttackLog.password, func.count(AttackLog.id).label('count')
-        ).group_by(AttackLog.password).order_by(desc('count')).limit(20).all()
+    def _compute_statistics(self, day: Optional[date] = None):
+        where = []
+        if day:
+            day_start = datetime.combine(day, time.min)
+            where = [AttackLog.timestamp >= day_start, AttackLog.timestamp < day_start + timedelta(days=1)]
 
-        # 4. Total Logs Count
-        total_logs = self.db.query(AttackLog).count()
+        # Calculate statistics in a single pass over attack_logs
+        if self.db.get_bind().dialect.name == "postgresql":
+            top, total_logs = self._top_values_grouping_sets(*where)
+        else:
+            top, total_logs = self._top_values_single_scan(*where)
+        top_ips, top_usernames, top_passwords = top["source_ip"], top["username"], top["password"]
 
-        stats = {
+        return {
             "top_ips": [{"name": ip, "value": count} for ip, count in top_ips if ip],
             "top_usernames": [{"name": user, "value": count} for user, count in top_usernames if user],
             "top_passwords": [{"name": pwd, "value": count} for pwd, count in top_passwords if pwd],
@@ -76,11 +506,104 @@ class AttackLogService:
             "timestamp": datetime.now().isoformat()
         }
 
-        # Cache for 10 minutes
-        if self.redis_client:
-            self.redis_client.setex(cache_key, 600, json.dumps(stats))
+    def get_unique_counts(self, start: datetime, end: datetime, sensor: Optional[str] = None):
+        """
+        Approximate distinct source IPs, usernames and credential pairs in
+        [start, end), merged from the ingestor's HyperLogLog buckets without
+        touching attack_logs. Ranges the counters do not cover yet (see
+        DistinctCounterStore.covers), or any range while Redis is
+        unavailable, are counted exactly instead.
+        """
+        store = DistinctCounterStore(self.redis_client)
+        counts = None
+        if store.covers(start, end):
+            counts = [store.count(dimension, start, end, sensor) for dimension in ("source_ip", "username", "credential")]
+        approximate = counts is not None and None not in counts
+        if not approximate:
+            counts = self._exact_unique_counts(start, end, sensor)
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "sensor": sensor,
+            "unique_attackers": counts[0],
+            "unique_usernames": counts[1],
+            "unique_credentials": counts[2],
+            "approximate": approximate
+        }
 
-        return stats
+    def _exact_unique_counts(self, start: datetime, end: datetime, sensor: Optional[str] = None) -> list:
+        """
+        COUNT(DISTINCT ...) of source IPs, usernames and credential pairs in
+        [start, end). Usernames and pairs are counted by dimension key.
+        """
+        where = [AttackLog.timestamp >= start, AttackLog.timestamp < end]
+        if sensor:
+            where.append(AttackLog.sensor_name == sensor)
+        attackers, usernames = self.db.execute(
+            select(func.count(func.distinct(AttackLog.source_ip)), func.count(func.distinct(AttackLog.username_id))).where(*where)
+        ).one()
+        pairs = select(AttackLog.username_id, AttackLog.password_id).where(
+            *where, (AttackLog.username_id.isnot(None)) | (AttackLog.password_id.isnot(None))
+        ).distinct().subquery()
+        credentials = self.db.scalar(select(func.count()).select_from(pairs))
+        return [attackers, usernames, credentials]
+
+    def get_daily_counts(self, start: date, end: date):
+        """
+        Per-day counts by attack type and sensor over [start, end]: live rows
+        for days still in attack_logs, rollups for days already archived.
+        """
+        range_start = datetime.combine(start, time.min)
+        range_end = datetime.combine(end + timedelta(days=1), time.min)
+        day = bucket_expression(AttackLog.timestamp, "day", self.db.get_bind().dialect.name).label("day")
+        grouped = select(
+            day, AttackLog.attack_type_id, AttackLog.sensor_name_id,
+            func.count(AttackLog.id).label("count"), func.count(func.distinct(AttackLog.source_ip)).label("unique_ips")
+        ).where(
+            AttackLog.timestamp >= range_start, AttackLog.timestamp < range_end
+        ).group_by("day", AttackLog.attack_type_id, AttackLog.sensor_name_id).subquery()
+        live = self.db.execute(
+            AttackLog.label_grouped(grouped, ["day", "attack_type", "sensor_name", "count", "unique_ips"])
+        ).all()
+
+        counts = {}
+        for bucket, attack_type, sensor_name, count, unique_ips in live:
+            # SQLite returns the bucket as text
+            bucket = datetime.fromisoformat(bucket) if isinstance(bucket, str) else bucket
+            counts[(bucket.date(), attack_type, sensor_name)] = (count, unique_ips)
+        live_days = {key[0] for key in counts}
+
+        rollups = self.db.query(AttackLogDailyRollup).filter(
+            AttackLogDailyRollup.day >= start, AttackLogDailyRollup.day <= end
+        ).all()
+        for r in rollups:
+            if r.day not in live_days:
+                counts[(r.day, r.attack_type, r.sensor_name)] = (r.count, r.unique_ips)
+
+        return [
+            {"day": d.isoformat(), "attack_type": at, "sensor_name": sn, "count": c, "unique_ips": u}
+            for (d, at, sn), (c, u) in sorted(counts.items(), key=lambda item: (item[0][0], -item[1][0]))
+        ]
+
+    def get_geo_counts(self, filters: AttackLogFilter, by: str = "country", limit: int = 20):
+        """
+        Attacks and distinct source IPs per country or ASN, grouped on the
+        columns the ingestor fills from the GeoIP index. Rows it could not
+        place are left out.
+        """
+        column = AttackLog.country_code if by == "country" else AttackLog.asn
+        stmt = select(
+            column, func.count(AttackLog.id).label("count"), func.count(func.distinct(AttackLog.source_ip)).label("unique_ips")
+        ).where(column.isnot(None))
+        stmt = self._apply_filters(stmt, filters)
+        rows = self.db.execute(stmt.group_by(column).order_by(desc("count")).limit(limit)).all()
+        if by == "country":
+            return [{"country_code": key, "count": count, "unique_ips": unique_ips} for key, count, unique_ips in rows]
+        index = get_geoip_index()
+        return [
+            {"asn": key, "as_name": index.as_name(key) if index else None, "count": count, "unique_ips": unique_ips}
+            for key, count, unique_ips in rows
+        ]
 
     def get_summary(self):
         # This mimics the output of Login_statistics.sh
@@ -100,56 +623,116 @@ class AttackLogService:
         }
     
     def refresh_stats(self):
-        # Invalidate cache
+        # Recompute in place so readers never see an empty cache
+        stats = None
         if self.redis_client:
-            self.redis_client.delete("dionaea_stats")
-        return self.get_statistics()
+            try:
+                stats = self._stats_cache().refresh("dionaea_stats", self._compute_statistics)
+            except redis.RedisError as e:
+                logger.error(f"Stats cache unavailable: {e}")
+        if stats is None:
+            stats = self._compute_statistics()
+        local_cache.set("dionaea_stats", stats, settings.STATS_CACHE_HARD_TTL)
+        return stats
+
+    @staticmethod
+    def _traffic_cache_key(filters: Optional[AttackLogFilter]):
+        """
+        Returns (key, ttl) for a traffic query, keyed on the normalized filter
+        tuple. Windows that ended in the past are kept for long, open-ended ones
+        briefly; either is dropped early when an ingest batch overlaps it.
+        """
+        start = filters.start_time.isoformat() if filters and filters.start_time else ""
+        end = filters.end_time.isoformat() if filters and filters.end_time else ""
+        source_ip = (filters.source_ip or "").strip() if filters else ""
+        cidr = (filters.cidr or "").strip() if filters else ""
+        ip_range = (filters.ip_range or "").strip() if filters else ""
+        attack_type = (filters.attack_type or "").strip() if filters else ""
+        granularity = (filters.granularity or "") if filters else ""
+        normalized = "|".join([start, end, source_ip, cidr, ip_range, attack_type, granularity])
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+        closed = bool(filters and filters.start_time and filters.end_time and filters.end_time < datetime.now())
+        ttl = settings.TRAFFIC_CACHE_CLOSED_TTL if closed else settings.TRAFFIC_CACHE_OPEN_TTL
+        return f"dionaea:traffic:{digest}", ttl
 
     def get_traffic_stats(self, filters: AttackLogFilter = None):
         """
-        Get traffic analysis statistics:
-        1. Attack Type Distribution
-        2. Traffic Timeline (Last 24 hours)
+        Get traffic analysis statistics, cached per filter combination
+        (see _traffic_cache_key).
         """
-        # Base query for Attack Type Distribution
-        dist_query = self.db.query(
-            AttackLog.attack_type, func.count(AttackLog.id).label('count')
-        )
-        
-        # Base query for Timeline
-        timeline_query = self.db.query(
-            func.date_trunc('hour', AttackLog.timestamp).label('hour'),
-            func.count(AttackLog.id).label('count')
-        )
+        if self._is_delta(filters):
+            # Small by construction and keyed on a moving boundary: not cached
+            return self._compute_traffic_stats(filters)
+        key, ttl = self._traffic_cache_key(filters)
+        result = read_traffic_cache(self.redis_client, key, ttl)
+        if result is not None:
+            return result
+
+        started = perf_counter()
+        result = self._compute_traffic_stats(filters)
+        store_traffic_cache(self.redis_client, key, ttl, filters, result, perf_counter() - started)
+        return result
 
-        # Apply Filters if provided
+    @staticmethod
+    def _traffic_statements(filters: Optional[AttackLogFilter], dialect: str):
+        """
+        (distribution select, timeline select, start, end, granularity) for
+        the traffic analysis. The timeline covers the last 24 hours unless a
+        start time is given and is bucketed by filters.granularity or
+        automatically. With since_timestamp only the buckets from the one
+        holding it onwards are counted, and there is no distribution select.
+        """
+        now = datetime.now()
+        start_time = filters.start_time if filters and filters.start_time else now - timedelta(hours=24)
+        end_time = filters.end_time if filters and filters.end_time else now
+        granularity = choose_granularity(start_time, end_time, filters.granularity if filters else None)
+        bucket = bucket_expression(AttackLog.timestamp, granularity, dialect).label('bucket')
+
+        dist = select(AttackLog.attack_type_id, func.count(AttackLog.id).label('count'))
+        timeline = select(bucket, func.count(AttackLog.id).label('count'))
         if filters:
-            if filters.start_time:
-                dist_query = dist_query.filter(AttackLog.timestamp >= filters.start_time)
-                timeline_query = timeline_query.filter(AttackLog.timestamp >= filters.start_time)
-            if filters.end_time:
-                dist_query = dist_query.filter(AttackLog.timestamp <= filters.end_time)
-                timeline_query = timeline_query.filter(AttackLog.timestamp <= filters.end_time)
-            if filters.source_ip:
-                dist_query = dist_query.filter(AttackLog.source_ip.contains(filters.source_ip))
-                timeline_query = timeline_query.filter(AttackLog.source_ip.contains(filters.source_ip))
-            if filters.attack_type:
-                dist_query = dist_query.filter(AttackLog.attack_type.contains(filters.attack_type))
-                timeline_query = timeline_query.filter(AttackLog.attack_type.contains(filters.attack_type))
-
-        # 1. Attack Type Distribution Execution
-        attack_types = dist_query.group_by(AttackLog.attack_type).order_by(desc('count')).all()
-        
-        # 2. Traffic Timeline Execution
-        # Default to last 24h if no start time provided for timeline context
+            dist = AttackLogService._apply_filters(dist, filters)
+            timeline = AttackLogService._apply_filters(timeline, filters)
         if not filters or not filters.start_time:
-            now = datetime.now()
-            start_time = now - timedelta(hours=24)
-            timeline_query = timeline_query.filter(AttackLog.timestamp >= start_time)
-        
-        timeline_results = timeline_query.group_by('hour').order_by('hour').all()
-         
-        return {
-            "attack_distribution": [{"name": at, "value": count} for at, count in attack_types if at],
-            "timeline": [{"time": t.isoformat(), "count": c} for t, c in timeline_results]
+            timeline = timeline.filter(AttackLog.timestamp >= start_time)
+        if filters and filters.since_timestamp:
+            # The bucket holding since_timestamp is recounted whole and replaced
+            start_time = max(start_time, floor_bucket(filters.since_timestamp, granularity))
+            timeline = timeline.filter(AttackLog.timestamp >= start_time)
+            return None, timeline.group_by('bucket').order_by('bucket'), start_time, end_time, granularity
+
+        # Grouped on the attack type key, labelled afterwards
+        dist = dist.group_by(AttackLog.attack_type_id).subquery()
+        dist = AttackLog.label_grouped(dist, ["attack_type", "count"]).order_by(desc(dist.c.count))
+        timeline = timeline.group_by('bucket').order_by('bucket')
+        return dist, timeline, start_time, end_time, granularity
+
+    @staticmethod
+    def _traffic_result(attack_types, timeline_rows, start_time: datetime, end_time: datetime, granularity: str):
+        counts = {}
+        for t, c in timeline_rows:
+            # SQLite returns the bucket as text
+            counts[datetime.fromisoformat(t) if isinstance(t, str) else t] = c
+
+        result = {
+            "granularity": granularity,
+            "timeline": fill_gaps(counts, start_time, end_time, granularity)
         }
+        # None for a delta, which carries timeline buckets only
+        if attack_types is not None:
+            result["attack_distribution"] = [{"name": at, "value": count} for at, count in attack_types if at]
+        return result
+
+    def _compute_traffic_stats(self, filters: AttackLogFilter = None):
+        """
+        Get traffic analysis statistics:
+        1. Attack Type Distribution
+        2. Traffic Timeline, gaps filled with 0
+        """
+        dist, timeline, start_time, end_time, granularity = self._traffic_statements(
+            filters, self.db.get_bind().dialect.name
+        )
+        attack_types = self.db.execute(dist).all() if dist is not None else None
+        timeline_rows = self.db.execute(timeline).all()
+        return self._traffic_result(attack_types, timeline_rows, start_time, end_time, granularity)
@@ -0,0 +1,82 @@
+import json
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+import redis
+from app.core.cache import bump_ingest_generation, invalidate_cache_windows
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying one event per committed ingest batch
+INGEST_EVENTS_CHANNEL = "dionaea:ingest:events"
+# Pub/sub channel carrying the committed rows themselves, for live tails
+LIVE_ROWS_CHANNEL = "dionaea:ingest:rows"
+LIVE_ROW_COLUMNS = (
+    "id", "timestamp", "source_ip", "username", "password", "target_port", "protocol",
+    "sensor_name", "attack_type", "country_code", "asn", "raw_log"
+)
+
+def build_ingest_event(entries: list, generation: int) -> Optional[dict]:
+    timestamps = [e.timestamp for e in entries if e.timestamp]
+    if not timestamps:
+        return None
+    return {
+        "generation": generation,
+        "rows": len(entries),
+        "start": min(timestamps).isoformat(),
+        "end": max(timestamps).isoformat(),
+        "attack_types": sorted({e.attack_type for e in entries if e.attack_type}),
+        "sensors": sorted({e.sensor_name for e in entries if e.sensor_name})
+    }
+
+def publish_ingest_batch(redis_client, entries: Iterable) -> Optional[dict]:
+    """
+    Called by the ingestor after a batch is committed: bumps the ingest
+    generation, invalidates cache entries whose window overlaps the batch and
+    publishes a change event (rows, time range, categories, sensors).
+    """
+    if not redis_client:
+        return None
+    entries = list(entries)
+    try:
+        generation = bump_ingest_generation(redis_client)
+        event = build_ingest_event(entries, generation)
+        if event is None:
+            return None
+
+        start = datetime.fromisoformat(event["start"]).timestamp()
+        end = datetime.fromisoformat(event["end"]).timestamp()
+        invalidated = invalidate_cache_windows(redis_client, start, end)
+        event["invalidated"] = invalidated
+
+        redis_client.publish(INGEST_EVENTS_CHANNEL, json.dumps(event))
+        logger.info(f"Ingest generation {generation}: {event['rows']} rows, invalidated {invalidated} cache entries")
+        return event
+    except redis.RedisError as e:
+        logger.error(f"Failed to publish ingest event: {e}")
+        return None
+
+def live_row(entry) -> dict:
+    row = {name: getattr(entry, name, None) for name in LIVE_ROW_COLUMNS}
+    if row["timestamp"]:
+        row["timestamp"] = row["timestamp"].isoformat()
+    return row
+
+def publish_live_rows(redis_client, entries: Iterable, chunk: Optional[int] = None) -> int:
+    """
+    Publishes a committed batch on LIVE_ROWS_CHANNEL, at most
+    LIVE_TAIL_PUBLISH_CHUNK rows per message. Returns the messages sent.
+    """
+    if not redis_client:
+        return 0
+    rows = [live_row(e) for e in entries]
+    chunk = chunk or settings.LIVE_TAIL_PUBLISH_CHUNK
+    sent = 0
+    try:
+        for i in range(0, len(rows), chunk):
+            redis_client.publish(LIVE_ROWS_CHANNEL, json.dumps(rows[i:i + chunk]))
+            sent += 1
+    except redis.RedisError as e:
+        logger.error(f"Failed to publish live rows: {e}")
+    return sent
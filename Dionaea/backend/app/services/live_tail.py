@@ -0,0 +1,121 @@
+import asyncio
+import ipaddress
+import json
+import logging
+from typing import Callable, List, Optional, Set
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+from app.schemas.attack_log import LiveTailFilter
+from app.services.ingest_events import LIVE_ROWS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to resubscribe after Redis went away
+RESUBSCRIBE_DELAY = 2.0
+
+def compile_filter(filters: LiveTailFilter) -> Callable[[dict], bool]:
+    """
+    Predicate over published rows. attack_type matches as a substring (like
+    the /logs filter), sensor exactly, source_ip as a CIDR or a text prefix.
+    Raises ValueError for a malformed CIDR.
+    """
+    network = None
+    prefix = (filters.source_ip or "").strip()
+    if "/" in prefix:
+        network = ipaddress.ip_network(prefix, strict=False)
+
+    def matches(row: dict) -> bool:
+        if filters.attack_type and filters.attack_type not in (row.get("attack_type") or ""):
+            return False
+        if filters.sensor and row.get("sensor_name") != filters.sensor:
+            return False
+        if prefix:
+            address = row.get("source_ip")
+            if not address:
+                return False
+            if network is not None:
+                try:
+                    return ipaddress.ip_address(address) in network
+                except ValueError:
+                    return False
+            return address.startswith(prefix)
+        return True
+
+    return matches
+
+class TailSubscriber:
+    """
+    One client's filter and bounded queue of row batches. When the client
+    falls behind, the oldest batch is discarded and counted in `dropped`
+    (rows), so a slow reader sees fresh rows instead of stalling the hub.
+    """
+
+    def __init__(self, filters: LiveTailFilter, queue_size: int):
+        self.set_filter(filters)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def set_filter(self, filters: LiveTailFilter):
+        self.matches = compile_filter(filters)
+        self.filters = filters
+
+    def offer(self, rows: List[dict]):
+        rows = [row for row in rows if self.matches(row)]
+        if not rows:
+            return
+        if self.queue.full():
+            self.dropped += len(self.queue.get_nowait())
+        self.queue.put_nowait(rows)
+
+class LiveTailHub:
+    """
+    Fans rows published by the ingestors out to this process's live tail
+    clients. One Redis subscription is held while at least one client is
+    connected; each row batch is filtered per client before it is queued.
+    """
+
+    def __init__(self, channel: str = LIVE_ROWS_CHANNEL, queue_size: Optional[int] = None):
+        self.channel = channel
+        self.queue_size = queue_size or settings.LIVE_TAIL_QUEUE_SIZE
+        self.subscribers: Set[TailSubscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, filters: LiveTailFilter) -> TailSubscriber:
+        subscriber = TailSubscriber(filters, self.queue_size)
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber: TailSubscriber):
+        self.subscribers.discard(subscriber)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def dispatch(self, payload: str):
+        try:
+            rows = json.loads(payload)
+        except ValueError:
+            logger.error("Discarding malformed live tail message")
+            return
+        for subscriber in list(self.subscribers):
+            subscriber.offer(rows)
+
+    async def _listen(self):
+        while True:
+            client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.dispatch(message["data"])
+            except (redis.RedisError, OSError) as e:
+                logger.error(f"Live tail subscription lost: {e}")
+            finally:
+                await client.aclose()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+live_tail_hub = LiveTailHub()
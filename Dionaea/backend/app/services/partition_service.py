@@ -0,0 +1,151 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.timeline import floor_bucket
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLE = "attack_logs"
+PARTITION_INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+def partition_bounds(ts: datetime, interval: str) -> Tuple[datetime, datetime]:
+    """
+    [start, end) of the partition holding `ts`. Weeks start on Monday.
+    """
+    start = floor_bucket(ts, interval)
+    return start, start + PARTITION_INTERVALS[interval]
+
+def partition_name(start: datetime, interval: str, table: str = PARTITIONED_TABLE) -> str:
+    prefix = "w" if interval == "week" else "p"
+    return f"{table}_{prefix}{start.strftime('%Y%m%d')}"
+
+def parse_partition_name(name: str, table: str = PARTITIONED_TABLE) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Inverse of partition_name: [start, end) of a range partition, or None for
+    the default partition and unrelated tables.
+    """
+    suffix = name[len(table) + 1:] if name.startswith(f"{table}_") else ""
+    interval = {"p": "day", "w": "week"}.get(suffix[:1])
+    if interval is None:
+        return None
+    try:
+        start = datetime.strptime(suffix[1:], "%Y%m%d")
+    except ValueError:
+        return None
+    return start, start + PARTITION_INTERVALS[interval]
+
+def partition_ranges(first: datetime, last: datetime, interval: str) -> List[Tuple[datetime, datetime]]:
+    """
+    Consecutive partition bounds covering first..last.
+    """
+    ranges = []
+    start, end = partition_bounds(first, interval)
+    while start <= last:
+        ranges.append((start, end))
+        start, end = end, end + PARTITION_INTERVALS[interval]
+    return ranges
+
+class PartitionService:
+    """
+    Maintains the range partitions of attack_logs on PostgreSQL (see
+    scripts/partition_attack_logs.py for the conversion). A no-op on other
+    databases or while attack_logs is still a plain table.
+    """
+
+    def __init__(self, db: Session, interval: Optional[str] = None):
+        self.db = db
+        self.interval = interval or settings.ATTACK_LOG_PARTITION_INTERVAL
+
+    def is_partitioned(self, table: str = PARTITIONED_TABLE) -> bool:
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        return self.db.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table}
+        ).first() is not None
+
+    def list_partitions(self, table: str = PARTITIONED_TABLE) -> List[str]:
+        rows = self.db.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+        ), {"table": table})
+        return [r[0] for r in rows]
+
+    def default_partition(self, table: str = PARTITIONED_TABLE) -> Optional[str]:
+        row = self.db.execute(text(
+            "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partdefid "
+            "WHERE p.partrelid = to_regclass(:table)"
+        ), {"table": table}).first()
+        return row[0] if row else None
+
+    def create_partition(self, start: datetime, table: str = PARTITIONED_TABLE) -> str:
+        """
+        Creates the partition holding `start` in the caller's transaction.
+        PostgreSQL refuses a new range the DEFAULT partition already has rows
+        for (late or backfilled logs, an ingestor outage longer than
+        ATTACK_LOG_PARTITIONS_AHEAD), so DEFAULT is then detached, the
+        partition created, those rows moved into it and DEFAULT reattached.
+        """
+        start, end = partition_bounds(start, self.interval)
+        name = partition_name(start, self.interval, table)
+        bounds = f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+        default = self.default_partition(table)
+        in_range = {"start": start, "end": end}
+        if default is None or self.db.execute(text(
+            f'SELECT 1 FROM "{default}" WHERE timestamp >= :start AND timestamp < :end LIMIT 1'
+        ), in_range).first() is None:
+            self.db.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}'))
+            return name
+
+        self.db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+        self.db.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}'))
+        moved = self.db.execute(text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE timestamp >= :start AND timestamp < :end RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ), in_range).rowcount
+        self.db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+        logger.info(f"Moved {moved} rows from {default} into {name}")
+        return name
+
+    def drop_partition(self, name: str, table: str = PARTITIONED_TABLE):
+        """
+        Detaches and drops one partition: instant, and leaves no dead tuples
+        to vacuum, unlike deleting its rows.
+        """
+        self.db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        self.db.execute(text(f'DROP TABLE "{name}"'))
+        self.db.commit()
+
+    def ensure_partitions(self, now: Optional[datetime] = None, ahead: Optional[int] = None, table: str = PARTITIONED_TABLE) -> List[str]:
+        """
+        Creates the current partition and `ahead` future ones if missing, so
+        inserts never land in the default partition. Returns the names created.
+        """
+        if not self.is_partitioned(table):
+            return []
+        ahead = settings.ATTACK_LOG_PARTITIONS_AHEAD if ahead is None else ahead
+        now = now or datetime.now()
+        existing = set(self.list_partitions(table))
+        last = now + PARTITION_INTERVALS[self.interval] * ahead
+
+        created = []
+        for start, _ in partition_ranges(now, last, self.interval):
+            name = partition_name(start, self.interval, table)
+            if name in existing:
+                continue
+            # One transaction per range: a failure must not block later ones
+            try:
+                self.create_partition(start, table)
+                self.db.commit()
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                logger.error(f"Failed to create partition {name}: {e}")
+                continue
+            created.append(name)
+        if created:
+            logger.info(f"Created attack_logs partitions: {', '.join(created)}")
+        return created
@@ -3,11 +3,11 @@ from sqlalchemy import select
 from app.models.role import Permission
 from app.schemas.permission import PermissionCreate
 import json
-from app.core.config import settings
+import logging
 import redis
+from app.core.redis_client import get_redis
 
-# Redis connection
-redis_client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0, decode_responses=True)
+logger = logging.getLogger(__name__)
 CACHE_KEY_PERMISSIONS = "dionaea:permissions:list"
 
 class PermissionService:
@@ -28,15 +28,24 @@ class PermissionService:
         db.refresh(permission)
         
         # Invalidate cache
-        redis_client.delete(CACHE_KEY_PERMISSIONS)
+        redis_client = get_redis()
+        if redis_client:
+            try:
+                redis_client.delete(CACHE_KEY_PERMISSIONS)
+            except redis.RedisError as e:
+                logger.error(f"Failed to invalidate permissions cache: {e}")
         
         return permission
 
     @staticmethod
     def get_permissions(db: Session, skip: int = 0, limit: int = 100) -> list[Permission]:
         # Try cache first (only for full list/default pagination)
-        if skip == 0 and limit >= 100:
-            cached = redis_client.get(CACHE_KEY_PERMISSIONS)
+        redis_client = get_redis()
+        if skip == 0 and limit >= 100 and redis_client:
+            try:
+                cached = redis_client.get(CACHE_KEY_PERMISSIONS)
+            except redis.RedisError:
+                cached = None
             if cached:
                 # Need to deserialize and convert back to objects/dicts
                 # This is a simplification. Ideally we cache the Pydantic models dump.
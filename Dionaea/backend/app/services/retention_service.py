@@ -0,0 +1,217 @@
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import func, select, delete
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.export import iter_ndjson, iter_gzip
+from app.core.ip_match import ip_in_range, ip_matches, parse_cidr, parse_ip_range
+from app.models.attack_log import AttackLog, AttackLogDailyRollup
+from app.models.node import NodeHistory
+from app.schemas.attack_log import AttackLogFilter
+from app.services.partition_service import PartitionService, parse_partition_name
+
+logger = logging.getLogger(__name__)
+
+# Archived columns per table, in file order
+ARCHIVE_COLUMNS = {
+    "attack_logs": (
+        "id", "timestamp", "source_ip", "username", "password", "target_port",
+        "protocol", "connection_status", "sensor_name", "attack_type", "raw_log",
+        "country_code", "asn"
+    ),
+    "node_history": ("id", "node_id", "status", "cpu_usage", "details", "timestamp"),
+}
+
+class ArchiveStore:
+    """
+    Cold storage for rows past their hot window: one gzipped NDJSON file per
+    archived batch, laid out as <root>/<table>/<YYYY-MM-DD>/<first id>.ndjson.gz.
+    Re-archiving the same batch after a crash rewrites the same file.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.RETENTION_ARCHIVE_DIR
+
+    def _day_dir(self, table: str, day: date) -> str:
+        return os.path.join(self.root, table, day.isoformat())
+
+    def write_batch(self, table: str, day: date, rows: Sequence[Sequence]) -> str:
+        directory = self._day_dir(table, day)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{rows[0][0]}.ndjson.gz")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            for chunk in iter_gzip(iter_ndjson(rows, ARCHIVE_COLUMNS[table])):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return path
+
+    def days(self, table: str) -> List[date]:
+        directory = os.path.join(self.root, table)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(date.fromisoformat(name) for name in os.listdir(directory))
+
+    def iter_day(self, table: str, day: date) -> Iterator[dict]:
+        directory = self._day_dir(table, day)
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".ndjson.gz"):
+                continue
+            with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+                for line in f:
+                    row = json.loads(line)
+                    if row.get("timestamp"):
+                        row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                    yield row
+
+def archive_row_matches(row: dict, filters: AttackLogFilter) -> bool:
+    """
+    Python twin of AttackLogService._apply_filters for archived rows.
+    """
+    ts = row.get("timestamp")
+    if filters.start_time and (ts is None or ts < filters.start_time):
+        return False
+    if filters.end_time and (ts is None or ts > filters.end_time):
+        return False
+    if filters.source_ip and not ip_matches(row.get("source_ip"), filters.source_ip):
+        return False
+    if filters.cidr:
+        network = parse_cidr(filters.cidr)
+        if not ip_in_range(row.get("source_ip"), network.network_address, network.broadcast_address):
+            return False
+    if filters.ip_range and not ip_in_range(row.get("source_ip"), *parse_ip_range(filters.ip_range)):
+        return False
+    for name in ("username", "password", "attack_type"):
+        value = getattr(filters, name)
+        if value and value not in (row.get(name) or ""):
+            return False
+    return True
+
+class RetentionService:
+    """
+    Moves rows older than each table's hot window to the ArchiveStore, one
+    day and RETENTION_BATCH_SIZE rows at a time (each batch is written,
+    fsynced, then deleted and committed). Each archived attack_logs day is
+    then rolled up into attack_log_daily_rollups. When attack_logs is
+    partitioned, expired partitions are archived and then detached and
+    dropped instead of deleted row by row.
+    """
+
+    def __init__(self, db: Session, archive: Optional[ArchiveStore] = None):
+        self.db = db
+        self.archive = archive or ArchiveStore()
+        self.batch_size = settings.RETENTION_BATCH_SIZE
+
+    def hot_days(self) -> Dict[str, int]:
+        return {"attack_logs": settings.ATTACK_LOG_HOT_DAYS, "node_history": settings.NODE_HISTORY_HOT_DAYS}
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Archives everything past its hot window. Returns rows archived per table.
+        """
+        now = now or datetime.now()
+        models = {"attack_logs": AttackLog, "node_history": NodeHistory}
+        archived = {}
+        for table, days in self.hot_days().items():
+            if days <= 0:
+                continue
+            cutoff = datetime.combine(now.date() - timedelta(days=days), time.min)
+            if table == "attack_logs":
+                archived[table] = self._archive_attack_logs(cutoff)
+            else:
+                archived[table] = self._archive_before(models[table], table, cutoff)
+            if archived[table]:
+                logger.info(f"Archived {archived[table]} {table} rows older than {cutoff.date()}")
+        return archived
+
+    def _archive_attack_logs(self, cutoff: datetime) -> int:
+        partitions = PartitionService(self.db)
+        if not partitions.is_partitioned():
+            return self._archive_before(AttackLog, "attack_logs", cutoff)
+
+        archived = 0
+        for name in partitions.list_partitions():
+            bounds = parse_partition_name(name)
+            if bounds is None or bounds[1] > cutoff:
+                continue
+            archived += self._archive_before(AttackLog, "attack_logs", bounds[1], since=bounds[0], delete_rows=False)
+            partitions.drop_partition(name)
+        # The default partition holds stray rows; those are deleted row by row
+        return archived + self._archive_before(AttackLog, "attack_logs", cutoff)
+
+    def _oldest_day(self, model, cutoff: datetime) -> Optional[date]:
+        oldest = self.db.execute(select(func.min(model.timestamp)).where(model.timestamp < cutoff)).scalar()
+        if oldest is None:
+            return None
+        if isinstance(oldest, str):
+            oldest = datetime.fromisoformat(oldest)
+        return oldest.date()
+
+    def _archive_before(self, model, table: str, cutoff: datetime, since: Optional[datetime] = None, delete_rows: bool = True) -> int:
+        archived = 0
+        day = since.date() if since else self._oldest_day(model, cutoff)
+        while day is not None and datetime.combine(day, time.min) < cutoff:
+            start = datetime.combine(day, time.min)
+            end = min(start + timedelta(days=1), cutoff)
+            archived += self._archive_range(model, table, day, start, end, delete_rows)
+            if model is AttackLog:
+                self._rollup_day(day)
+            if delete_rows:
+                day = self._oldest_day(model, cutoff)
+            else:
+                day = day + timedelta(days=1)
+        return archived
+
+    def _archive_range(self, model, table: str, day: date, start: datetime, end: datetime, delete_rows: bool) -> int:
+        if model is AttackLog:
+            base = AttackLog.labeled_select(ARCHIVE_COLUMNS[table])
+        else:
+            base = select(*[getattr(model, name) for name in ARCHIVE_COLUMNS[table]])
+        archived, last_id = 0, 0
+        while True:
+            rows = self.db.execute(
+                base
+                .where(model.timestamp >= start, model.timestamp < end, model.id > last_id)
+                .order_by(model.id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                return archived
+            self.archive.write_batch(table, day, [tuple(r) for r in rows])
+            ids = [r[0] for r in rows]
+            if delete_rows:
+                self.db.execute(delete(model).where(model.id.in_(ids)))
+                self.db.commit()
+            archived += len(rows)
+            last_id = ids[-1]
+
+    def _rollup_day(self, day: date):
+        """
+        Rebuilds the day's per attack type / sensor counts from its archive
+        files, which by now hold every row of the day (including batches
+        archived by an earlier, interrupted run).
+        """
+        counts = defaultdict(int)
+        ips = defaultdict(set)
+        for row in self.archive.iter_day("attack_logs", day):
+            group = (row.get("attack_type"), row.get("sensor_name"))
+            counts[group] += 1
+            if row.get("source_ip"):
+                ips[group].add(row["source_ip"])
+
+        self.db.query(AttackLogDailyRollup).filter(AttackLogDailyRollup.day == day).delete()
+        for (attack_type, sensor_name), count in counts.items():
+            self.db.add(AttackLogDailyRollup(
+                day=day, attack_type=attack_type, sensor_name=sensor_name,
+                count=count, unique_ips=len(ips[(attack_type, sensor_name)])
+            ))
+        self.db.commit()
@@ -0,0 +1,278 @@
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import redis
+from app.core.config import settings
+from app.core.sketches import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+# Sketched dimensions -> AttackLog attribute
+TOPK_DIMENSIONS = ("source_ip", "username", "password")
+TOPK_ALL_TIME = "all"
+# ISO timestamp from which the sketches hold every row, see complete_since()
+TOPK_COMPLETE_SINCE_KEY = "dionaea:topk:complete_since"
+
+def topk_key(dimension: str, window: str) -> str:
+    return f"dionaea:topk:{dimension}:{window}"
+
+def day_window(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%d")
+
+class TopKSketchStore:
+    """
+    Space-Saving sketches of the top source IPs, usernames and passwords,
+    kept in Redis for the all-time window and one window per day.
+    The ingestor folds each committed batch in; the stats endpoints read them
+    back in constant time. Rows stored before the first fold are only covered
+    once scripts/rebuild_sketches.py has run, see complete_since().
+    """
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    def update_batch(self, entries: Iterable):
+        """
+        Folds a batch of AttackLog rows into the all-time and per-day sketches.
+        The first batch after an empty Redis marks the sketches complete
+        from its earliest row.
+        """
+        if not self.redis_client:
+            return
+        entries = list(entries)
+        try:
+            self.fold(entries)
+            timestamps = [e.timestamp for e in entries if e.timestamp]
+            if timestamps:
+                self.redis_client.set(TOPK_COMPLETE_SINCE_KEY, min(timestamps).isoformat(), nx=True)
+        except redis.RedisError as e:
+            logger.error(f"Failed to update top-K sketches: {e}")
+
+    def fold(self, entries: Iterable):
+        """
+        Merges rows into the sketches; raises redis.RedisError. Day windows
+        past TOPK_DAILY_RETENTION_DAYS are not written.
+        """
+        oldest_day = day_window(datetime.now() - timedelta(days=settings.TOPK_DAILY_RETENTION_DAYS))
+        grouped = defaultdict(list)  # {window: [entry, ...]}
+        for entry in entries:
+            grouped[TOPK_ALL_TIME].append(entry)
+            if entry.timestamp and day_window(entry.timestamp) >= oldest_day:
+                grouped[day_window(entry.timestamp)].append(entry)
+
+        for window, batch in grouped.items():
+            for dimension in TOPK_DIMENSIONS:
+                values = [getattr(e, dimension) for e in batch if getattr(e, dimension)]
+                self._merge(topk_key(dimension, window), window, values, len(batch))
+
+    def _merge(self, key: str, window: str, values: list, rows: int):
+        # Optimistic read-modify-write; retried if another ingestor wrote first
+        with self.redis_client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    sketch = SpaceSaving.from_dict(json.loads(raw)) if raw else SpaceSaving(settings.TOPK_SKETCH_CAPACITY)
+                    sketch.update_many(values)
+                    # Rows with an empty value still count towards the window total
+                    sketch.total += rows - len(values)
+
+                    pipe.multi()
+                    if window == TOPK_ALL_TIME:
+                        pipe.set(key, json.dumps(sketch.to_dict()))
+                    else:
+                        pipe.setex(key, settings.TOPK_DAILY_RETENTION_DAYS * 86400, json.dumps(sketch.to_dict()))
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+
+    def get_sketch(self, dimension: str, window: str = TOPK_ALL_TIME) -> Optional[SpaceSaving]:
+        if not self.redis_client:
+            return None
+        try:
+            raw = self.redis_client.get(topk_key(dimension, window))
+        except redis.RedisError as e:
+            logger.error(f"Failed to read top-K sketch: {e}")
+            return None
+        return SpaceSaving.from_dict(json.loads(raw)) if raw else None
+
+    def complete_since(self) -> Optional[datetime]:
+        """
+        Time from which every stored row has been folded in, or None if
+        unknown. A window starting earlier may under-count.
+        """
+        if not self.redis_client:
+            return None
+        try:
+            raw = self.redis_client.get(TOPK_COMPLETE_SINCE_KEY)
+        except redis.RedisError as e:
+            logger.error(f"Failed to read top-K sketch marker: {e}")
+            return None
+        return datetime.fromisoformat(raw) if raw else None
+
+    def mark_complete_since(self, since: datetime):
+        self.redis_client.set(TOPK_COMPLETE_SINCE_KEY, since.isoformat())
+
+    def reset(self):
+        """
+        Drops the marker, then every sketch, so readers fall back to exact
+        queries while they are rebuilt.
+        """
+        self.redis_client.delete(TOPK_COMPLETE_SINCE_KEY)
+        for key in self.redis_client.scan_iter(match=topk_key("*", "*")):
+            self.redis_client.delete(key)
+
+
+# HyperLogLog distinct counters (Redis PFADD / PFCOUNT)
+HLL_DIMENSIONS = ("source_ip", "username", "credential")
+HLL_ALL_SENSORS = "*"
+# ISO timestamp from which the counters hold every row, see complete_since()
+HLL_COMPLETE_SINCE_KEY = "dionaea:hll:complete_since"
+
+def hll_key(dimension: str, bucket: str, sensor: str = HLL_ALL_SENSORS) -> str:
+    return f"dionaea:hll:{dimension}:{sensor}:{bucket}"
+
+def hour_bucket(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H")
+
+def bucket_start(bucket: str) -> datetime:
+    return datetime.strptime(bucket, "%Y-%m-%dT%H" if "T" in bucket else "%Y-%m-%d")
+
+def _hll_value(entry, dimension: str) -> Optional[str]:
+    if dimension == "credential":
+        if entry.username is None and entry.password is None:
+            return None
+        # Unit separator keeps ("ab", "c") and ("a", "bc") apart
+        return f"{entry.username or ''}\x1f{entry.password or ''}"
+    return getattr(entry, dimension)
+
+class DistinctCounterStore:
+    """
+    HyperLogLog counters of distinct source IPs, usernames and credential
+    pairs per hour and per day, overall and per sensor.
+    Redis HLLs merge losslessly, so any range is answered by a single PFCOUNT
+    over the day buckets it covers plus hour buckets at the edges
+    (standard error ~0.81%). As with TopKSketchStore, rows stored before the
+    first batch are only counted after scripts/rebuild_sketches.py.
+    """
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    def update_batch(self, entries: Iterable):
+        """
+        Adds a batch to the counters. The first batch after an empty Redis
+        marks them complete from its earliest row.
+        """
+        if not self.redis_client:
+            return
+        entries = list(entries)
+        try:
+            self.fold(entries)
+            timestamps = [e.timestamp for e in entries if e.timestamp]
+            if timestamps:
+                self.redis_client.set(HLL_COMPLETE_SINCE_KEY, min(timestamps).isoformat(), nx=True)
+        except redis.RedisError as e:
+            logger.error(f"Failed to update distinct counters: {e}")
+
+    def fold(self, entries: Iterable):
+        """
+        Adds rows to their hour and day buckets; raises redis.RedisError.
+        Buckets that would already have expired are not written.
+        """
+        now = datetime.now()
+        oldest_hour = hour_bucket(now - timedelta(days=settings.HLL_HOURLY_RETENTION_DAYS))
+        oldest_day = day_window(now - timedelta(days=settings.HLL_DAILY_RETENTION_DAYS))
+        members: Dict[str, set] = defaultdict(set)  # {key: values}
+        for entry in entries:
+            if not entry.timestamp:
+                continue
+            hour, day = hour_bucket(entry.timestamp), day_window(entry.timestamp)
+            buckets = [b for b, oldest in ((hour, oldest_hour), (day, oldest_day)) if b >= oldest]
+            sensors = (HLL_ALL_SENSORS, entry.sensor_name) if entry.sensor_name else (HLL_ALL_SENSORS,)
+            for dimension in HLL_DIMENSIONS:
+                value = _hll_value(entry, dimension)
+                if not value:
+                    continue
+                for bucket in buckets:
+                    for sensor in sensors:
+                        members[hll_key(dimension, bucket, sensor)].add(value)
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key, values in members.items():
+            pipe.pfadd(key, *values)
+            # Hour buckets only serve range edges, so they can expire sooner
+            days = settings.HLL_HOURLY_RETENTION_DAYS if "T" in key.rsplit(":", 1)[1] else settings.HLL_DAILY_RETENTION_DAYS
+            pipe.expire(key, days * 86400)
+        pipe.execute()
+
+    def complete_since(self) -> Optional[datetime]:
+        """
+        Time from which every stored row has been counted, or None if unknown.
+        """
+        if not self.redis_client:
+            return None
+        try:
+            raw = self.redis_client.get(HLL_COMPLETE_SINCE_KEY)
+        except redis.RedisError as e:
+            logger.error(f"Failed to read distinct counter marker: {e}")
+            return None
+        return datetime.fromisoformat(raw) if raw else None
+
+    def mark_complete_since(self, since: datetime):
+        self.redis_client.set(HLL_COMPLETE_SINCE_KEY, since.isoformat())
+
+    def covers(self, start: datetime, end: datetime, now: Optional[datetime] = None) -> bool:
+        """
+        Whether every bucket count() would merge for [start, end) lies
+        after the completeness marker.
+        """
+        since = self.complete_since()
+        if since is None:
+            return False
+        buckets = self.range_buckets(start, end, now)
+        return not buckets or bucket_start(buckets[0]) >= since
+
+    @staticmethod
+    def range_buckets(start: datetime, end: datetime, now: Optional[datetime] = None) -> List[str]:
+        """
+        Covers [start, end) with whole days where possible and hours at the
+        edges, rounding outwards to the hour. Edges whose hour buckets have
+        already expired (HLL_HOURLY_RETENTION_DAYS) round out to whole days.
+        """
+        hourly_since = (now or datetime.now()) - timedelta(days=settings.HLL_HOURLY_RETENTION_DAYS)
+        cursor = start.replace(minute=0, second=0, microsecond=0)
+        if cursor < hourly_since:
+            cursor = cursor.replace(hour=0)
+        stop = end.replace(minute=0, second=0, microsecond=0)
+        if stop < end:
+            stop += timedelta(hours=1)
+
+        buckets = []
+        while cursor < stop:
+            if cursor.hour == 0 and (cursor + timedelta(days=1) <= stop or cursor < hourly_since):
+                buckets.append(day_window(cursor))
+                cursor += timedelta(days=1)
+            else:
+                buckets.append(hour_bucket(cursor))
+                cursor += timedelta(hours=1)
+        return buckets
+
+    def count(self, dimension: str, start: datetime, end: datetime, sensor: Optional[str] = None) -> Optional[int]:
+        """
+        Estimated distinct values of `dimension` in [start, end), or None if
+        Redis is unavailable.
+        """
+        if not self.redis_client:
+            return None
+        keys = [hll_key(dimension, b, sensor or HLL_ALL_SENSORS) for b in self.range_buckets(start, end)]
+        if not keys:
+            return 0
+        try:
+            return self.redis_client.pfcount(*keys)
+        except redis.RedisError as e:
+            logger.error(f"Failed to read distinct counters: {e}")
+            return None
@@ -10,6 +10,16 @@ from app.db.database import SessionLocal, engine, Base
 from app.models.attack_log import AttackLog
 from app.models.node import Node
 from app.core.rules import RuleEngine
+from app.core.redis_client import get_redis
+from app.core.dimensions import dimension_keys
+from app.core.ip_match import normalize_ip
+from app.core.geoip import enrich, get_geoip_index
+from app.services.sketch_service import TopKSketchStore, DistinctCounterStore
+from app.services.ingest_events import publish_ingest_batch, publish_live_rows
+from app.services.attacker_profile_service import AttackerProfileService
+from app.services.session_service import Sessionizer
+from app.services.partition_service import PartitionService
+from app.core.config import settings
 from watchdog.observers.polling import PollingObserver as Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -56,6 +66,7 @@ class LogHandler(FileSystemEventHandler):
     def __init__(self):
         self.file_offsets = {}
         self.sensor_name = self._get_sensor_name()
+        self.sessionizer = Sessionizer(self.sensor_name)
 
     def _get_sensor_name(self):
         db = SessionLocal()
@@ -113,8 +124,10 @@ class LogHandler(FileSystemEventHandler):
             logger.error(f"Error processing file {filepath}: {e}")
 
     def ingest_lines(self, lines):
-        db = SessionLocal()
+        # Keep committed rows readable for the post-commit aggregate updates
+        db = SessionLocal(expire_on_commit=False)
         new_entries = 0
+        batch = []
         try:
             for line in lines:
                 line = line.strip()
@@ -124,7 +137,7 @@ class LogHandler(FileSystemEventHandler):
                 parsed = self.parse_line(line)
                 if parsed:
                     # Deduplication check
-                    exists = db.query(AttackLog).filter(
+                    exists = db.query(AttackLog.id).filter(
                         AttackLog.timestamp == parsed['timestamp'],
                         AttackLog.username == parsed['username'],
                         AttackLog.source_ip == parsed['source_ip'],
@@ -169,17 +182,34 @@ class LogHandler(FileSystemEventHandler):
                         attack_type=attack_type # Mapped from regex or protocol
                     )
                     db.add(log_entry)
+                    batch.append(log_entry)
                     new_entries += 1
             
             if new_entries > 0:
+                # Country / ASN from the local range index, cached per address
+                enrich(batch, get_geoip_index())
+                # Dimension keys for the whole batch: cache hits, then one
+                # lookup/insert per dimension for values not seen before
+                dimension_keys.assign(db, batch)
+                # Per-IP profiles commit together with the rows they summarize
+                AttackerProfileService(db).update_batch(batch)
+                self.sessionizer.update_batch(db, batch)
                 db.commit()
                 logger.info(f"Ingested {new_entries} new log entries.")
+                # Shared pool; None while Redis is down (circuit open)
+                redis_client = get_redis()
+                TopKSketchStore(redis_client).update_batch(batch)
+                DistinctCounterStore(redis_client).update_batch(batch)
+                publish_ingest_batch(redis_client, batch)
+                publish_live_rows(redis_client, batch)
             else:
                 logger.debug("No new valid entries found.")
                 
         except Exception as e:
             logger.error(f"Database error: {e}")
             db.rollback()
+            # Open sessions are reloaded from the table on the next batch
+            self.sessionizer.reset()
         finally:
             db.close()
 
@@ -197,7 +227,7 @@ class LogHandler(FileSystemEventHandler):
             # Default values
             username = "-"
             password = "-"
-            source_ip = "unknown"
+            source_ip = None
             protocol = "smb"
             
             # Try to extract structured fields
@@ -208,7 +238,7 @@ class LogHandler(FileSystemEventHandler):
             
             if u_match: username = u_match.group('username')
             if p_match: password = p_match.group('password')
-            if i_match: source_ip = i_match.group('ipaddr').strip()
+            if i_match: source_ip = normalize_ip(i_match.group('ipaddr'))
             if pr_match: protocol = pr_match.group('protocol').strip()
             
             # Fallback for "Not Found" logs
@@ -239,6 +269,18 @@ def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created")
+    maintain_partitions()
+
+def maintain_partitions():
+    """Create upcoming attack_logs partitions (no-op unless partitioned)."""
+    db = SessionLocal()
+    try:
+        PartitionService(db).ensure_partitions()
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
 
 def start_monitoring(path):
     event_handler = LogHandler()
@@ -254,9 +296,13 @@ def start_monitoring(path):
     observer.start()
     logger.info(f"Started monitoring {path}")
     
+    last_maintenance = time.monotonic()
     try:
         while True:
             time.sleep(1)
+            if time.monotonic() - last_maintenance >= settings.PARTITION_MAINTENANCE_INTERVAL:
+                maintain_partitions()
+                last_maintenance = time.monotonic()
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
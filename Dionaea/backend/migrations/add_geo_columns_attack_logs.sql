@@ -0,0 +1,21 @@
+-- Country / ASN columns filled by the ingestor from the offline GeoIP index
+-- (app/core/geoip.py). Existing rows stay NULL until
+-- python -m scripts.geoip backfill is run from backend/.
+
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS country_code VARCHAR(2);
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS asn INTEGER;
+
+CREATE INDEX IF NOT EXISTS ix_attack_logs_country_code ON attack_logs (country_code);
+CREATE INDEX IF NOT EXISTS ix_attack_logs_asn ON attack_logs (asn);
+
+-- On a partitioned attack_logs the names above may still belong to
+-- attack_logs_unpartitioned, so its partitions get their own
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('attack_logs')) THEN
+        CREATE INDEX IF NOT EXISTS idx_attack_logs_part_country ON attack_logs (country_code);
+        CREATE INDEX IF NOT EXISTS idx_attack_logs_part_asn ON attack_logs (asn);
+    END IF;
+END
+$$
+
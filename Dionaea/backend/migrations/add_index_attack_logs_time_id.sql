@@ -0,0 +1,3 @@
+-- Composite index backing keyset pagination on attack_logs (timestamp, id)
+
+CREATE INDEX IF NOT EXISTS idx_attack_log_time_id ON attack_logs (timestamp, id);
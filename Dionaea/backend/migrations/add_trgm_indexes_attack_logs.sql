@@ -0,0 +1,9 @@
+-- Trigram GIN indexes so substring (LIKE '%x%') and prefix (LIKE 'x%') filters
+-- can use an index instead of a sequential scan.
+-- Requires PostgreSQL with the pg_trgm contrib extension available.
+-- username, password and attack_type live in dimension tables, whose value
+-- columns get their trigram indexes in normalize_attack_log_dimensions.sql.
+-- source_ip is INET (convert_source_ip_inet.sql), which gin_trgm_ops does not
+-- apply to. Its btree index serves exact, CIDR and range filters instead.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -0,0 +1,19 @@
+-- Converts attack_logs.source_ip from text to inet (see app/models/types.py).
+-- Run once on PostgreSQL with the ingestor stopped. Values that are not an
+-- IPv4 or IPv6 address (e.g. "unknown") become NULL.
+-- The plain btree index on source_ip serves exact matches as well as the
+-- BETWEEN range scans that cidr= and ip_range= compile to, so no GiST
+-- index is needed. The trigram index only worked on text and is dropped.
+
+DROP INDEX IF EXISTS idx_attack_log_source_ip_trgm;
+
+ALTER TABLE attack_logs ALTER COLUMN source_ip TYPE inet USING (
+    CASE
+        WHEN source_ip ~ '^(25[0-5]|2[0-4][0-9]|1?[0-9]?[0-9])(\.(25[0-5]|2[0-4][0-9]|1?[0-9]?[0-9])){3}$' THEN source_ip::inet
+        WHEN source_ip ~ '^[0-9A-Fa-f:.]+$' AND source_ip LIKE '%:%' THEN source_ip::inet
+    END
+);
+
+CREATE INDEX IF NOT EXISTS ix_attack_logs_source_ip ON attack_logs (source_ip);
+
+ANALYZE attack_logs
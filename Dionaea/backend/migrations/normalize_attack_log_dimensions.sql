@@ -0,0 +1,65 @@
+-- Moves the repetitive attack_logs string columns into dimension tables and
+-- replaces them with integer keys (see app/models/dimension.py).
+-- Run once on PostgreSQL with the ingestor stopped. The UPDATE rewrites every
+-- row, so reclaim the space afterwards with VACUUM FULL attack_logs (or
+-- pg_repack) outside this script.
+
+CREATE TABLE IF NOT EXISTS dim_usernames (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_passwords (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_protocols (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_connection_statuses (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_sensors (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_attack_types (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+
+INSERT INTO dim_usernames (value) SELECT DISTINCT username FROM attack_logs WHERE username IS NOT NULL ON CONFLICT DO NOTHING;
+INSERT INTO dim_passwords (value) SELECT DISTINCT password FROM attack_logs WHERE password IS NOT NULL ON CONFLICT DO NOTHING;
+INSERT INTO dim_protocols (value) SELECT DISTINCT protocol FROM attack_logs WHERE protocol IS NOT NULL ON CONFLICT DO NOTHING;
+INSERT INTO dim_connection_statuses (value) SELECT DISTINCT connection_status FROM attack_logs WHERE connection_status IS NOT NULL ON CONFLICT DO NOTHING;
+INSERT INTO dim_sensors (value) SELECT DISTINCT sensor_name FROM attack_logs WHERE sensor_name IS NOT NULL ON CONFLICT DO NOTHING;
+INSERT INTO dim_attack_types (value) SELECT DISTINCT attack_type FROM attack_logs WHERE attack_type IS NOT NULL ON CONFLICT DO NOTHING;
+
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS username_id INTEGER REFERENCES dim_usernames (id);
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS password_id INTEGER REFERENCES dim_passwords (id);
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS protocol_id INTEGER REFERENCES dim_protocols (id);
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS connection_status_id INTEGER REFERENCES dim_connection_statuses (id);
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS sensor_name_id INTEGER REFERENCES dim_sensors (id);
+ALTER TABLE attack_logs ADD COLUMN IF NOT EXISTS attack_type_id INTEGER REFERENCES dim_attack_types (id);
+
+UPDATE attack_logs a SET
+    username_id = (SELECT d.id FROM dim_usernames d WHERE d.value = a.username),
+    password_id = (SELECT d.id FROM dim_passwords d WHERE d.value = a.password),
+    protocol_id = (SELECT d.id FROM dim_protocols d WHERE d.value = a.protocol),
+    connection_status_id = (SELECT d.id FROM dim_connection_statuses d WHERE d.value = a.connection_status),
+    sensor_name_id = (SELECT d.id FROM dim_sensors d WHERE d.value = a.sensor_name),
+    attack_type_id = (SELECT d.id FROM dim_attack_types d WHERE d.value = a.attack_type);
+
+-- Indexes and trigram indexes on the old columns go with them
+ALTER TABLE attack_logs DROP COLUMN IF EXISTS username;
+ALTER TABLE attack_logs DROP COLUMN IF EXISTS password;
+ALTER TABLE attack_logs DROP COLUMN IF EXISTS protocol;
+ALTER TABLE attack_logs DROP COLUMN IF EXISTS connection_status;
+ALTER TABLE attack_logs DROP COLUMN IF EXISTS sensor_name;
+ALTER TABLE attack_logs DROP COLUMN IF EXISTS attack_type;
+
+CREATE INDEX IF NOT EXISTS ix_attack_logs_username_id ON attack_logs (username_id);
+CREATE INDEX IF NOT EXISTS ix_attack_logs_attack_type_id ON attack_logs (attack_type_id);
+CREATE INDEX IF NOT EXISTS idx_attack_log_time_user_ip ON attack_logs (timestamp, username_id, source_ip);
+
+-- A partitioned attack_logs (scripts/partition_attack_logs.py) lost its
+-- idx_attack_logs_part_* indexes on the dropped columns above, and the
+-- index names used above may still belong to attack_logs_unpartitioned
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('attack_logs')) THEN
+        CREATE INDEX IF NOT EXISTS idx_attack_logs_part_time_user_ip ON attack_logs (timestamp, username_id, source_ip);
+        CREATE INDEX IF NOT EXISTS idx_attack_logs_part_username ON attack_logs (username_id);
+        CREATE INDEX IF NOT EXISTS idx_attack_logs_part_attack_type ON attack_logs (attack_type_id);
+    END IF;
+END
+$$;
+
+-- Substring filters now scan the dimension values, not attack_logs
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_dim_usernames_value_trgm ON dim_usernames USING gin (value gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_dim_passwords_value_trgm ON dim_passwords USING gin (value gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_dim_attack_types_value_trgm ON dim_attack_types USING gin (value gin_trgm_ops);
@@ -0,0 +1,19 @@
+-- Range-partitioned copy of attack_logs, filled and swapped in by
+-- scripts/partition_attack_logs.py. The partition key must be part of the
+-- primary key, hence (id, timestamp), which also makes timestamp NOT NULL
+-- (the ingestor always sets it). Indexes declared on the parent are
+-- created on every partition.
+
+CREATE TABLE IF NOT EXISTS attack_logs_partitioned (
+    LIKE attack_logs INCLUDING DEFAULTS,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside every range partition
+CREATE TABLE IF NOT EXISTS attack_logs_partitioned_default PARTITION OF attack_logs_partitioned DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_attack_logs_part_time_id ON attack_logs_partitioned (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_attack_logs_part_time_user_ip ON attack_logs_partitioned (timestamp, username_id, source_ip);
+CREATE INDEX IF NOT EXISTS idx_attack_logs_part_username ON attack_logs_partitioned (username_id);
+CREATE INDEX IF NOT EXISTS idx_attack_logs_part_source_ip ON attack_logs_partitioned (source_ip);
+CREATE INDEX IF NOT EXISTS idx_attack_logs_part_attack_type ON attack_logs_partitioned (attack_type_id);
@@ -0,0 +1,149 @@
+"""
+Compares storage and GROUP BY time of attack_logs with its repetitive
+columns stored as strings (the old layout) against integer keys into
+dimension tables (the current layout), on a synthetic dataset.
+
+Builds bench_wide and bench_narrow (+ bench_dim_* tables) with the same rows,
+then reports table size and the median time of the dashboard's group-bys.
+
+Usage (from backend/; SQLite file by default, or any DATABASE_URL-style URL):
+    python -m scripts.bench_dimensions [rows] [repeats] [url]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+
+DIMENSIONS = {
+    # column: distinct values
+    "username": 5000,
+    "password": 20000,
+    "protocol": 3,
+    "connection_status": 2,
+    "sensor_name": 4,
+    "attack_type": 8,
+}
+CHUNK = 10000
+
+QUERIES = {
+    "attack type distribution": (
+        "SELECT attack_type, count(*) AS c FROM bench_wide GROUP BY attack_type ORDER BY c DESC",
+        "SELECT d.value, g.c FROM (SELECT attack_type_id, count(*) AS c FROM bench_narrow GROUP BY attack_type_id) g "
+        "LEFT JOIN bench_dim_attack_type d ON d.id = g.attack_type_id ORDER BY g.c DESC",
+    ),
+    "top usernames": (
+        "SELECT username, count(*) AS c FROM bench_wide GROUP BY username ORDER BY c DESC LIMIT 5",
+        "SELECT d.value, g.c FROM (SELECT username_id, count(*) AS c FROM bench_narrow GROUP BY username_id "
+        "ORDER BY c DESC LIMIT 5) g LEFT JOIN bench_dim_username d ON d.id = g.username_id ORDER BY g.c DESC",
+    ),
+    "top passwords": (
+        "SELECT password, count(*) AS c FROM bench_wide GROUP BY password ORDER BY c DESC LIMIT 20",
+        "SELECT d.value, g.c FROM (SELECT password_id, count(*) AS c FROM bench_narrow GROUP BY password_id "
+        "ORDER BY c DESC LIMIT 20) g LEFT JOIN bench_dim_password d ON d.id = g.password_id ORDER BY g.c DESC",
+    ),
+    "per sensor / attack type": (
+        "SELECT sensor_name, attack_type, count(*) FROM bench_wide GROUP BY sensor_name, attack_type",
+        "SELECT s.value, a.value, g.c FROM (SELECT sensor_name_id, attack_type_id, count(*) AS c FROM bench_narrow "
+        "GROUP BY sensor_name_id, attack_type_id) g LEFT JOIN bench_dim_sensor_name s ON s.id = g.sensor_name_id "
+        "LEFT JOIN bench_dim_attack_type a ON a.id = g.attack_type_id",
+    ),
+}
+
+def dimension_values(name: str, count: int):
+    if name == "password":
+        return [f"P@ssw0rd-{i:05d}" for i in range(count)]
+    if name == "attack_type":
+        return ["smb", "http", "SQL Injection", "XSS Attack", "Brute Force", "Path Traversal", "Command Injection", "Scanner"]
+    if name == "sensor_name":
+        return [f"Dionaea-Node-10.0.0.{i}" for i in range(count)]
+    return [f"{name}-{i}" for i in range(count)]
+
+def create_tables(conn):
+    for table in ["bench_wide", "bench_narrow", *[f"bench_dim_{n}" for n in DIMENSIONS]]:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    conn.execute(text(
+        "CREATE TABLE bench_wide (id INTEGER PRIMARY KEY, timestamp TIMESTAMP, source_ip VARCHAR, "
+        + ", ".join(f"{n} VARCHAR" for n in DIMENSIONS) + ")"
+    ))
+    conn.execute(text(
+        "CREATE TABLE bench_narrow (id INTEGER PRIMARY KEY, timestamp TIMESTAMP, source_ip VARCHAR, "
+        + ", ".join(f"{n}_id INTEGER" for n in DIMENSIONS) + ")"
+    ))
+    for name in DIMENSIONS:
+        conn.execute(text(f"CREATE TABLE bench_dim_{name} (id INTEGER PRIMARY KEY, value VARCHAR NOT NULL UNIQUE)"))
+
+def fill(conn, rows: int):
+    rng = random.Random(42)
+    values = {name: dimension_values(name, count) for name, count in DIMENSIONS.items()}
+    for name, items in values.items():
+        conn.execute(text(f"INSERT INTO bench_dim_{name} (id, value) VALUES (:id, :value)"),
+                     [{"id": i + 1, "value": v} for i, v in enumerate(items)])
+
+    start = datetime(2026, 1, 1)
+    wide_sql = text(
+        "INSERT INTO bench_wide VALUES (:id, :timestamp, :source_ip, "
+        + ", ".join(f":{n}" for n in DIMENSIONS) + ")"
+    )
+    narrow_sql = text(
+        "INSERT INTO bench_narrow VALUES (:id, :timestamp, :source_ip, "
+        + ", ".join(f":{n}_id" for n in DIMENSIONS) + ")"
+    )
+    for offset in range(0, rows, CHUNK):
+        wide, narrow = [], []
+        for i in range(offset, min(offset + CHUNK, rows)):
+            row = {"id": i + 1, "timestamp": start + timedelta(seconds=i * 5), "source_ip": f"203.0.{rng.randrange(256)}.{rng.randrange(256)}"}
+            keys = {}
+            for name, items in values.items():
+                # Skewed like real credential lists: a few values dominate
+                keys[name] = min(int(rng.paretovariate(1.2)) - 1, len(items) - 1)
+            wide.append({**row, **{name: values[name][k] for name, k in keys.items()}})
+            narrow.append({**row, **{f"{name}_id": k + 1 for name, k in keys.items()}})
+        conn.execute(wide_sql, wide)
+        conn.execute(narrow_sql, narrow)
+
+def table_bytes(conn, tables) -> int:
+    if conn.dialect.name == "postgresql":
+        return sum(conn.execute(text("SELECT pg_total_relation_size(:t)"), {"t": t}).scalar() for t in tables)
+    if conn.dialect.name == "sqlite":
+        return sum(conn.execute(text("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = :t"), {"t": t}).scalar() for t in tables)
+    return 0
+
+def median_seconds(conn, sql: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        conn.execute(text(sql)).all()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def main(rows: int, repeats: int, url: str):
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        create_tables(conn)
+        fill(conn, rows)
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE bench_wide"))
+            conn.execute(text("VACUUM ANALYZE bench_narrow"))
+
+    with engine.connect() as conn:
+        wide = table_bytes(conn, ["bench_wide"])
+        narrow = table_bytes(conn, ["bench_narrow"])
+        dims = table_bytes(conn, [f"bench_dim_{n}" for n in DIMENSIONS])
+        print(f"{rows} rows on {engine.dialect.name}")
+        print(f"  strings: {wide / 1e6:8.1f} MB")
+        print(f"  keys:    {narrow / 1e6:8.1f} MB + {dims / 1e6:.1f} MB dimensions ({(1 - (narrow + dims) / wide) * 100:.0f}% smaller)")
+        for label, (wide_sql, narrow_sql) in QUERIES.items():
+            before = median_seconds(conn, wide_sql, repeats)
+            after = median_seconds(conn, narrow_sql, repeats)
+            print(f"  {label:26s} strings {before * 1000:8.1f} ms   keys {after * 1000:8.1f} ms   x{before / after:.2f}")
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    url = sys.argv[3] if len(sys.argv) > 3 else f"sqlite:///{os.path.join(tempfile.gettempdir(), 'dionaea_bench_dimensions.db')}"
+    main(rows, repeats, url)
@@ -0,0 +1,99 @@
+"""
+Benchmarks attack log search latency before and after the pg_trgm indexes.
+
+Builds a synthetic attack_logs_bench table (10M rows by default) with
+generate_series, times the filters AttackLogService issues, then creates the
+indexes from migrations/add_trgm_indexes_attack_logs.sql on the bench table
+and times them again.
+
+Usage (PostgreSQL only):
+    PYTHONPATH=backend python backend/scripts/bench_trgm_search.py [rows] [repeats]
+"""
+import sys
+import os
+import time
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text
+from app.db.database import engine
+
+BENCH_TABLE = "attack_logs_bench"
+
+QUERIES = {
+    "source_ip substring": f"SELECT count(*) FROM {BENCH_TABLE} WHERE source_ip LIKE '%146.23%'",
+    "source_ip /16 prefix": f"SELECT count(*) FROM {BENCH_TABLE} WHERE source_ip LIKE '45.146.%'",
+    "source_ip exact": f"SELECT count(*) FROM {BENCH_TABLE} WHERE source_ip = '45.146.7.9'",
+    "username substring": f"SELECT count(*) FROM {BENCH_TABLE} WHERE username LIKE '%dmin4%'",
+    "password substring": f"SELECT count(*) FROM {BENCH_TABLE} WHERE password LIKE '%ss12%'",
+    "attack_type substring": f"SELECT count(*) FROM {BENCH_TABLE} WHERE attack_type LIKE '%Inject%'",
+}
+
+INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_bench_source_ip ON {BENCH_TABLE} (source_ip)",
+    f"CREATE INDEX IF NOT EXISTS idx_bench_source_ip_trgm ON {BENCH_TABLE} USING gin (source_ip gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS idx_bench_username_trgm ON {BENCH_TABLE} USING gin (username gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS idx_bench_password_trgm ON {BENCH_TABLE} USING gin (password gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS idx_bench_attack_type_trgm ON {BENCH_TABLE} USING gin (attack_type gin_trgm_ops)",
+]
+
+def build_table(conn, rows: int):
+    print(f"Building {BENCH_TABLE} with {rows} rows...")
+    conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    conn.execute(text(f"""
+        CREATE TABLE {BENCH_TABLE} AS
+        SELECT
+            g AS id,
+            now() - (g || ' seconds')::interval AS timestamp,
+            'admin' || (g % 5000) AS username,
+            'pass' || (g % 20000) AS password,
+            (g % 223 + 1) || '.' || (g / 7 % 256) || '.' || (g / 13 % 256) || '.' || (g % 254 + 1) AS source_ip,
+            (ARRAY['smb', 'http', 'SQL Injection', 'XSS Attack', 'Brute Force'])[g % 5 + 1] AS attack_type
+        FROM generate_series(1, :rows) AS g
+    """), {"rows": rows})
+    conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+    conn.commit()
+
+def time_queries(conn, repeats: int) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        # Warm up once so both runs measure a hot cache
+        conn.execute(text(sql))
+        start = time.perf_counter()
+        for _ in range(repeats):
+            conn.execute(text(sql)).scalar()
+        results[name] = (time.perf_counter() - start) / repeats * 1000
+    return results
+
+def run_benchmark(rows: int = 10_000_000, repeats: int = 5):
+    if engine.dialect.name != "postgresql":
+        print("This benchmark requires PostgreSQL.")
+        return
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        build_table(conn, rows)
+
+        before = time_queries(conn, repeats)
+
+        print("Creating indexes...")
+        for statement in INDEXES:
+            conn.execute(text(statement))
+        conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+        conn.commit()
+
+        after = time_queries(conn, repeats)
+
+        print(f"\n{'query':<24}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+        for name in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:<24}{before[name]:>14.1f}{after[name]:>14.1f}{speedup:>9.1f}x")
+
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.commit()
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    run_benchmark(rows, repeats)
@@ -0,0 +1,28 @@
+import argparse
+from datetime import datetime
+from app.db.database import SessionLocal
+from app.core.columnar import iter_columnar
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService, EXPORT_COLUMNS
+
+def export_range(start: datetime, end: datetime, path: str, fmt: str = "parquet"):
+    db = SessionLocal()
+    try:
+        filters = AttackLogFilter(start_time=start, end_time=end)
+        rows = AttackLogService(db).iter_export_rows(filters)
+        with open(path, "wb") as f:
+            for chunk in iter_columnar(rows, EXPORT_COLUMNS, fmt):
+                f.write(chunk)
+    finally:
+        db.close()
+    print(f"Exported attack_logs [{start}, {end}] to {path}")
+
+if __name__ == "__main__":
+    # Usage: python scripts/export_columnar.py 2026-03-01 2026-03-02 out.parquet [--format arrow]
+    parser = argparse.ArgumentParser(description="Write an attack_logs time range as Parquet or Arrow IPC")
+    parser.add_argument("start", type=datetime.fromisoformat)
+    parser.add_argument("end", type=datetime.fromisoformat)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    args = parser.parse_args()
+    export_range(args.start, args.end, args.path, args.format)
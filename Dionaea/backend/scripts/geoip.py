@@ -0,0 +1,71 @@
+import argparse
+import os
+from collections import defaultdict
+from sqlalchemy import select, update
+from app.core.config import settings
+from app.core.geoip import GeoIPIndex, UNKNOWN, read_ip2asn, write_index
+from app.db.database import SessionLocal
+from app.models.attack_log import AttackLog
+
+# Distinct addresses fetched per chunk, and so at most per UPDATE ... IN (...)
+BACKFILL_CHUNK = 500
+
+def build(source: str, path: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    kept = write_index(read_ip2asn(source), path)
+    print(f"Wrote {kept} ranges to {path}")
+
+def backfill(path: str):
+    """
+    Fills country_code / asn on rows ingested before the index existed.
+    Distinct addresses are streamed in chunks of BACKFILL_CHUNK, with one
+    UPDATE per (country, ASN) in each chunk. Everything commits at the end,
+    since a commit would close the streaming cursor.
+    """
+    index = GeoIPIndex(path, cache_size=0)
+    db = SessionLocal()
+    try:
+        addresses = db.execute(
+            select(AttackLog.source_ip).distinct().where(
+                AttackLog.source_ip.isnot(None), AttackLog.country_code.is_(None), AttackLog.asn.is_(None)
+            ).execution_options(yield_per=BACKFILL_CHUNK)
+        ).scalars()
+        seen = resolved = updated = 0
+        for chunk in addresses.partitions():
+            groups = defaultdict(list)
+            for address in chunk:
+                info = index.lookup(address)
+                if info != UNKNOWN:
+                    groups[info].append(address)
+            for (country_code, asn), group in groups.items():
+                result = db.execute(
+                    update(AttackLog)
+                    .where(AttackLog.source_ip.in_(group), AttackLog.country_code.is_(None), AttackLog.asn.is_(None))
+                    .values(country_code=country_code, asn=asn)
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount
+            seen += len(chunk)
+            resolved += sum(len(g) for g in groups.values())
+        db.commit()
+        print(f"Resolved {resolved} of {seen} addresses, updated {updated} rows")
+    finally:
+        db.close()
+        index.close()
+
+if __name__ == "__main__":
+    # Usage (from backend/):
+    #   python -m scripts.geoip build ip2asn-combined.tsv [--index data/geoip.idx]
+    #   python -m scripts.geoip backfill [--index data/geoip.idx]
+    parser = argparse.ArgumentParser(description="Build the offline GeoIP/ASN index or backfill attack_logs from it")
+    parser.add_argument("command", choices=("build", "backfill"))
+    parser.add_argument("source", nargs="?", help="iptoasn.com ip2asn-combined.tsv (build only)")
+    parser.add_argument("--index", default=settings.GEOIP_INDEX_PATH, help="defaults to GEOIP_INDEX_PATH")
+    args = parser.parse_args()
+    if args.command == "build":
+        if not args.source:
+            parser.error("build needs a source table")
+        build(args.source, args.index)
+    else:
+        backfill(args.index)
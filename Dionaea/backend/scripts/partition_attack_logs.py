@@ -0,0 +1,77 @@
+import argparse
+import os
+from datetime import datetime
+from sqlalchemy import text
+from app.db.database import SessionLocal
+from app.services.partition_service import PartitionService, partition_ranges
+from scripts.run_migration import run_migration
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations", "partition_attack_logs.sql")
+SHADOW_TABLE = "attack_logs_partitioned"
+COPY_BATCH_ROWS = 50000
+
+def copy_range(db, start: datetime, end: datetime, batch_rows: int) -> int:
+    """
+    Copies rows of [start, end) into the shadow table in id-ordered batches,
+    committing after each so locks and WAL stay bounded.
+    """
+    copied, last_id = 0, 0
+    while True:
+        result = db.execute(text(
+            f"INSERT INTO {SHADOW_TABLE} SELECT * FROM attack_logs "
+            "WHERE timestamp >= :start AND timestamp < :end AND id > :last_id "
+            "ORDER BY id LIMIT :batch RETURNING id"
+        ), {"start": start, "end": end, "last_id": last_id, "batch": batch_rows})
+        ids = [r[0] for r in result]
+        db.commit()
+        if not ids:
+            return copied
+        copied += len(ids)
+        last_id = max(ids)
+
+def swap_tables(db, service: PartitionService, after_id: int):
+    """
+    Copies rows that arrived during the backfill (id > after_id), then swaps
+    the tables and renames the partitions in one transaction. The old table
+    is kept as attack_logs_unpartitioned.
+    """
+    db.execute(text("LOCK TABLE attack_logs IN EXCLUSIVE MODE"))
+    db.execute(text(
+        f"INSERT INTO {SHADOW_TABLE} SELECT * FROM attack_logs "
+        "WHERE id > :after_id ON CONFLICT DO NOTHING"
+    ), {"after_id": after_id})
+    partitions = service.list_partitions(SHADOW_TABLE)
+    db.execute(text("ALTER TABLE attack_logs RENAME TO attack_logs_unpartitioned"))
+    db.execute(text(f"ALTER TABLE {SHADOW_TABLE} RENAME TO attack_logs"))
+    for name in partitions:
+        db.execute(text(f'ALTER TABLE "{name}" RENAME TO "{name.replace(SHADOW_TABLE, "attack_logs", 1)}"'))
+    db.execute(text("ALTER SEQUENCE attack_logs_id_seq OWNED BY attack_logs.id"))
+    db.commit()
+
+def main(interval: str, ahead: int, batch_rows: int, swap: bool):
+    run_migration(MIGRATION)
+    db = SessionLocal()
+    try:
+        service = PartitionService(db, interval)
+        first, last, after_id = db.execute(text("SELECT min(timestamp), max(timestamp), coalesce(max(id), 0) FROM attack_logs")).one()
+        if first is not None:
+            for start, end in partition_ranges(first, last, interval):
+                service.create_partition(start, SHADOW_TABLE)
+                db.commit()
+                print(f"{start:%Y-%m-%d}: copied {copy_range(db, start, end, batch_rows)} rows")
+        service.ensure_partitions(ahead=ahead, table=SHADOW_TABLE)
+        if swap:
+            swap_tables(db, service, after_id)
+            print("attack_logs is now partitioned; the old table is attack_logs_unpartitioned")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python -m scripts.partition_attack_logs [--interval day|week] [--swap]
+    parser = argparse.ArgumentParser(description="Convert attack_logs into a range-partitioned table")
+    parser.add_argument("--interval", choices=("day", "week"), default="day")
+    parser.add_argument("--ahead", type=int, default=7, help="future partitions to create")
+    parser.add_argument("--batch-rows", type=int, default=COPY_BATCH_ROWS)
+    parser.add_argument("--swap", action="store_true", help="rename the tables once the copy is done")
+    args = parser.parse_args()
+    main(args.interval, args.ahead, args.batch_rows, args.swap)
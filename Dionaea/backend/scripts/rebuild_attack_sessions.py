@@ -0,0 +1,43 @@
+import argparse
+from sqlalchemy import delete, select
+from app.db.database import SessionLocal
+from app.models.attack_log import AttackLog
+from app.models.attack_session import AttackSession
+from app.services.session_service import Sessionizer
+
+def main(batch_rows: int, gap=None):
+    """
+    Rebuilds attack_sessions from attack_logs in timestamp order, sensor by
+    sensor, one commit per batch. Run with the ingestors stopped.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(delete(AttackSession))
+        db.commit()
+        sensors = db.execute(select(AttackLog.sensor_name).distinct()).scalars().all()
+        for sensor in sensors:
+            sessionizer = Sessionizer(sensor, gap=gap)
+            last, rows = None, 0
+            while True:
+                stmt = select(AttackLog).options(*AttackLog.load_dimensions(["username", "password", "attack_type"])).where(AttackLog.sensor_name == sensor)
+                if last:
+                    stmt = stmt.where((AttackLog.timestamp > last[0]) | ((AttackLog.timestamp == last[0]) & (AttackLog.id > last[1])))
+                batch = db.execute(stmt.order_by(AttackLog.timestamp, AttackLog.id).limit(batch_rows)).scalars().all()
+                if not batch:
+                    break
+                sessionizer.update_batch(db, batch)
+                db.commit()
+                db.expunge_all()
+                rows += len(batch)
+                last = (batch[-1].timestamp, batch[-1].id)
+            print(f"{sensor}: sessionized {rows} rows")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage (from backend/): python -m scripts.rebuild_attack_sessions [--batch-rows 10000] [--gap 1800]
+    parser = argparse.ArgumentParser(description="Rebuild attack_sessions from attack_logs")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    parser.add_argument("--gap", type=int, default=None, help="defaults to SESSION_INACTIVITY_GAP")
+    args = parser.parse_args()
+    main(args.batch_rows, args.gap)
@@ -0,0 +1,39 @@
+import argparse
+from sqlalchemy import delete, select
+from app.db.database import SessionLocal
+from app.models.attack_log import AttackLog
+from app.models.attacker_profile import AttackerProfile
+from app.services.attacker_profile_service import AttackerProfileService
+
+def main(batch_rows: int):
+    """
+    Rebuilds attacker_profiles from attack_logs in id order, one commit per
+    batch. Run with the ingestor stopped.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(delete(AttackerProfile))
+        db.commit()
+        service = AttackerProfileService(db)
+        last_id, rows, profiles = 0, 0, 0
+        while True:
+            batch = db.execute(
+                select(AttackLog).options(*AttackLog.load_dimensions()).where(AttackLog.id > last_id).order_by(AttackLog.id).limit(batch_rows)
+            ).scalars().all()
+            if not batch:
+                break
+            profiles += service.update_batch(batch)
+            db.commit()
+            db.expunge_all()
+            rows += len(batch)
+            last_id = batch[-1].id
+        print(f"Folded {rows} rows into attacker_profiles ({profiles} profile updates)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage (from backend/): python -m scripts.rebuild_attacker_profiles [--batch-rows 10000]
+    parser = argparse.ArgumentParser(description="Rebuild attacker_profiles from attack_logs")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.batch_rows)
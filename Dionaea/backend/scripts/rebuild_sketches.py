@@ -0,0 +1,53 @@
+import argparse
+from datetime import datetime, time, timedelta
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.database import SessionLocal
+from app.models.attack_log import AttackLog
+from app.services.sketch_service import DistinctCounterStore, TopKSketchStore
+
+def main(batch_rows: int):
+    """
+    Rebuilds the top-K sketches and adds attack_logs to the distinct
+    counters, in id order, then marks both complete from the first stored
+    day so approximate stats stop falling back to exact queries. Counter
+    buckets past HLL_DAILY_RETENTION_DAYS are not written, so the counters
+    are marked complete from that day at the earliest. PFADD is idempotent
+    and the counters are not cleared. Run with the ingestor stopped.
+    """
+    redis_client = get_redis()
+    if redis_client is None:
+        raise SystemExit("Redis is unavailable")
+    store, counters = TopKSketchStore(redis_client), DistinctCounterStore(redis_client)
+    store.reset()
+    db = SessionLocal()
+    try:
+        first = db.scalar(select(func.min(AttackLog.timestamp)))
+        last_id, rows = 0, 0
+        while True:
+            batch = db.execute(
+                select(AttackLog).options(*AttackLog.load_dimensions(["username", "password", "sensor_name"]))
+                .where(AttackLog.id > last_id).order_by(AttackLog.id).limit(batch_rows)
+            ).scalars().all()
+            if not batch:
+                break
+            store.fold(batch)
+            counters.fold(batch)
+            db.expunge_all()
+            rows += len(batch)
+            last_id = batch[-1].id
+        since = datetime.combine((first or datetime.now()).date(), time.min)
+        store.mark_complete_since(since)
+        counted_since = datetime.combine((datetime.now() - timedelta(days=settings.HLL_DAILY_RETENTION_DAYS)).date(), time.min)
+        counters.mark_complete_since(max(since, counted_since))
+        print(f"Folded {rows} rows into the top-K sketches and distinct counters, complete since {since:%Y-%m-%d}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage (from backend/): python -m scripts.rebuild_sketches [--batch-rows 10000]
+    parser = argparse.ArgumentParser(description="Rebuild the top-K sketches and distinct counters from attack_logs")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.batch_rows)
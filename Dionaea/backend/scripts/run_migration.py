@@ -1,17 +1,41 @@
+import sys
 from sqlalchemy import text
 from app.db.database import engine
 
-def run_migration():
+DEFAULT_MIGRATION = "backend/migrations/add_column_attack_logs.sql"
+
+def split_statements(sql: str) -> list:
+    """
+    Splits a migration on ';', except inside $$-quoted bodies such as DO
+    blocks, whose own statements end in ';' too.
+    """
+    statements, current = [], ""
+    for i, part in enumerate(sql.split("$$")):
+        if i % 2:
+            current += f"$${part}$$"
+            continue
+        pieces = part.split(";")
+        current += pieces[0]
+        for piece in pieces[1:]:
+            statements.append(current)
+            current = piece
+    statements.append(current)
+    return statements
+
+def run_migration(path: str = DEFAULT_MIGRATION):
     with engine.connect() as connection:
-        with open("backend/migrations/add_column_attack_logs.sql", "r") as f:
+        with open(path, "r") as f:
             sql = f.read()
             # Split by ; to run multiple statements if needed, but text() might handle it or need separate execution
-            statements = sql.split(';')
+            statements = split_statements(sql)
             for statement in statements:
                 if statement.strip():
                     connection.execute(text(statement))
             connection.commit()
-            print("Migration executed successfully.")
+            print(f"Migration {path} executed successfully.")
 
 if __name__ == "__main__":
-    run_migration()
+    # Usage: python scripts/run_migration.py [backend/migrations/<file>.sql ...]
+    paths = sys.argv[1:] or [DEFAULT_MIGRATION]
+    for path in paths:
+        run_migration(path)
@@ -0,0 +1,19 @@
+import argparse
+from app.db.database import SessionLocal
+from app.services.retention_service import RetentionService, ArchiveStore
+
+def main(archive_dir=None):
+    db = SessionLocal()
+    try:
+        archived = RetentionService(db, ArchiveStore(archive_dir)).run()
+    finally:
+        db.close()
+    for table, rows in archived.items():
+        print(f"{table}: archived {rows} rows")
+
+if __name__ == "__main__":
+    # Usage (cron, daily): python -m scripts.run_retention [--archive-dir /var/lib/dionaea/archive]
+    parser = argparse.ArgumentParser(description="Archive attack_logs / node_history rows past their hot window")
+    parser.add_argument("--archive-dir", default=None, help="defaults to RETENTION_ARCHIVE_DIR")
+    args = parser.parse_args()
+    main(args.archive_dir)
@@ -1,10 +1,14 @@
+from datetime import timedelta
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
-from app.db.database import Base, get_db
+from app.db.database import Base, get_db, get_async_db
 from app.core.config import settings
+from app.models.attack_log import AttackLog
 
 # Use SQLite for testing or a test PostgreSQL database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -13,6 +17,9 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async endpoints read the same file through aiosqlite
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 @pytest.fixture(scope="module")
 def db():
@@ -32,5 +39,126 @@ def client(db):
         finally:
             db.close()
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestClient(app)
+
+class FakeLock:
+    def __init__(self, held: set, name: str):
+        self.held = held
+        self.name = name
+
+    def acquire(self, blocking=True, blocking_timeout=None):
+        if self.name in self.held:
+            return False
+        self.held.add(self.name)
+        return True
+
+    def release(self):
+        self.held.discard(self.name)
+
+def attack_log_rows(n, base_time, step=timedelta(minutes=1), per_step=1, **overrides):
+    """
+    n unsaved AttackLog rows, `per_step` sharing each timestamp from
+    base_time on. Overrides are column values or callables of the row index.
+    """
+    rows = []
+    for i in range(n):
+        values = {"timestamp": base_time + step * (i // per_step), "raw_log": f"line {i}"}
+        values.update({name: value(i) if callable(value) else value for name, value in overrides.items()})
+        rows.append(AttackLog(**values))
+    return rows
+
+def seed_attack_logs(db, n, base_time, step=timedelta(minutes=1), per_step=1, **overrides):
+    """
+    attack_log_rows, added and committed.
+    """
+    rows = attack_log_rows(n, base_time, step, per_step, **overrides)
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+class FakePipeline:
+    """Queues calls and replays them on the FakeRedis at execute()."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.redis_client, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+class FakeRedis:
+    """In-memory stand-in for the handful of redis-py calls the caches make."""
+
+    def __init__(self):
+        self.store = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.held = set()
+        self.published = []
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, keepttl=False, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    def hdel(self, name, *keys):
+        for key in keys:
+            self.hashes.get(name, {}).pop(key, None)
+
+    def zadd(self, name, mapping):
+        self.zsets.setdefault(name, {}).update(mapping)
+
+    def zrangebyscore(self, name, low, high):
+        low, high = float(low), float(high)
+        items = sorted(self.zsets.get(name, {}).items(), key=lambda item: item[1])
+        return [member for member, score in items if low <= score <= high]
+
+    def zrem(self, name, *members):
+        for member in members:
+            self.zsets.get(name, {}).pop(member, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def lock(self, name, timeout=None, thread_local=True):
+        return FakeLock(self.held, name)
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService
+from app.services.async_attack_log_service import AsyncAttackLogService
+from app.core.cache import local_cache
+from tests.conftest import TestingAsyncSessionLocal, seed_attack_logs
+
+BASE_TIME = datetime(2026, 4, 1, 8, 0, 0)
+
+@pytest.fixture(scope="module")
+def seeded_db(db):
+    seed_attack_logs(
+        db, 30, BASE_TIME, per_step=3,
+        username=lambda i: f"user{i % 3}",
+        source_ip=lambda i: f"10.1.0.{i % 6}",
+        attack_type=lambda i: "smb" if i % 2 else "http"
+    )
+    return db
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    local_cache.clear()
+
+async def _async_pages(filters_list):
+    async with TestingAsyncSessionLocal() as session:
+        service = AsyncAttackLogService(session)
+        return [await service.get_logs(f) for f in filters_list]
+
+def test_async_pages_match_sync(seeded_db):
+    sync_service = AttackLogService(seeded_db)
+    first, total, cursors = sync_service.get_logs(AttackLogFilter(limit=8, source_ip="10.1.0.0/24"))
+    second, _, _ = sync_service.get_logs(AttackLogFilter(limit=8, source_ip="10.1.0.0/24", cursor=cursors["next"]))
+
+    (a_first, a_total, a_cursors), (a_second, _, _) = asyncio.run(_async_pages([
+        AttackLogFilter(limit=8, source_ip="10.1.0.0/24"),
+        AttackLogFilter(limit=8, source_ip="10.1.0.0/24", cursor=cursors["next"]),
+    ]))
+    assert [l.id for l in a_first] == [l.id for l in first]
+    assert [l.id for l in a_second] == [l.id for l in second]
+    assert a_total == total == 30
+    assert a_cursors == cursors
+
+def test_async_traffic_matches_sync(seeded_db):
+    filters = AttackLogFilter(start_time=BASE_TIME, end_time=BASE_TIME + timedelta(minutes=10), granularity="minute")
+    expected = AttackLogService(seeded_db)._compute_traffic_stats(filters)
+
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await AsyncAttackLogService(session).get_traffic_stats(filters)
+
+    assert asyncio.run(run()) == expected
+
+def test_concurrent_requests_share_the_loop(seeded_db):
+    async def run():
+        async def one(i):
+            async with TestingAsyncSessionLocal() as session:
+                logs, _, _ = await AsyncAttackLogService(session).get_logs(AttackLogFilter(limit=5, offset=i))
+                return len(logs)
+        return await asyncio.gather(*(one(i) for i in range(10)))
+
+    assert asyncio.run(run()) == [5] * 10
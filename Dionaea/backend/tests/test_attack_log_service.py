@@ -0,0 +1,259 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.models.attack_log import AttackLog
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService, EXPORT_COLUMNS
+from app.core.config import settings
+from app.core.cache import cache_metrics, local_cache
+from app.core.sketches import SpaceSaving
+from app.services.sketch_service import TOPK_ALL_TIME, TOPK_COMPLETE_SINCE_KEY, day_window, topk_key
+from app.services.ingest_events import publish_ingest_batch, INGEST_EVENTS_CHANNEL
+from sqlalchemy.dialects import postgresql
+from tests.conftest import seed_attack_logs
+
+BASE_TIME = datetime(2026, 3, 1, 12, 0, 0)
+
+@pytest.fixture(scope="module")
+def seeded_db(db):
+    # 25 logs; pairs share a timestamp so the id tie-breaker is exercised
+    seed_attack_logs(
+        db, 25, BASE_TIME, per_step=2,
+        username=lambda i: f"user{i % 3}",
+        password=lambda i: f"pass{i % 4}",
+        source_ip=lambda i: f"10.0.0.{i % 5}",
+        protocol="smb",
+        attack_type=lambda i: "smb" if i % 2 else "http"
+    )
+    return db
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    local_cache.clear()
+
+def _ids(logs):
+    return [log.id for log in logs]
+
+def test_keyset_pages_match_offset_pages(seeded_db):
+    service = AttackLogService(seeded_db)
+    expected, _, _ = service.get_logs(AttackLogFilter(limit=100))
+
+    seen = []
+    cursor = None
+    while True:
+        logs, total, cursors = service.get_logs(AttackLogFilter(limit=7, cursor=cursor))
+        seen.extend(_ids(logs))
+        cursor = cursors["next"]
+        if not cursor:
+            break
+
+    assert total == 25
+    assert seen == _ids(expected)
+
+def test_prev_cursor_returns_previous_page(seeded_db):
+    service = AttackLogService(seeded_db)
+    first, _, cursors = service.get_logs(AttackLogFilter(limit=5))
+    assert cursors["prev"] is None
+
+    second, _, cursors = service.get_logs(AttackLogFilter(limit=5, cursor=cursors["next"]))
+    assert cursors["prev"] is not None
+
+    back, _, cursors = service.get_logs(AttackLogFilter(limit=5, cursor=cursors["prev"]))
+    assert _ids(back) == _ids(first)
+    assert cursors["prev"] is None
+    assert cursors["next"] is not None
+
+def test_invalid_cursor_rejected(seeded_db):
+    service = AttackLogService(seeded_db)
+    with pytest.raises(HTTPException) as exc:
+        service.get_logs(AttackLogFilter(cursor="not-a-cursor"))
+    assert exc.value.status_code == 400
+
+def test_include_total_modes(seeded_db, monkeypatch):
+    service = AttackLogService(seeded_db)
+    _, total, _ = service.get_logs(AttackLogFilter(include_total="none"))
+    assert total is None
+
+    _, total, _ = service.get_logs(AttackLogFilter(include_total="estimate"))
+    assert total == 25
+
+    monkeypatch.setattr(settings, "LOG_COUNT_ESTIMATE_CAP", 10)
+    _, total, _ = service.get_logs(AttackLogFilter(include_total="estimate"))
+    assert total == "10+"
+
+def test_statistics_single_scan(seeded_db):
+    service = AttackLogService(seeded_db)
+    service.redis_client = None
+    stats = service.get_statistics()
+
+    assert stats["total_logs"] == 25
+    # 25 rows over 5 IPs (i % 5), 3 usernames (i % 3), 4 passwords (i % 4)
+    assert {ip["name"]: ip["value"] for ip in stats["top_ips"]} == {f"10.0.0.{i}": 5 for i in range(5)}
+    assert stats["top_usernames"][0] == {"name": "user0", "value": 9}
+    assert stats["top_passwords"][0] == {"name": "pass0", "value": 7}
+
+def test_statistics_grouping_sets_statement(seeded_db):
+    sql = str(AttackLogService(seeded_db)._grouping_sets_statement().compile(dialect=postgresql.dialect()))
+    assert "GROUPING SETS" in sql
+    assert sql.count("FROM attack_logs") == 1
+
+def test_statistics_day_window_falls_back_to_exact(seeded_db):
+    service = AttackLogService(seeded_db)
+    service.redis_client = None
+    stats = service.get_statistics(approximate=True, day=BASE_TIME.date())
+    assert "approximate" not in stats
+    assert stats["total_logs"] == 25
+
+    stats = service.get_statistics(day=(BASE_TIME + timedelta(days=1)).date())
+    assert stats["total_logs"] == 0
+
+def test_statistics_sketches_used_once_complete(seeded_db, fake_redis):
+    service = AttackLogService(seeded_db)
+    service.redis_client = fake_redis
+    sketch = SpaceSaving(capacity=10)
+    sketch.update_many(["x", "x", "y"])
+    for name in ("source_ip", "username", "password"):
+        for window in (TOPK_ALL_TIME, day_window(BASE_TIME)):
+            fake_redis.set(topk_key(name, window), json.dumps(sketch.to_dict()))
+
+    # No marker: the sketches may have started after rows were stored
+    assert "approximate" not in service.get_statistics(approximate=True)
+    fake_redis.set(TOPK_COMPLETE_SINCE_KEY, (BASE_TIME + timedelta(minutes=5)).isoformat())
+    assert service.get_statistics(approximate=True)["total_logs"] == 25
+    assert "approximate" not in service.get_statistics(approximate=True, day=BASE_TIME.date())
+
+    fake_redis.set(TOPK_COMPLETE_SINCE_KEY, datetime.combine(BASE_TIME.date(), datetime.min.time()).isoformat())
+    stats = service.get_statistics(approximate=True)
+    assert stats["approximate"] and stats["total_logs"] == 3
+    assert service.get_statistics(approximate=True, day=BASE_TIME.date())["window"] == day_window(BASE_TIME)
+
+def test_unique_counts_exact_until_counters_cover_range(seeded_db):
+    service = AttackLogService(seeded_db)
+    service.redis_client = None
+    counts = service.get_unique_counts(BASE_TIME, BASE_TIME + timedelta(days=1))
+    # 5 IPs (i % 5), 3 usernames (i % 3), 12 (i % 3, i % 4) credential pairs
+    assert (counts["unique_attackers"], counts["unique_usernames"], counts["unique_credentials"]) == (5, 3, 12)
+    assert counts["approximate"] is False
+    assert service.get_unique_counts(BASE_TIME, BASE_TIME + timedelta(days=1), sensor="none")["unique_attackers"] == 0
+
+def test_traffic_cache_key_tracks_window(seeded_db, fake_redis):
+    service = AttackLogService(seeded_db)
+    service.redis_client = fake_redis
+
+    closed = AttackLogFilter(start_time=BASE_TIME, end_time=BASE_TIME + timedelta(days=1), source_ip=" 10.0.0.1 ")
+    key, ttl = service._traffic_cache_key(closed)
+    assert ttl == settings.TRAFFIC_CACHE_CLOSED_TTL
+    assert service._traffic_cache_key(closed.model_copy(update={"source_ip": "10.0.0.1"}))[0] == key
+
+    _, ttl = service._traffic_cache_key(AttackLogFilter(start_time=BASE_TIME))
+    assert ttl == settings.TRAFFIC_CACHE_OPEN_TTL
+
+def test_traffic_cache_counts_separately(seeded_db, fake_redis):
+    service = AttackLogService(seeded_db)
+    service.redis_client = fake_redis
+    cache_metrics.reset()
+    filters = AttackLogFilter(start_time=BASE_TIME, end_time=BASE_TIME + timedelta(hours=1))
+    assert service.get_traffic_stats(filters) == service.get_traffic_stats(filters)
+
+    metrics = cache_metrics.snapshot()
+    assert (metrics["traffic_misses"], metrics["traffic_hits"], metrics["traffic_refreshes"]) == (1, 1, 1)
+    assert (metrics["misses"], metrics["hits"], metrics["refreshes"]) == (0, 0, 0)
+
+def test_ingest_event_invalidates_overlapping_entries(seeded_db, fake_redis):
+    service = AttackLogService(seeded_db)
+    service.redis_client = fake_redis
+    day = BASE_TIME.date()
+    other_day = (BASE_TIME - timedelta(days=10)).date()
+    service.get_statistics(day=day)
+    service.get_statistics(day=other_day)
+
+    batch = seeded_db.query(AttackLog).limit(3).all()
+    event = publish_ingest_batch(fake_redis, batch)
+
+    assert event["rows"] == 3
+    assert event["invalidated"] == 1
+    assert json.loads(fake_redis.get(f"dionaea_stats:{day.isoformat()}"))["refreshed_at"] == 0
+    assert json.loads(fake_redis.get(f"dionaea_stats:{other_day.isoformat()}"))["refreshed_at"] > 0
+    assert fake_redis.published[0][0] == INGEST_EVENTS_CHANNEL
+
+def test_traffic_timeline_is_gap_filled(seeded_db):
+    service = AttackLogService(seeded_db)
+    service.redis_client = None
+    filters = AttackLogFilter(start_time=BASE_TIME - timedelta(minutes=10), end_time=BASE_TIME + timedelta(minutes=30), granularity="5m")
+    result = service.get_traffic_stats(filters)
+
+    assert result["granularity"] == "5m"
+    counts = [point["count"] for point in result["timeline"]]
+    assert len(counts) == 9
+    assert sum(counts) == 25
+    assert counts[0] == 0
+    assert {item["name"]: item["value"] for item in result["attack_distribution"]} == {"http": 13, "smb": 12}
+
+def test_traffic_delta_recounts_from_last_bucket(seeded_db):
+    service = AttackLogService(seeded_db)
+    service.redis_client = None
+    window = dict(start_time=BASE_TIME - timedelta(minutes=10), end_time=BASE_TIME + timedelta(minutes=30), granularity="5m")
+    full = service.get_traffic_stats(AttackLogFilter(**window))
+    delta = service.get_traffic_stats(AttackLogFilter(**window, since_timestamp=BASE_TIME + timedelta(minutes=7)))
+
+    assert "attack_distribution" not in delta
+    assert delta["timeline"][0]["time"] == (BASE_TIME + timedelta(minutes=5)).isoformat()
+    assert delta["timeline"] == full["timeline"][-len(delta["timeline"]):]
+    assert [point["count"] for point in delta["timeline"]] == [10, 5, 0, 0, 0, 0]
+
+def test_since_delta_returns_only_newer_rows(seeded_db):
+    service = AttackLogService(seeded_db)
+    window = dict(start_time=BASE_TIME, end_time=BASE_TIME + timedelta(hours=1), include_total="none")
+    full, _, _ = service.get_logs(AttackLogFilter(limit=100, **window))
+    # The client's newest row; full[6] shares its timestamp
+    held = full[5]
+
+    for since in ({"since_timestamp": held.timestamp, "since_id": held.id}, {"since_timestamp": held.timestamp}, {"since_id": held.id}):
+        delta, _, cursors = service.get_logs(AttackLogFilter(limit=10, **window, **since))
+        assert _ids(delta) == _ids(full[:5])
+        assert cursors == {"next": None, "prev": None, "truncated": False}
+
+    delta, _, cursors = service.get_logs(AttackLogFilter(limit=3, since_id=held.id, **window))
+    assert _ids(delta) == _ids(full[:3]) and cursors["truncated"]
+    with pytest.raises(HTTPException) as exc:
+        service.get_logs(AttackLogFilter(since_id=held.id, cursor="x"))
+    assert exc.value.status_code == 400
+
+def test_export_rows_follow_filters(seeded_db):
+    service = AttackLogService(seeded_db)
+    rows = list(service.iter_export_rows(AttackLogFilter(attack_type="smb")))
+    assert len(rows) == 12
+    assert len(rows[0]) == len(EXPORT_COLUMNS)
+    timestamps = [row[EXPORT_COLUMNS.index("timestamp")] for row in rows]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+def test_fields_projection_returns_rows(seeded_db):
+    service = AttackLogService(seeded_db)
+    full, _, full_cursors = service.get_logs(AttackLogFilter(limit=5))
+    rows, _, cursors = service.get_logs(AttackLogFilter(limit=5, fields=["source_ip", "username"]))
+
+    assert list(rows[0]._mapping) == ["id", "timestamp", "source_ip", "username"]
+    assert [r.id for r in rows] == [l.id for l in full]
+    assert rows[0].source_ip == full[0].source_ip
+    assert cursors == full_cursors
+
+def test_fields_projection_rejects_unknown_columns(seeded_db):
+    with pytest.raises(HTTPException) as exc:
+        AttackLogService(seeded_db).get_logs(AttackLogFilter(fields=["source_ip", "create_by"]))
+    assert exc.value.status_code == 400
+
+def test_cidr_and_ip_range_filters(seeded_db):
+    service = AttackLogService(seeded_db)
+    # source_ip cycles over 10.0.0.0-4, 5 rows each
+    _, total, _ = service.get_logs(AttackLogFilter(cidr="10.0.0.0/31", include_total="exact"))
+    assert total == 10
+    logs, total, _ = service.get_logs(AttackLogFilter(ip_range="10.0.0.2-10.0.0.4", include_total="exact", limit=50))
+    assert total == 15
+    assert {log.source_ip for log in logs} == {"10.0.0.2", "10.0.0.3", "10.0.0.4"}
+
+def test_malformed_ip_filters_rejected():
+    for filters in (AttackLogFilter(cidr="10.0.0.0/33"), AttackLogFilter(ip_range="10.0.0.9-10.0.0.1")):
+        with pytest.raises(HTTPException) as exc:
+            AttackLogService.ip_filter_clauses(filters)
+        assert exc.value.status_code == 400
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.core.dependencies import get_current_active_user
+from app.db.database import get_db
+from app.core.sketches import HyperLogLog
+from app.main import app
+from app.models.user import User
+from app.services.attacker_profile_service import AttackerProfileService
+from tests.conftest import attack_log_rows
+
+BASE_TIME = datetime(2026, 6, 1, 10, 0, 0)
+
+def _batch(ip, count, start, usernames, attack_type="smb", sensor="sensor-a"):
+    return attack_log_rows(
+        count, start, step=timedelta(seconds=1), source_ip=ip,
+        username=lambda i: usernames[i % len(usernames)], password=lambda i: f"pw{i}",
+        attack_type=attack_type, sensor_name=sensor
+    )
+
+@pytest.fixture(scope="module")
+def profiles_db(db):
+    service = AttackerProfileService(db)
+    for batch in (
+        _batch("198.51.100.1", 6, BASE_TIME, ["root", "admin"]),
+        _batch("198.51.100.2", 2, BASE_TIME + timedelta(hours=1), ["guest"], attack_type="http"),
+        _batch("2001:db8::7", 4, BASE_TIME + timedelta(hours=2), ["oracle"]),
+        # Second batch for the first IP, earlier and later events, a new sensor
+        _batch("198.51.100.1", 3, BASE_TIME - timedelta(hours=1), ["root", "test"], sensor="sensor-b")
+        + _batch("198.51.100.1", 1, BASE_TIME + timedelta(hours=5), ["root"], attack_type="Brute Force"),
+    ):
+        db.add_all(batch)
+        service.update_batch(batch)
+        db.commit()
+    return db
+
+def test_hyperloglog_estimates_and_merges():
+    a, b = HyperLogLog(), HyperLogLog()
+    a.update_many(f"user{i}" for i in range(3000))
+    b.update_many(f"user{i}" for i in range(2000, 5000))
+    assert abs(a.count() - 3000) < 3000 * 0.2
+    a.merge(b)
+    assert abs(a.count() - 5000) < 5000 * 0.2
+    assert HyperLogLog.from_bytes(a.to_bytes()).count() == a.count()
+
+def test_batches_merge_into_one_profile(profiles_db):
+    profile = AttackerProfileService(profiles_db).get_profile("198.51.100.1")
+    assert profile.total_events == 10
+    assert profile.first_seen == BASE_TIME - timedelta(hours=1)
+    assert profile.last_seen == BASE_TIME + timedelta(hours=5)
+    assert profile.distinct_usernames == 3
+    assert profile.distinct_passwords == 6
+    assert profile.attack_types == ["Brute Force", "smb"]
+    assert profile.sensors == ["sensor-a", "sensor-b"]
+
+def test_profile_lookup_errors(profiles_db):
+    service = AttackerProfileService(profiles_db)
+    assert service.get_profile("2001:0db8:0:0::7").total_events == 4
+    for ip, status in (("not-an-ip", 400), ("203.0.113.9", 404)):
+        with pytest.raises(HTTPException) as exc:
+            service.get_profile(ip)
+        assert exc.value.status_code == status
+
+def test_keyset_pages_follow_sort(profiles_db):
+    service = AttackerProfileService(profiles_db)
+    first, cursor = service.list_profiles(sort="total_events", limit=2)
+    assert [p.source_ip for p in first] == ["198.51.100.1", "2001:db8::7"]
+    rest, end = service.list_profiles(sort="total_events", limit=2, cursor=cursor)
+    assert [p.source_ip for p in rest] == ["198.51.100.2"] and end is None
+
+    by_time, cursor = service.list_profiles(sort="first_seen", order="asc", limit=1)
+    seen = [p.source_ip for p in by_time]
+    while cursor:
+        page, cursor = service.list_profiles(sort="first_seen", order="asc", limit=1, cursor=cursor)
+        seen += [p.source_ip for p in page]
+    assert seen == ["198.51.100.1", "198.51.100.2", "2001:db8::7"]
+
+    # A cursor only continues the sort it was issued for
+    _, total_cursor = service.list_profiles(sort="total_events", limit=1)
+    with pytest.raises(HTTPException):
+        service.list_profiles(sort="last_seen", cursor=total_cursor)
+
+@pytest.fixture
+def api_client(profiles_db):
+    # Restore the overrides other modules install at import time
+    saved = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = lambda: profiles_db
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=1, username="testuser", status="active")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(saved)
+
+def test_attackers_api(api_client):
+    response = api_client.get("/api/v1/attackers?sort=total_events&limit=1")
+    assert response.status_code == 200
+    assert [p["source_ip"] for p in response.json()] == ["198.51.100.1"]
+    next_page = api_client.get(f"/api/v1/attackers?sort=total_events&limit=1&cursor={response.headers['X-Next-Cursor']}")
+    assert [p["source_ip"] for p in next_page.json()] == ["2001:db8::7"]
+    assert api_client.get("/api/v1/attackers/198.51.100.2").json()["attack_types"] == ["http"]
+    assert api_client.get("/api/v1/attackers/203.0.113.9").status_code == 404
@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+import unittest
+from app.core.cache import (
+    CACHE_WINDOWS_KEY, CACHE_WINDOWS_REGISTERED_KEY, INVALIDATE_STALE, LocalTTLCache, StaleWhileRevalidateCache,
+    bump_ingest_generation, cache_metrics, get_ingest_generation, invalidate_cache_windows, prune_cache_windows,
+    register_cache_window
+)
+from app.core.config import settings
+from tests.conftest import FakeRedis
+
+class TestStaleWhileRevalidateCache(unittest.TestCase):
+    def setUp(self):
+        cache_metrics.reset()
+        self.redis = FakeRedis()
+        self.cache = StaleWhileRevalidateCache(self.redis, soft_ttl=60, hard_ttl=600)
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+    def test_miss_then_hit(self):
+        self.assertEqual(self.cache.get_or_compute("k", self.compute), {"calls": 1})
+        self.assertEqual(self.cache.get_or_compute("k", self.compute), {"calls": 1})
+        metrics = cache_metrics.snapshot()
+        self.assertEqual((metrics["misses"], metrics["hits"], metrics["refreshes"]), (1, 1, 1))
+
+    def test_stale_value_served_while_refreshing(self):
+        self.redis.store["k"] = json.dumps({"value": "old", "refreshed_at": time.time() - 120})
+        refreshed = threading.Event()
+
+        def slow_compute():
+            refreshed.wait(1)
+            return "new"
+
+        self.assertEqual(self.cache.get_or_compute("k", slow_compute), "old")
+        # A second caller during the refresh gets stale data and starts no second refresh
+        self.assertEqual(self.cache.get_or_compute("k", self.compute), "old")
+        self.assertEqual(self.calls, 0)
+
+        refreshed.set()
+        for _ in range(50):
+            if "k:lock" not in self.redis.held:
+                break
+            time.sleep(0.02)
+        self.assertEqual(self.cache.get_or_compute("k", self.compute), "new")
+        self.assertEqual(cache_metrics.snapshot()["stale_hits"], 2)
+
+    def test_legacy_value_treated_as_miss(self):
+        self.redis.store["k"] = json.dumps({"top_ips": []})
+        self.assertEqual(self.cache.get_or_compute("k", self.compute), {"calls": 1})
+
+def test_ingest_generation_counts_batches(fake_redis):
+    assert get_ingest_generation(fake_redis) == 0
+    assert bump_ingest_generation(fake_redis) == 1
+    assert bump_ingest_generation(fake_redis) == 2
+    assert get_ingest_generation(fake_redis) == 2
+
+def test_invalidate_only_overlapping_windows(fake_redis):
+    fake_redis.setex("closed", 60, "x")
+    fake_redis.setex("open", 60, "x")
+    register_cache_window(fake_redis, "closed", 100.0, 200.0)
+    register_cache_window(fake_redis, "open", 150.0, None)
+
+    assert invalidate_cache_windows(fake_redis, 300.0, 400.0) == 1
+    assert fake_redis.get("closed") == "x"
+    assert fake_redis.get("open") is None
+
+    assert invalidate_cache_windows(fake_redis, 190.0, 195.0) == 1
+    assert fake_redis.get("closed") is None
+    # Both entries are gone, and so are their windows
+    assert fake_redis.zsets[CACHE_WINDOWS_KEY] == {}
+
+def test_windows_pruned_after_max_ttl(fake_redis, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.time", lambda: now[0])
+    fake_redis.setex("past", 60, "x")
+    register_cache_window(fake_redis, "past", 100.0, 200.0)
+    register_cache_window(fake_redis, "stale", 100.0, 200.0, mode=INVALIDATE_STALE)
+
+    # Never overlapped by new rows, but dropped once every entry must have expired
+    assert prune_cache_windows(fake_redis, now=now[0] + settings.TRAFFIC_CACHE_CLOSED_TTL - 1) == 0
+    assert prune_cache_windows(fake_redis, now=now[0] + settings.TRAFFIC_CACHE_CLOSED_TTL + 1) == 2
+    assert fake_redis.zsets[CACHE_WINDOWS_KEY] == {} and fake_redis.zsets[CACHE_WINDOWS_REGISTERED_KEY] == {}
+
+def test_stale_window_dropped_once_entry_expires(fake_redis):
+    register_cache_window(fake_redis, "stats", 100.0, None, mode=INVALIDATE_STALE)
+    fake_redis.setex("stats", 60, json.dumps({"value": 1, "refreshed_at": 5}))
+    assert invalidate_cache_windows(fake_redis, 300.0, 400.0) == 1
+    assert len(fake_redis.zsets[CACHE_WINDOWS_KEY]) == 1
+
+    fake_redis.delete("stats")
+    assert invalidate_cache_windows(fake_redis, 300.0, 400.0) == 0
+    assert fake_redis.zsets[CACHE_WINDOWS_KEY] == {}
+
+def test_local_cache_lru_and_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    local = LocalTTLCache(max_entries=2)
+    local.set("a", 1, ttl=10)
+    local.set("b", 2, ttl=10)
+    assert local.get("a") == 1
+    local.set("c", 3, ttl=10)
+    # "b" was least recently used
+    assert local.get("b") is None
+    assert local.get("a") == 1
+
+    now[0] = 11
+    assert local.get("a") is None
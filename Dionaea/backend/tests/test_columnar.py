@@ -0,0 +1,37 @@
+import io
+import unittest
+from datetime import datetime
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+from app.core.columnar import iter_columnar
+
+COLUMNS = ("id", "timestamp", "source_ip", "username", "target_port", "raw_log")
+ROWS = [
+    (i, datetime(2026, 3, 1, 12, 0, i), f"10.0.0.{i % 3}", "root" if i % 2 else None, 22, f"line {i}")
+    for i in range(10)
+]
+
+class TestColumnarExport(unittest.TestCase):
+    def test_parquet_row_groups_and_dictionary(self):
+        chunks = list(iter_columnar(ROWS, COLUMNS, "parquet", row_group_size=4))
+        self.assertGreater(len(chunks), 1)
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.num_rows, 10)
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("source_ip").type))
+        self.assertEqual(table.column("username").to_pylist()[:2], [None, "root"])
+        self.assertEqual(table.column("timestamp").to_pylist()[9], datetime(2026, 3, 1, 12, 0, 9))
+
+    def test_arrow_ipc(self):
+        data = b"".join(iter_columnar(ROWS, COLUMNS, "arrow", row_group_size=4))
+        batches = list(pa.ipc.open_stream(pa.BufferReader(data)))
+        self.assertEqual(len(batches), 3)
+        table = pa.Table.from_batches(batches)
+        self.assertEqual(table.column("id").to_pylist(), list(range(10)))
+        self.assertEqual(batches[0].column(2).dictionary.to_pylist(), ["10.0.0.0", "10.0.0.1", "10.0.0.2"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import func, select
+from app.core.dimensions import dimension_keys
+from app.models.attack_log import AttackLog
+from app.models.dimension import DimAttackType, DimUsername
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService, EXPORT_COLUMNS
+from tests.conftest import seed_attack_logs
+
+BASE_TIME = datetime(2026, 4, 20, 8, 0, 0)
+
+@pytest.fixture(scope="module")
+def dim_db(db):
+    seed_attack_logs(
+        db, 12, BASE_TIME,
+        username=lambda i: "root" if i % 3 else "admin",
+        password=lambda i: f"pw{i % 2}",
+        source_ip=lambda i: f"10.1.0.{i % 4}",
+        protocol="smb",
+        connection_status="attempt",
+        sensor_name="sensor-a",
+        attack_type=lambda i: "smb" if i % 2 else "http"
+    )
+    return db
+
+def test_values_stored_once(dim_db):
+    assert dim_db.scalar(select(func.count()).select_from(DimUsername)) == 2
+    keys = dim_db.execute(select(AttackLog.username_id).distinct()).scalars().all()
+    assert len(keys) == 2 and all(isinstance(k, int) for k in keys)
+
+def test_attributes_read_back_as_strings(dim_db):
+    log = dim_db.execute(select(AttackLog).where(AttackLog.raw_log == "line 1")).scalar_one()
+    dim_db.expire(log)
+    assert (log.username, log.password, log.attack_type, log.sensor_name) == ("root", "pw1", "smb", "sensor-a")
+
+def test_dimensions_joined_only_where_rendered(dim_db):
+    assert "dim_usernames" not in str(select(AttackLog))
+    _, page, _ = AttackLogService._logs_statement(AttackLogFilter(limit=5))
+    dim_db.expire_all()
+    logs = dim_db.execute(page).scalars().all()
+    assert all("username_dim" in log.__dict__ for log in logs)
+
+def test_filters_match_through_dimension(dim_db):
+    service = AttackLogService(dim_db)
+    logs, total, _ = service.get_logs(AttackLogFilter(username="dmi", include_total="exact", limit=50))
+    assert total == 4
+    assert {log.username for log in logs} == {"admin"}
+
+def test_export_rows_carry_values(dim_db):
+    service = AttackLogService(dim_db)
+    rows = list(service.iter_export_rows(AttackLogFilter(attack_type="http")))
+    index = EXPORT_COLUMNS.index("attack_type")
+    assert len(rows) == 6
+    assert {row[index] for row in rows} == {"http"}
+
+def test_reassigning_value_updates_key(dim_db):
+    log = dim_db.execute(select(AttackLog).where(AttackLog.raw_log == "line 0")).scalar_one()
+    log.attack_type = "Brute Force"
+    dim_db.commit()
+    key = dim_db.scalar(select(DimAttackType.id).where(DimAttackType.value == "Brute Force"))
+    assert dim_db.scalar(select(AttackLog.attack_type_id).where(AttackLog.raw_log == "line 0")) == key
+
+def test_rolled_back_keys_are_evicted(dim_db):
+    dim_db.add(AttackLog(timestamp=BASE_TIME, username="ghost"))
+    dim_db.flush()
+    assert dimension_keys.resolve(dim_db, "username", ["ghost"])
+    dim_db.rollback()
+    assert dim_db.scalar(select(DimUsername.id).where(DimUsername.value == "ghost")) is None
+
+    # Resolving again recreates the row instead of trusting a stale key
+    dim_db.add(AttackLog(timestamp=BASE_TIME, username="ghost", raw_log="ghost"))
+    dim_db.commit()
+    key = dim_db.scalar(select(DimUsername.id).where(DimUsername.value == "ghost"))
+    assert dim_db.scalar(select(AttackLog.username_id).where(AttackLog.raw_log == "ghost")) == key
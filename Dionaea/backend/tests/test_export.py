@@ -0,0 +1,40 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import datetime
+from app.core import export
+from app.core.export import iter_csv, iter_ndjson, iter_gzip
+
+COLUMNS = ("id", "timestamp", "username")
+ROWS = [(i, datetime(2026, 3, 1, 12, 0, i), f"user,{i}") for i in range(5)]
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.chunk_rows = export.EXPORT_CHUNK_ROWS
+        export.EXPORT_CHUNK_ROWS = 2
+
+    def tearDown(self):
+        export.EXPORT_CHUNK_ROWS = self.chunk_rows
+
+    def test_csv_is_chunked_and_quoted(self):
+        chunks = list(iter_csv(ROWS, COLUMNS))
+        self.assertEqual(len(chunks), 3)
+        parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        self.assertEqual(parsed[0], list(COLUMNS))
+        self.assertEqual(parsed[1], ["0", "2026-03-01T12:00:00", "user,0"])
+        self.assertEqual(len(parsed), 6)
+
+    def test_ndjson(self):
+        lines = b"".join(iter_ndjson(ROWS, COLUMNS)).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[4]), {"id": 4, "timestamp": "2026-03-01T12:00:04", "username": "user,4"})
+
+    def test_gzip_round_trip(self):
+        raw = b"".join(iter_csv(ROWS, COLUMNS))
+        compressed = b"".join(iter_gzip(iter_csv(ROWS, COLUMNS)))
+        self.assertEqual(gzip.decompress(compressed), raw)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from app.core.config import BACKEND_DIR, Settings
+from app.core.geoip import GeoIPIndex, GeoIPRange, GeoInfo, UNKNOWN, enrich, read_ip2asn, write_index
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService
+from tests.conftest import attack_log_rows
+
+RANGES = [
+    GeoIPRange("45.146.0.0", "45.146.255.255", "NL", 49870, "Alsycon B.V."),
+    GeoIPRange("1.0.0.0", "1.0.0.255", "AU", 13335, "CLOUDFLARENET"),
+    GeoIPRange("2001:db8::", "2001:db8::ffff", "DE", 3320, "DTAG"),
+    # Overlaps the first range and is dropped
+    GeoIPRange("45.146.1.0", "45.146.1.255", "US", 1, "overlap"),
+    GeoIPRange("8.8.8.0", "8.8.8.255", None, 15169, None),
+]
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "geoip.idx")
+    assert write_index(RANGES, path) == 4
+    index = GeoIPIndex(path, cache_size=2)
+    yield index
+    index.close()
+
+def test_lookup_inside_and_outside_ranges(index):
+    assert index.lookup("45.146.0.0") == GeoInfo("NL", 49870)
+    assert index.lookup("45.146.1.7") == GeoInfo("NL", 49870)
+    assert index.lookup("45.146.255.255") == GeoInfo("NL", 49870)
+    assert index.lookup("1.0.0.1") == GeoInfo("AU", 13335)
+    assert index.lookup("8.8.8.8") == GeoInfo(None, 15169)
+    assert index.lookup("2001:db8::42") == GeoInfo("DE", 3320)
+    for miss in ("0.0.0.1", "1.0.1.0", "45.147.0.0", "255.255.255.255", "2001:db9::", "unknown", None):
+        assert index.lookup(miss) == UNKNOWN
+    assert index.as_name(49870) == "Alsycon B.V."
+    assert index.as_name(15169) is None
+
+def test_lookup_cache_is_bounded(index):
+    for ip in ("1.0.0.1", "1.0.0.2", "1.0.0.3"):
+        index.lookup(ip)
+    assert list(index._cache) == ["1.0.0.2", "1.0.0.3"]
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-an-index"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        GeoIPIndex(str(path))
+
+def test_index_path_resolves_against_backend_dir(tmp_path):
+    assert Settings(GEOIP_INDEX_PATH="data/geoip.idx").GEOIP_INDEX_PATH == os.path.join(BACKEND_DIR, "data", "geoip.idx")
+    assert Settings(GEOIP_INDEX_PATH=str(tmp_path / "geoip.idx")).GEOIP_INDEX_PATH == str(tmp_path / "geoip.idx")
+
+def test_read_ip2asn(tmp_path):
+    path = tmp_path / "ip2asn-combined.tsv"
+    path.write_text(
+        "1.0.0.0\t1.0.0.255\t13335\tUS\tCLOUDFLARENET\n"
+        "1.0.1.0\t1.0.3.255\t0\tNone\tNot routed\n"
+        "1.0.4.0\t1.0.7.255\t38803\tAU\tWPL-AS-AP Wirefreebroadband Pty Ltd\n"
+    )
+    assert list(read_ip2asn(str(path))) == [
+        GeoIPRange("1.0.0.0", "1.0.0.255", "US", 13335, "CLOUDFLARENET"),
+        GeoIPRange("1.0.4.0", "1.0.7.255", "AU", 38803, "WPL-AS-AP Wirefreebroadband Pty Ltd"),
+    ]
+
+def test_enrich_and_group_by_geography(db, index, monkeypatch):
+    base = datetime(2026, 5, 1, 9, 0, 0)
+    ips = ["45.146.0.1", "45.146.0.2", "45.146.0.1", "1.0.0.9", "192.0.2.1"]
+    logs = attack_log_rows(len(ips), base, source_ip=lambda i: ips[i], attack_type="smb")
+    assert enrich(logs, index) == (5, 4)
+    assert enrich(logs, None) == (0, 0)
+    db.add_all(logs)
+    db.commit()
+
+    monkeypatch.setattr("app.services.attack_log_service.get_geoip_index", lambda: index)
+    service = AttackLogService(db)
+    filters = AttackLogFilter(start_time=base, end_time=base + timedelta(hours=1))
+    assert service.get_geo_counts(filters, by="country") == [
+        {"country_code": "NL", "count": 3, "unique_ips": 2},
+        {"country_code": "AU", "count": 1, "unique_ips": 1},
+    ]
+    assert service.get_geo_counts(filters, by="asn", limit=1) == [
+        {"asn": 49870, "as_name": "Alsycon B.V.", "count": 3, "unique_ips": 2},
+    ]
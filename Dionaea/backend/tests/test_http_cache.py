@@ -0,0 +1,103 @@
+import gzip
+from typing import Optional
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.core import http_cache
+from app.core.cache import bump_ingest_generation
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+from app.core.http_cache import conditional_etag, matching_etag
+
+def build_app(calls):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/stats")
+    def stats(etag: Optional[str] = Depends(conditional_etag)):
+        calls.append(1)
+        return {"rows": ["x" * 20] * 20}
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a" * 50, b"b" * 50]), media_type="text/plain")
+
+    @app.get("/export")
+    def export():
+        return StreamingResponse(iter([gzip.compress(b"x" * 500)]), headers={"Content-Encoding": "gzip"})
+
+    return app
+
+@pytest.fixture
+def calls():
+    return []
+
+@pytest.fixture
+def client(calls, fake_redis, monkeypatch):
+    monkeypatch.setattr(http_cache, "get_redis", lambda: fake_redis)
+    return TestClient(build_app(calls))
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("br, gzip;q=0.5", offered=("gzip",)) == "gzip"
+    assert negotiate_encoding("br, gzip;q=0", offered=("gzip",)) is None
+
+def test_matching_etag_ignores_encoding_suffix():
+    assert matching_etag('"g1-e2-abc-gzip"', '"g1-e2-abc"') == '"g1-e2-abc-gzip"'
+    assert matching_etag('"other", "g1-e2-abc"', '"g1-e2-abc"') == '"g1-e2-abc"'
+    assert matching_etag('"g2-e2-abc"', '"g1-e2-abc"') is None
+    assert matching_etag(None, '"g1-e2-abc"') is None
+
+def test_not_modified_skips_endpoint(client, calls):
+    first = client.get("/stats", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    etag = first.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    second = client.get("/stats", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+    assert len(calls) == 1
+
+def test_ingest_changes_etag(client, calls, fake_redis):
+    etag = client.get("/stats").headers["etag"]
+    bump_ingest_generation(fake_redis)
+    response = client.get("/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(calls) == 2
+
+def test_query_changes_etag(client):
+    assert client.get("/stats?day=1").headers["etag"] != client.get("/stats?day=2").headers["etag"]
+
+def test_no_etag_without_redis(client, calls, monkeypatch):
+    monkeypatch.setattr(http_cache, "get_redis", lambda: None)
+    response = client.get("/stats", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+def test_small_and_precompressed_responses_pass_through(client):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    export = client.get("/export", headers={"Accept-Encoding": "gzip"})
+    assert export.headers["content-encoding"] == "gzip"
+    assert export.content == b"x" * 500
+
+def test_streamed_response_compressed(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "a" * 50 + "b" * 50
+
+def test_brotli_preferred_when_available(client):
+    pytest.importorskip("brotli")
+    response = client.get("/stats", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"].endswith('-br"')
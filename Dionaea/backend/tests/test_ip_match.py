@@ -0,0 +1,51 @@
+import unittest
+from sqlalchemy import column, String
+from sqlalchemy.dialects import sqlite
+from app.core.ip_match import ip_filter_clause, pack_ip, parse_ip, parse_ip_range, unpack_ip
+
+source_ip = column("source_ip", String)
+
+def render(clause):
+    return str(clause.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+class TestIpFilterClause(unittest.TestCase):
+    def test_full_address_is_exact(self):
+        self.assertEqual(render(ip_filter_clause(source_ip, "10.0.0.1")), "source_ip = '10.0.0.1'")
+
+    def test_cidr_is_address_range(self):
+        sql = render(ip_filter_clause(source_ip, "45.146.0.0/16"))
+        self.assertEqual(sql, "source_ip BETWEEN '45.146.0.0' AND '45.146.255.255'")
+
+    def test_unaligned_cidr_is_one_range(self):
+        sql = render(ip_filter_clause(source_ip, "45.146.0.0/15"))
+        self.assertEqual(sql, "source_ip BETWEEN '45.146.0.0' AND '45.147.255.255'")
+
+    def test_ipv6_cidr_is_address_range(self):
+        sql = render(ip_filter_clause(source_ip, "2001:db8::/32"))
+        self.assertIn("BETWEEN '2001:db8::' AND '2001:db8:ffff:ffff:ffff:ffff:ffff:ffff'", sql)
+
+    def test_match_all_cidr(self):
+        self.assertIsNone(ip_filter_clause(source_ip, "0.0.0.0/0"))
+
+    def test_partial_input_is_substring(self):
+        sql = render(ip_filter_clause(source_ip, "146.2"))
+        self.assertIn("'%' || '146.2' || '%'", sql)
+
+class TestIpRange(unittest.TestCase):
+    def test_parse_range(self):
+        first, last = parse_ip_range("45.146.0.10 - 45.146.3.200")
+        self.assertEqual((str(first), str(last)), ("45.146.0.10", "45.146.3.200"))
+
+    def test_rejects_reversed_and_mixed_ranges(self):
+        for value in ("10.0.0.9-10.0.0.1", "10.0.0.1-::1", "10.0.0.1"):
+            with self.assertRaises(ValueError):
+                parse_ip_range(value)
+
+    def test_packed_addresses_sort_numerically(self):
+        for addresses in (["9.255.255.255", "10.0.0.1", "45.146.0.1", "255.255.255.255"], ["::1", "2001:db8::1", "2001:db8::1:0"]):
+            packed = [pack_ip(parse_ip(a)) for a in reversed(addresses)]
+            self.assertTrue(all(len(p) == 16 for p in packed))
+            self.assertEqual([str(unpack_ip(p)) for p in sorted(packed)], addresses)
+
+if __name__ == "__main__":
+    unittest.main()
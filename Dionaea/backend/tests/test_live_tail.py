@@ -0,0 +1,98 @@
+import asyncio
+import json
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.api.v1 import logs
+from app.core.config import settings
+from app.main import app
+from app.models.attack_log import AttackLog
+from app.models.user import User
+from app.schemas.attack_log import LiveTailFilter
+from app.services.ingest_events import LIVE_ROWS_CHANNEL, publish_live_rows
+from app.services.live_tail import LiveTailHub, TailSubscriber, compile_filter
+
+ROWS = [
+    {"id": 1, "source_ip": "45.146.3.7", "attack_type": "smb", "sensor_name": "sensor-a"},
+    {"id": 2, "source_ip": "45.147.0.1", "attack_type": "SQL Injection", "sensor_name": "sensor-b"},
+    {"id": 3, "source_ip": "2001:db8::1", "attack_type": "smb", "sensor_name": "sensor-b"},
+]
+
+def _ids(predicate):
+    return [row["id"] for row in ROWS if predicate(row)]
+
+def test_filters():
+    assert _ids(compile_filter(LiveTailFilter())) == [1, 2, 3]
+    assert _ids(compile_filter(LiveTailFilter(attack_type="smb"))) == [1, 3]
+    assert _ids(compile_filter(LiveTailFilter(source_ip="45.14"))) == [1, 2]
+    assert _ids(compile_filter(LiveTailFilter(source_ip="45.146.0.0/16"))) == [1]
+    assert _ids(compile_filter(LiveTailFilter(source_ip="2001:db8::/32", sensor="sensor-b"))) == [3]
+    with pytest.raises(ValueError):
+        compile_filter(LiveTailFilter(source_ip="45.146.0.0/40"))
+
+def test_slow_subscriber_drops_oldest_batches():
+    subscriber = TailSubscriber(LiveTailFilter(attack_type="smb"), queue_size=2)
+    for i in range(4):
+        subscriber.offer([{"id": i, "attack_type": "smb"}, {"id": i, "attack_type": "http"}])
+    assert subscriber.dropped == 2
+    assert [subscriber.queue.get_nowait()[0]["id"] for _ in range(2)] == [2, 3]
+
+def test_publish_live_rows_in_chunks(fake_redis):
+    entries = [AttackLog(id=i, timestamp=datetime(2026, 8, 1, 12, 0, i), source_ip="198.51.100.1", attack_type="smb") for i in range(5)]
+    assert publish_live_rows(fake_redis, entries, chunk=2) == 3
+    channels = {channel for channel, _ in fake_redis.published}
+    rows = [row for _, message in fake_redis.published for row in json.loads(message)]
+    assert channels == {LIVE_ROWS_CHANNEL}
+    assert [row["id"] for row in rows] == [0, 1, 2, 3, 4]
+    assert rows[0]["timestamp"] == "2026-08-01T12:00:00" and rows[0]["attack_type"] == "smb"
+    assert publish_live_rows(None, entries) == 0
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = LiveTailHub(queue_size=10)
+
+    async def fake_listen():
+        hub.dispatch(json.dumps(ROWS))
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(hub, "_listen", fake_listen)
+    monkeypatch.setattr(logs, "live_tail_hub", hub)
+    monkeypatch.setattr(logs, "_authenticate", lambda token: User(id=1, username="testuser", status="active") if token == "ok" else None)
+    return hub
+
+def test_websocket_streams_filtered_rows(hub):
+    client = TestClient(app)
+    with client.websocket_connect("/api/v1/logs/live?attack_type=smb") as ws:
+        ws.send_json({"token": "ok"})
+        message = ws.receive_json()
+        assert message["type"] == "logs" and message["dropped"] == 0
+        assert [row["id"] for row in message["rows"]] == [1, 3]
+
+        ws.send_text(json.dumps({"sensor": "sensor-b"}))
+        assert ws.receive_json() == {"type": "filter", "filter": {"attack_type": None, "source_ip": None, "sensor": "sensor-b"}}
+        ws.send_text(json.dumps({"source_ip": "not/a/network"}))
+        assert ws.receive_json()["type"] == "error"
+
+        # Dispatch on the app's event loop, as the Redis listener would
+        ws.portal.call(hub.dispatch, json.dumps(ROWS))
+        assert [row["id"] for row in ws.receive_json()["rows"]] == [2, 3]
+    assert not hub.subscribers
+
+@pytest.mark.parametrize("first_message", [{"token": "bad"}, {"sensor": "sensor-a"}, ["ok"]])
+def test_websocket_requires_token(hub, first_message):
+    client = TestClient(app)
+    with client.websocket_connect("/api/v1/logs/live") as ws:
+        ws.send_json(first_message)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+def test_websocket_closes_without_token(hub, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_TAIL_AUTH_TIMEOUT", 0.05)
+    client = TestClient(app)
+    # A token in the query string is not read
+    with client.websocket_connect("/api/v1/logs/live?token=ok") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
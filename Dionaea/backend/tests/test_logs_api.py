@@ -1,42 +1,101 @@
-from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+import pytest
 from app.main import app
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
+from tests.conftest import seed_attack_logs
 
-client = TestClient(app)
+BASE_TIME = datetime(2026, 2, 27, 21, 0, 0)
 
 def override_get_current_active_user():
     return User(id=1, username="testuser", status="active", email="test@example.com", password_hash="hash")
 
 app.dependency_overrides[get_current_active_user] = override_get_current_active_user
 
-def test_get_logs():
+@pytest.fixture(scope="module")
+def log_ids(db):
+    """
+    Ids of six rows 20 minutes apart from 21:00, oldest first: the first two
+    from 45.146.0.9, odd rows smb and even rows http.
+    """
+    rows = seed_attack_logs(
+        db, 6, BASE_TIME, step=timedelta(minutes=20),
+        source_ip=lambda i: "45.146.0.9" if i < 2 else f"198.51.100.{i}",
+        attack_type=lambda i: "smb" if i % 2 else "http"
+    )
+    return [row.id for row in rows]
+
+def test_get_logs(client, log_ids):
     response = client.get("/api/v1/logs")
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    # Since we ingested data, there should be logs
-    # But wait, did we commit? Yes ingestor commits.
-    # But TestClient might run in a transaction or different session?
-    # No, it hits the app which uses SessionLocal.
-    # So if ingestor committed, we should see it.
-    if len(data) > 0:
-        print(f"Found {len(data)} logs")
-        first_log = data[0]
-        assert "timestamp" in first_log
-        assert "source_ip" in first_log
-
-def test_get_logs_filter_attack_type():
+    assert [log["id"] for log in data] == log_ids[::-1]
+    assert data[0]["timestamp"] == "2026-02-27T22:40:00"
+    assert data[0]["source_ip"] == "198.51.100.5"
+
+def test_get_logs_filter_attack_type(client, log_ids):
     response = client.get("/api/v1/logs?attack_type=smb")
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    if data:
-        for log in data:
-            assert log.get("attack_type") == "smb"
+    assert [log["id"] for log in data] == log_ids[5::-2]
+    assert {log["attack_type"] for log in data} == {"smb"}
 
-def test_get_logs_filter_time():
-    # Test with a future time, should return empty
+def test_get_logs_filter_time(client, log_ids):
+    response = client.get("/api/v1/logs?start_time=2026-02-27T22:00:00")
+    assert response.status_code == 200
+    assert [log["id"] for log in response.json()] == log_ids[:2:-1]
+    # Nothing after the seeded rows
     response = client.get("/api/v1/logs?start_time=2030-01-01T00:00:00")
     assert response.status_code == 200
     assert len(response.json()) == 0
+
+def test_get_logs_fields_projection(client, log_ids):
+    response = client.get("/api/v1/logs?fields=source_ip,attack_type&limit=2")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": log_ids[5], "timestamp": "2026-02-27T22:40:00", "source_ip": "198.51.100.5", "attack_type": "smb"},
+        {"id": log_ids[4], "timestamp": "2026-02-27T22:20:00", "source_ip": "198.51.100.4", "attack_type": "http"},
+    ]
+
+def test_get_logs_unknown_field(client):
+    response = client.get("/api/v1/logs?fields=password_hash")
+    assert response.status_code == 400
+
+def test_get_logs_cidr_filter(client, log_ids):
+    response = client.get("/api/v1/logs?cidr=45.146.0.0/16")
+    assert response.status_code == 200
+    assert [log["id"] for log in response.json()] == [log_ids[1], log_ids[0]]
+    response = client.get("/api/v1/logs?cidr=198.51.100.0/30")
+    assert [log["source_ip"] for log in response.json()] == ["198.51.100.3", "198.51.100.2"]
+    assert client.get("/api/v1/logs?cidr=203.0.113.0/24").json() == []
+
+def test_get_logs_invalid_ip_range(client):
+    response = client.get("/api/v1/logs?ip_range=not-a-range")
+    assert response.status_code == 400
+
+def test_get_logs_since_delta(client, log_ids):
+    response = client.get(f"/api/v1/logs?since_id={log_ids[3]}")
+    assert response.status_code == 200
+    assert [log["id"] for log in response.json()] == [log_ids[5], log_ids[4]]
+    assert "X-Delta-Truncated" not in response.headers
+    truncated = client.get(f"/api/v1/logs?since_id={log_ids[0]}&limit=2")
+    assert [log["id"] for log in truncated.json()] == [log_ids[5], log_ids[4]]
+    assert truncated.headers["X-Delta-Truncated"] == "true"
+    assert client.get(f"/api/v1/logs?since_id={log_ids[5]}").json() == []
+    assert client.get("/api/v1/logs?since_id=1&cursor=abc").status_code == 400
+
+def test_traffic_since_delta(client, log_ids):
+    # The seeded day, so the buckets after since_timestamp don't depend on the clock
+    response = client.get(
+        "/api/v1/data/stats/traffic?granularity=hour&start_time=2026-02-27&end_time=2026-02-27"
+        "&since_timestamp=2026-02-27T21:30:00"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert "attack_distribution" not in data
+    # The bucket holding since_timestamp is recounted whole
+    assert data["timeline"] == [
+        {"time": "2026-02-27T21:00:00", "count": 3},
+        {"time": "2026-02-27T22:00:00", "count": 3},
+        {"time": "2026-02-27T23:00:00", "count": 0},
+    ]
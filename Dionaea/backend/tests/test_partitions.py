@@ -0,0 +1,44 @@
+import unittest
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from app.services.partition_service import PartitionService, partition_bounds, partition_name, partition_ranges
+
+class TestPartitionNaming(unittest.TestCase):
+    def test_day_bounds_and_name(self):
+        start, end = partition_bounds(datetime(2026, 3, 1, 13, 45), "day")
+        self.assertEqual((start, end), (datetime(2026, 3, 1), datetime(2026, 3, 2)))
+        self.assertEqual(partition_name(start, "day"), "attack_logs_p20260301")
+
+    def test_week_starts_monday(self):
+        # 2026-03-01 is a Sunday
+        start, end = partition_bounds(datetime(2026, 3, 1, 13, 45), "week")
+        self.assertEqual((start, end), (datetime(2026, 2, 23), datetime(2026, 3, 2)))
+        self.assertEqual(partition_name(start, "week", "attack_logs_partitioned"), "attack_logs_partitioned_w20260223")
+
+    def test_ranges_are_contiguous(self):
+        ranges = partition_ranges(datetime(2026, 3, 1, 23), datetime(2026, 3, 4, 1), "day")
+        self.assertEqual([r[0].day for r in ranges], [1, 2, 3, 4])
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+
+def test_ensure_partitions_is_noop_on_sqlite(db):
+    service = PartitionService(db)
+    assert not service.is_partitioned()
+    assert service.ensure_partitions() == []
+
+def test_failed_range_does_not_block_later_ones(db, monkeypatch):
+    service = PartitionService(db, "day")
+    monkeypatch.setattr(service, "is_partitioned", lambda table="attack_logs": True)
+    monkeypatch.setattr(service, "list_partitions", lambda table="attack_logs": [])
+
+    def create_partition(start, table="attack_logs"):
+        if start.day == 1:
+            raise OperationalError("CREATE TABLE", {}, Exception("updated partition constraint for default partition would be violated"))
+        return partition_name(start, "day", table)
+
+    monkeypatch.setattr(service, "create_partition", create_partition)
+    created = service.ensure_partitions(now=datetime(2026, 3, 1, 12), ahead=2)
+    assert created == ["attack_logs_p20260302", "attack_logs_p20260303"]
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import pytest
+import redis
+from app.core.redis_client import CircuitBreaker, GuardedRedis
+
+class FlakyPipeline:
+    def __init__(self, owner):
+        self.owner = owner
+        self.queued = []
+
+    def pfadd(self, key, *values):
+        self.queued.append(key)
+        return self
+
+    def execute(self):
+        if self.owner.down:
+            raise redis.ConnectionError("connection refused")
+        return [1] * len(self.queued)
+
+class FlakyRedis:
+    def __init__(self):
+        self.down = True
+
+    def get(self, key):
+        if self.down:
+            raise redis.ConnectionError("connection refused")
+        return "value"
+
+    def pipeline(self, transaction=True):
+        return FlakyPipeline(self)
+
+def test_breaker_opens_after_threshold_and_recovers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.redis_client.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    flaky = FlakyRedis()
+    client = GuardedRedis(flaky, breaker)
+
+    for _ in range(2):
+        assert breaker.allow()
+        with pytest.raises(redis.ConnectionError):
+            client.get("k")
+    assert breaker.is_open
+    assert not breaker.allow()
+
+    # After the cooldown a single trial call goes through
+    now[0] += 31
+    flaky.down = False
+    assert breaker.allow()
+    assert client.get("k") == "value"
+    assert not breaker.is_open
+
+def test_failed_trial_reopens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.redis_client.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(3):
+        breaker.record_failure()
+
+    now[0] += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+def test_pipeline_failures_open_breaker(monkeypatch):
+    monkeypatch.setattr("app.core.redis_client.time.monotonic", lambda: 1000.0)
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    flaky = FlakyRedis()
+    client = GuardedRedis(flaky, breaker)
+
+    for _ in range(2):
+        pipe = client.pipeline(transaction=False)
+        assert pipe.pfadd("k", "a") is pipe
+        with pytest.raises(redis.ConnectionError):
+            pipe.execute()
+    assert breaker.is_open
+
+def test_half_open_allows_single_trial(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.redis_client.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+
+    now[0] += 31
+    assert breaker.allow()
+    # Concurrent callers wait for the trial's outcome
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+    # A trial that never reports back does not block forever
+    breaker.record_failure()
+    now[0] += 31
+    assert breaker.allow()
+    now[0] += 31
+    assert breaker.allow()
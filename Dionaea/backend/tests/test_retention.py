@@ -0,0 +1,80 @@
+import os
+from datetime import date, datetime, timedelta
+import pytest
+from app.core.config import BACKEND_DIR, Settings, settings
+from app.models.attack_log import AttackLog, AttackLogDailyRollup
+from app.models.node import Node, NodeHistory
+from app.schemas.attack_log import AttackLogFilter
+from app.services.attack_log_service import AttackLogService
+from app.services.retention_service import ArchiveStore, RetentionService
+from tests.conftest import seed_attack_logs
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+@pytest.fixture(scope="module")
+def aged_db(db):
+    node = Node(ip_address="192.0.2.10", name="sensor-a")
+    db.add(node)
+    db.flush()
+    for day in range(5):
+        db.add(NodeHistory(node_id=node.id, status="online", timestamp=NOW - timedelta(days=4 - day)))
+    # 12 logs per day for 5 days ending NOW; a 2-day hot window keeps 05-30 onwards
+    seed_attack_logs(
+        db, 60, NOW,
+        timestamp=lambda i: NOW - timedelta(days=4 - i // 12, minutes=i % 12),
+        username=lambda i: f"user{i % 2}",
+        source_ip=lambda i: f"10.0.{i // 12}.{i % 4}",
+        sensor_name="sensor-a",
+        attack_type=lambda i: "smb" if i % 12 % 3 else "http",
+        raw_log=lambda i: f"day {i // 12} line {i % 12}"
+    )
+    return db
+
+@pytest.fixture
+def retention(aged_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ATTACK_LOG_HOT_DAYS", 2)
+    monkeypatch.setattr(settings, "NODE_HISTORY_HOT_DAYS", 2)
+    monkeypatch.setattr(settings, "RETENTION_BATCH_SIZE", 5)
+    service = RetentionService(aged_db, ArchiveStore(str(tmp_path)))
+    return service
+
+def test_archives_rolls_up_and_reads_back(retention, aged_db):
+    archived = retention.run(now=NOW)
+    assert archived == {"attack_logs": 24, "node_history": 2}
+
+    cutoff = datetime(2026, 5, 30)
+    assert aged_db.query(AttackLog).filter(AttackLog.timestamp < cutoff).count() == 0
+    assert aged_db.query(AttackLog).count() == 36
+    assert aged_db.query(NodeHistory).count() == 3
+
+    assert retention.archive.days("attack_logs") == [date(2026, 5, 28), date(2026, 5, 29)]
+    # Batches of 5 rows -> 3 files per 12-row day
+    day_dir = retention.archive._day_dir("attack_logs", date(2026, 5, 28))
+    assert len(os.listdir(day_dir)) == 3
+    rollups = aged_db.query(AttackLogDailyRollup).order_by(AttackLogDailyRollup.day, AttackLogDailyRollup.attack_type).all()
+    assert [(r.day.isoformat(), r.attack_type, r.count, r.unique_ips) for r in rollups[:2]] == [
+        ("2026-05-28", "http", 4, 4),
+        ("2026-05-28", "smb", 8, 4),
+    ]
+
+    # A second run has nothing left to move
+    assert retention.run(now=NOW) == {"attack_logs": 0, "node_history": 0}
+
+    service = AttackLogService(aged_db)
+    live = list(service.iter_export_rows(AttackLogFilter()))
+    combined = list(service.iter_export_rows(AttackLogFilter(), include_archive=True))
+    assert len(live) == 36 and len(combined) == 60
+    timestamps = [row[1] for row in combined]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+    filtered = list(service.iter_export_rows(AttackLogFilter(source_ip="10.0.0.0/24", attack_type="http"), include_archive=True))
+    assert len(filtered) == 4
+
+    daily = service.get_daily_counts(date(2026, 5, 28), date(2026, 6, 1))
+    assert sum(d["count"] for d in daily) == 60
+    assert {d["day"] for d in daily} == {"2026-05-28", "2026-05-29", "2026-05-30", "2026-05-31", "2026-06-01"}
+
+def test_archive_dir_resolves_against_backend_dir(tmp_path):
+    assert Settings(RETENTION_ARCHIVE_DIR="archive").RETENTION_ARCHIVE_DIR == os.path.join(BACKEND_DIR, "archive")
+    assert Settings(RETENTION_ARCHIVE_DIR=str(tmp_path)).RETENTION_ARCHIVE_DIR == str(tmp_path)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from app.models.attack_session import AttackSession
+from app.services.session_service import AttackSessionService, Sessionizer
+from tests.conftest import attack_log_rows
+
+BASE_TIME = datetime(2026, 7, 1, 0, 0, 0)
+GAP = 600
+
+def _events(ip, minutes, username="root", attack_type="smb"):
+    return attack_log_rows(
+        len(minutes), BASE_TIME, timestamp=lambda i: BASE_TIME + timedelta(minutes=minutes[i]),
+        source_ip=ip, username=username, password=lambda i: f"pw{minutes[i]}",
+        attack_type=attack_type, sensor_name="sensor-a"
+    )
+
+@pytest.fixture
+def session_db(db):
+    yield db
+    db.execute(delete(AttackSession))
+    db.commit()
+
+def _sessions(db, ip):
+    return db.execute(
+        select(AttackSession).where(AttackSession.source_ip == ip).order_by(AttackSession.start_time)
+    ).scalars().all()
+
+def test_gap_splits_sessions_across_batches(session_db):
+    sessionizer = Sessionizer("sensor-a", gap=GAP)
+    for batch in (_events("198.51.100.5", [0, 1, 2]), _events("198.51.100.5", [5, 8], attack_type="http"),
+                  _events("198.51.100.5", [30, 31])):
+        sessionizer.update_batch(session_db, batch)
+        session_db.commit()
+
+    first, second = _sessions(session_db, "198.51.100.5")
+    assert (first.start_time, first.end_time) == (BASE_TIME, BASE_TIME + timedelta(minutes=8))
+    assert first.event_count == 5 and first.distinct_credentials == 5
+    assert first.attack_types == ["http", "smb"] and first.closed
+    assert second.event_count == 2 and not second.closed
+
+def test_idle_sessions_close_and_leave_memory(session_db):
+    sessionizer = Sessionizer("sensor-a", gap=GAP)
+    sessionizer.update_batch(session_db, _events("198.51.100.6", [0]) + _events("198.51.100.7", [1]))
+    assert len(sessionizer) == 2
+    sessionizer.update_batch(session_db, _events("198.51.100.7", [20]))
+    session_db.commit()
+    assert len(sessionizer) == 1
+    assert _sessions(session_db, "198.51.100.6")[0].closed
+
+def test_evicted_and_restarted_state_resumes_from_table(session_db):
+    sessionizer = Sessionizer("sensor-a", gap=GAP, max_active=1)
+    sessionizer.update_batch(session_db, _events("198.51.100.8", [0]))
+    sessionizer.update_batch(session_db, _events("198.51.100.9", [1]))
+    session_db.commit()
+    assert len(sessionizer) == 1
+
+    # Evicted IP returns within the gap: its open session continues
+    sessionizer.update_batch(session_db, _events("198.51.100.8", [4]))
+    # A fresh sessionizer (ingestor restart) does the same
+    Sessionizer("sensor-a", gap=GAP).update_batch(session_db, _events("198.51.100.9", [6]))
+    session_db.commit()
+    assert [s.event_count for s in _sessions(session_db, "198.51.100.8")] == [2]
+    assert [s.event_count for s in _sessions(session_db, "198.51.100.9")] == [2]
+
+def test_list_sessions_pages_newest_first(session_db):
+    sessionizer = Sessionizer("sensor-a", gap=GAP)
+    sessionizer.update_batch(session_db, _events("203.0.113.1", [0, 1, 2, 40, 80, 81]))
+    session_db.commit()
+    service = AttackSessionService(session_db)
+
+    page, cursor = service.list_sessions(source_ip="203.0.113.1", limit=2)
+    assert [s.start_time - BASE_TIME for s in page] == [timedelta(minutes=80), timedelta(minutes=40)]
+    rest, end = service.list_sessions(source_ip="203.0.113.1", limit=2, cursor=cursor)
+    assert [s.event_count for s in rest] == [3] and end is None
+
+    busy, _ = service.list_sessions(min_events=2)
+    assert sorted(s.event_count for s in busy) == [2, 3]
+    with pytest.raises(HTTPException):
+        service.list_sessions(source_ip="nope")
@@ -0,0 +1,74 @@
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta
+from app.core.sketches import SpaceSaving
+from app.services.sketch_service import DistinctCounterStore, HLL_COMPLETE_SINCE_KEY
+from tests.conftest import FakeRedis
+
+NOW = datetime(2026, 3, 4)
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_exact_below_capacity(self):
+        sketch = SpaceSaving(capacity=10)
+        sketch.update_many(["a", "b", "a", "c", "a", "b"])
+        self.assertEqual(sketch.top(2), [("a", 3, 0), ("b", 2, 0)])
+        self.assertEqual(sketch.total, 6)
+
+    def test_error_bounds_hold_past_capacity(self):
+        stream = ["hot"] * 50 + ["warm"] * 30 + [f"noise{i}" for i in range(100)]
+        stream = stream[::2] + stream[1::2]
+        truth = Counter(stream)
+
+        sketch = SpaceSaving(capacity=10)
+        sketch.update_many(stream)
+
+        top = sketch.top(2)
+        self.assertEqual([item for item, _, _ in top], ["hot", "warm"])
+        for item, count, error in sketch.top(10):
+            self.assertLessEqual(count - error, truth[item])
+            self.assertGreaterEqual(count, truth[item])
+
+    def test_round_trip(self):
+        sketch = SpaceSaving(capacity=3)
+        sketch.update_many(["x", "y", "x"])
+        restored = SpaceSaving.from_dict(sketch.to_dict())
+        self.assertEqual(restored.top(3), sketch.top(3))
+        self.assertEqual(restored.total, 3)
+
+class TestDistinctCounterBuckets(unittest.TestCase):
+    def test_whole_days_use_day_buckets(self):
+        buckets = DistinctCounterStore.range_buckets(datetime(2026, 3, 1), datetime(2026, 3, 3), now=NOW)
+        self.assertEqual(buckets, ["2026-03-01", "2026-03-02"])
+
+    def test_edges_use_hour_buckets(self):
+        buckets = DistinctCounterStore.range_buckets(datetime(2026, 3, 1, 22, 30), datetime(2026, 3, 3, 1, 15), now=NOW)
+        self.assertEqual(buckets, ["2026-03-01T22", "2026-03-01T23", "2026-03-02", "2026-03-03T00", "2026-03-03T01"])
+
+    def test_edges_past_hourly_retention_use_day_buckets(self):
+        later = NOW + timedelta(days=30)
+        buckets = DistinctCounterStore.range_buckets(datetime(2026, 3, 1, 22, 30), datetime(2026, 3, 3, 1, 15), now=later)
+        self.assertEqual(buckets, ["2026-03-01", "2026-03-02", "2026-03-03"])
+        # Only the expired edge is widened
+        buckets = DistinctCounterStore.range_buckets(datetime(2026, 3, 1, 22, 30), later - timedelta(hours=1), now=later)
+        self.assertEqual(buckets[0], "2026-03-01")
+        self.assertEqual(buckets[-2:], ["2026-04-02T21", "2026-04-02T22"])
+
+    def test_empty_range(self):
+        self.assertEqual(DistinctCounterStore.range_buckets(datetime(2026, 3, 1), datetime(2026, 3, 1), now=NOW), [])
+
+    def test_covers_buckets_after_marker(self):
+        redis_client = FakeRedis()
+        store = DistinctCounterStore(redis_client)
+        start, end = datetime(2026, 3, 1, 10, 30), datetime(2026, 3, 1, 12)
+        self.assertFalse(store.covers(start, end, now=NOW))
+        # The 10:00 bucket started before the first counted row
+        redis_client.set(HLL_COMPLETE_SINCE_KEY, datetime(2026, 3, 1, 10, 15).isoformat())
+        self.assertFalse(store.covers(start, end, now=NOW))
+        redis_client.set(HLL_COMPLETE_SINCE_KEY, datetime(2026, 3, 1, 10).isoformat())
+        self.assertTrue(store.covers(start, end, now=NOW))
+
+    def test_without_redis(self):
+        self.assertIsNone(DistinctCounterStore(None).count("source_ip", datetime(2026, 3, 1), datetime(2026, 3, 2)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from datetime import datetime, timedelta
+from app.core.timeline import choose_granularity, fill_gaps, floor_bucket, MAX_TIMELINE_POINTS
+
+class TestTimeline(unittest.TestCase):
+    def test_auto_granularity(self):
+        start = datetime(2026, 1, 1)
+        self.assertEqual(choose_granularity(start, start + timedelta(hours=6)), "minute")
+        self.assertEqual(choose_granularity(start, start + timedelta(hours=24)), "5m")
+        self.assertEqual(choose_granularity(start, start + timedelta(days=7)), "hour")
+        self.assertEqual(choose_granularity(start, start + timedelta(days=365)), "day")
+        self.assertEqual(choose_granularity(start, start + timedelta(days=2000)), "week")
+
+    def test_requested_granularity_is_coarsened_past_cap(self):
+        start = datetime(2026, 1, 1)
+        self.assertEqual(choose_granularity(start, start + timedelta(days=1), "day"), "day")
+        self.assertEqual(choose_granularity(start, start + timedelta(days=365), "minute"), "day")
+
+    def test_floor_bucket_week_starts_monday(self):
+        self.assertEqual(floor_bucket(datetime(2026, 3, 5, 13, 47), "week"), datetime(2026, 3, 2))
+        self.assertEqual(floor_bucket(datetime(2026, 3, 5, 13, 47), "5m"), datetime(2026, 3, 5, 13, 45))
+
+    def test_fill_gaps(self):
+        start = datetime(2026, 3, 1, 10, 20)
+        points = fill_gaps({datetime(2026, 3, 1, 11): 4}, start, datetime(2026, 3, 1, 12, 5), "hour")
+        self.assertEqual([p["count"] for p in points], [0, 4, 0])
+        self.assertEqual(points[0]["time"], "2026-03-01T10:00:00")
+
+    def test_fill_gaps_stays_bounded(self):
+        counts = {datetime(2026, 3, 2): 1, datetime(2026, 3, 16): 2}
+        points = fill_gaps(counts, datetime(1990, 1, 1), datetime(2026, 12, 31), "week")
+        self.assertLessEqual(len(points), MAX_TIMELINE_POINTS)
+        self.assertEqual([p["count"] for p in points], [1, 0, 2])
+
+if __name__ == "__main__":
+    unittest.main()
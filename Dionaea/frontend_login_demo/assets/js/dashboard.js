@@ -94,6 +94,8 @@ async function fetchLogs(skip = 0, limit = 50, filters = {}) {
     if (filters.protocol) params.append('attack_type', filters.protocol);
     if (filters.startDate) params.append('start_time', filters.startDate);
     if (filters.endDate) params.append('end_time', filters.endDate);
+    // Only the columns the log table renders
+    params.append('fields', 'timestamp,sensor_name,source_ip,username,password,protocol,raw_log');
 
     const response = await fetch(`${CONFIG.API_BASE}/data/logs?${params.toString()}`, {
         headers: { 'Authorization': `Bearer ${token}` }
@@ -251,6 +253,7 @@ function switchView(viewId, activeLink) {
         document.getElementById('page-title').textContent = titleMap[viewId] || '仪表盘';
         
         // Load data if needed
+        if (viewId !== 'view-monitor') closeLogsLiveTail();
         if (viewId === 'view-users') loadUsersList();
         if (viewId === 'view-roles') loadRolesList();
         if (viewId === 'view-monitor') loadLogs();
@@ -366,6 +369,30 @@ async function loadUsersList() {
 
 // --- Monitor & Stats Logic ---
 
+function renderLogRow(log) {
+    const tr = document.createElement('tr');
+    tr.className = 'hover:bg-blue-50 transition-all cursor-pointer group relative';
+    tr.title = '点击查看完整流量包详情';
+    
+    tr.innerHTML = `
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">${new Date(log.timestamp).toLocaleString()}</td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">${log.sensor_name || '-'}</td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">${log.source_ip || '-'}</td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">${log.username || '-'}</td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 font-mono">${log.password || '-'}</td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 flex items-center justify-between">
+            <span>${(log.protocol || 'SMB').toUpperCase()}</span>
+            <i class="fas fa-external-link-alt text-gray-300 group-hover:text-primary transition-colors text-xs ml-2"></i>
+        </td>
+    `;
+
+    // Click event to show modal
+    tr.addEventListener('click', () => {
+        openLogDetailModal(log.raw_log);
+    });
+    return tr;
+}
+
 async function loadLogs(resetPage = false) {
     if (resetPage) currentLogsPage = 0;
     
@@ -382,39 +409,23 @@ async function loadLogs(resetPage = false) {
         endDate: document.getElementById('filter-end-date').value
     };
 
+    closeLogsLiveTail();
+
     try {
         const logs = await fetchLogs(currentLogsPage * logsPerPage, logsPerPage, filters);
         loading.classList.add('hidden');
+
+        // The first page follows new logs as they are ingested
+        if (currentLogsPage === 0 && !filters.startDate && !filters.endDate) {
+            connectLogsLiveTail(filters);
+        }
         
         if (logs.length === 0) {
             tbody.innerHTML = '<tr><td colspan="5" class="px-6 py-4 text-center text-gray-500">暂无日志数据</td></tr>';
             return;
         }
 
-        logs.forEach(log => {
-            const tr = document.createElement('tr');
-            tr.className = 'hover:bg-blue-50 transition-all cursor-pointer group relative';
-            tr.title = '点击查看完整流量包详情';
-            
-            tr.innerHTML = `
-                <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">${new Date(log.timestamp).toLocaleString()}</td>
-                <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">${log.sensor_name || '-'}</td>
-                <td class="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">${log.source_ip || '-'}</td>
-                <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">${log.username || '-'}</td>
-                <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 font-mono">${log.password || '-'}</td>
-                <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500 flex items-center justify-between">
-                    <span>${(log.protocol || 'SMB').toUpperCase()}</span>
-                    <i class="fas fa-external-link-alt text-gray-300 group-hover:text-primary transition-colors text-xs ml-2"></i>
-                </td>
-            `;
-
-            // Click event to show modal
-            tr.addEventListener('click', () => {
-                openLogDetailModal(log.raw_log);
-            });
-
-            tbody.appendChild(tr);
-        });
+        logs.forEach(log => tbody.appendChild(renderLogRow(log)));
 
         // Pagination controls state
         document.getElementById('btn-prev-page').disabled = currentLogsPage === 0;
@@ -426,6 +437,49 @@ async function loadLogs(resetPage = false) {
     }
 }
 
+// Live tail of the first log page, replacing a re-fetch per refresh
+let logsLiveSocket = null;
+
+function connectLogsLiveTail(filters) {
+    const params = new URLSearchParams();
+    if (filters.ip) params.append('source_ip', filters.ip);
+    if (filters.protocol) params.append('attack_type', filters.protocol);
+
+    const socket = new WebSocket(CONFIG.API_BASE.replace('http', 'ws') + `/logs/live?${params.toString()}`);
+    logsLiveSocket = socket;
+
+    // The token goes in the first message, not the URL, which servers log
+    socket.onopen = () => socket.send(JSON.stringify({ token: localStorage.getItem('dionaea_access_token') }));
+
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type !== 'logs') return;
+        const tbody = document.getElementById('logs-table-body');
+        // Drop the "no data" placeholder row
+        if (tbody.rows.length === 1 && !tbody.rows[0].classList.contains('group')) tbody.innerHTML = '';
+        data.rows.forEach(log => tbody.insertBefore(renderLogRow(log), tbody.firstChild));
+        while (tbody.rows.length > logsPerPage) tbody.deleteRow(-1);
+        if (data.dropped) console.warn(`Live tail skipped ${data.dropped} logs`);
+    };
+
+    socket.onclose = () => {
+        // Reconnect only if this socket was not replaced or closed on purpose
+        if (logsLiveSocket === socket) {
+            setTimeout(() => {
+                if (logsLiveSocket === socket) connectLogsLiveTail(filters);
+            }, 5000);
+        }
+    };
+}
+
+function closeLogsLiveTail() {
+    if (logsLiveSocket) {
+        const socket = logsLiveSocket;
+        logsLiveSocket = null;
+        socket.close();
+    }
+}
+
 async function loadStats() {
     try {
         const [chartsData, summaryData] = await Promise.all([
@@ -553,7 +607,7 @@ function setupLogEventListeners() {
     // Refresh Analysis Button
     const refreshAnalysisBtn = document.getElementById('btn-refresh-analysis');
     if (refreshAnalysisBtn) {
-        refreshAnalysisBtn.addEventListener('click', loadTrafficAnalysis);
+        refreshAnalysisBtn.addEventListener('click', refreshTrafficAnalysis);
     }
 
     // Analysis Search Button
@@ -564,48 +618,92 @@ function setupLogEventListeners() {
 }
 
 // --- Traffic Analysis Logic ---
+// Last full traffic analysis load, merged into by refreshTrafficAnalysis
+let trafficAnalysisState = null;
+
+function trafficAnalysisParams() {
+    const filters = {
+        ip: document.getElementById('analysis-filter-ip').value,
+        type: document.getElementById('analysis-filter-type').value,
+        startDate: document.getElementById('analysis-filter-start-date').value,
+        endDate: document.getElementById('analysis-filter-end-date').value
+    };
+
+    const params = new URLSearchParams();
+    if (filters.ip) params.append('source_ip', filters.ip);
+    if (filters.type) params.append('attack_type', filters.type);
+    if (filters.startDate) params.append('start_time', filters.startDate);
+    if (filters.endDate) params.append('end_time', filters.endDate);
+    return params;
+}
+
+async function fetchAnalysisJson(path, params) {
+    const token = localStorage.getItem('dionaea_access_token');
+    const response = await fetch(`${CONFIG.API_BASE}${path}?${params.toString()}`, {
+        headers: { 'Authorization': `Bearer ${token}` }
+    });
+    if (!response.ok) throw new Error(`Failed to fetch ${path}`);
+    return { data: await response.json(), truncated: response.headers.get('X-Delta-Truncated') === 'true' };
+}
+
 async function loadTrafficAnalysis() {
     try {
-        const token = localStorage.getItem('dionaea_access_token');
-        
-        // Build query params
-        const filters = {
-            ip: document.getElementById('analysis-filter-ip').value,
-            type: document.getElementById('analysis-filter-type').value,
-            startDate: document.getElementById('analysis-filter-start-date').value,
-            endDate: document.getElementById('analysis-filter-end-date').value
-        };
+        const params = trafficAnalysisParams();
+        const query = params.toString();
 
-        const params = new URLSearchParams();
-        if (filters.ip) params.append('source_ip', filters.ip);
-        if (filters.type) params.append('attack_type', filters.type);
-        if (filters.startDate) params.append('start_time', filters.startDate);
-        if (filters.endDate) params.append('end_time', filters.endDate);
-
-        // 1. Fetch Stats (Pass filters if backend supports, currently backend might not support filtering stats yet, but let's send for future)
-        // Note: The current /stats/traffic endpoint in backend does not accept filters yet.
-        // We might need to update backend to support filtered stats, or just filter logs table.
-        // For now, let's just fetch global stats as before (or update backend if requested).
-        // User asked for "filtering function similar to system monitor", implying the charts/table should update.
-        // Let's assume we want to filter the TABLE first.
-        
-        const statsRes = await fetch(`${CONFIG.API_BASE}/data/stats/traffic?${params.toString()}`, {
-             headers: { 'Authorization': `Bearer ${token}` }
-        });
-        if (!statsRes.ok) throw new Error('Failed to fetch traffic stats');
-        const stats = await statsRes.json();
+        const { data: stats } = await fetchAnalysisJson('/data/stats/traffic', params);
         renderTrafficCharts(stats);
         
-        // 2. Fetch Logs for Analysis Table with filters
-        // Reuse logs endpoint but with higher limit
-        params.append('limit', '100');
-        const logsRes = await fetch(`${CONFIG.API_BASE}/data/logs?${params.toString()}`, {
-            headers: { 'Authorization': `Bearer ${token}` }
-        });
-        if (!logsRes.ok) throw new Error('Failed to fetch logs');
-        const logs = await logsRes.json();
+        // Logs for the analysis table, same filters with a higher limit
+        const logParams = new URLSearchParams(query);
+        logParams.append('limit', '100');
+        logParams.append('fields', 'timestamp,sensor_name,attack_type,source_ip,raw_log');
+        const { data: logs } = await fetchAnalysisJson('/data/logs', logParams);
         renderAnalysisLogs(logs);
-        
+
+        trafficAnalysisState = { query, stats, logs };
+    } catch (e) {
+        console.error(e);
+        showToast('加载分析数据失败', 'error');
+    }
+}
+
+async function refreshTrafficAnalysis() {
+    // Fetches only what was added since the last load and merges it in
+    const state = trafficAnalysisState;
+    const params = trafficAnalysisParams();
+    if (!state || state.query !== params.toString() || !state.stats.timeline.length) {
+        return loadTrafficAnalysis();
+    }
+
+    try {
+        const timelineParams = new URLSearchParams(state.query);
+        const lastBucket = state.stats.timeline[state.stats.timeline.length - 1];
+        timelineParams.append('granularity', state.stats.granularity);
+        timelineParams.append('since_timestamp', lastBucket.time);
+        const { data: delta } = await fetchAnalysisJson('/data/stats/traffic', timelineParams);
+        if (delta.timeline.length) {
+            // Returned buckets replace ours from the first one on
+            const from = delta.timeline[0].time;
+            state.stats.timeline = state.stats.timeline.filter(t => t.time < from).concat(delta.timeline);
+        }
+
+        const logParams = new URLSearchParams(state.query);
+        logParams.append('limit', '100');
+        logParams.append('fields', 'timestamp,sensor_name,attack_type,source_ip,raw_log');
+        if (state.logs.length) {
+            logParams.append('since_timestamp', state.logs[0].timestamp);
+            logParams.append('since_id', state.logs[0].id);
+        }
+        const { data: newLogs, truncated } = await fetchAnalysisJson('/data/logs', logParams);
+        if (truncated || !state.logs.length) {
+            state.logs = newLogs;
+        } else {
+            state.logs = newLogs.concat(state.logs).slice(0, 100);
+        }
+
+        renderTrafficCharts(state.stats);
+        renderAnalysisLogs(state.logs);
     } catch (e) {
         console.error(e);
         showToast('加载分析数据失败', 'error');